@@ -1,4 +1,5 @@
 # core module initialization
 from .device_scanner import DeviceScanner
+from .records import UsbDevice, NetworkAdapter
 
-__all__ = ['DeviceScanner']
+__all__ = ['DeviceScanner', 'UsbDevice', 'NetworkAdapter']
@@ -0,0 +1,119 @@
+"""Registry of device categories and the backends that scan them.
+
+A category ("usb", "network") describes how its devices are shown and
+scanned, and the record type of its devices. A backend is the scan function
+of one category on one platform:
+
+    registry.add_category('serial', "Serial Ports", SerialPort, empty_text="No serial ports detected")
+    registry.register('serial', 'Linux', scan_serial_ports)
+
+A scan function takes the DeviceScanner and returns a list of records; it
+raises if it cannot scan, since an empty list means no devices are present.
+DeviceScanner.scan() runs the backend for the current platform through its
+result cache, and DeviceScanner.scan_concurrently() runs several categories
+at once and yields each result as its backend finishes. The Devices page
+builds one section per category that has a backend for the platform; the
+CLI, history, snapshots, fleet agent and metrics exporter handle every
+registered category.
+"""
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from .records import NetworkAdapter, UsbDevice
+
+# Section layouts: "list" is the virtualized list used for long inventories,
+# "cards" one card widget per record (with live rates for network adapters)
+LIST_VIEW = 'list'
+CARD_VIEW = 'cards'
+
+
+class Category:
+    """How a category's devices are scanned and shown."""
+
+    __slots__ = ('name', 'title', 'record_type', 'empty_text', 'view', 'timeout', 'interval')
+
+    def __init__(self, name: str, title: str, record_type: Type, empty_text: str = '', view: str = LIST_VIEW,
+                 timeout: float = 15.0, interval: Tuple[float, float, float] = (5.0, 60.0, 1.0)):
+        """
+        Args:
+            name: Category key, as used in records, history and the CLI.
+            title: Section title on the Devices page.
+            record_type: Record class of the category's devices, such as
+                UsbDevice; used to rebuild records from history and snapshots.
+            empty_text: Shown when the category has no devices.
+            view: LIST_VIEW or CARD_VIEW.
+            timeout: Seconds to wait for a scan before reporting it failed.
+            interval: (base, maximum, fast) rescan intervals in seconds on
+                the Devices page; see AdaptiveInterval.
+        """
+        self.name = name
+        self.title = title
+        self.record_type = record_type
+        self.empty_text = empty_text or f"No {title.lower()} detected"
+        self.view = view
+        self.timeout = timeout
+        self.interval = interval
+
+
+class Backend:
+    """The scan function of one category on one platform."""
+
+    __slots__ = ('category', 'platform', 'scan', 'name')
+
+    def __init__(self, category: str, platform: Optional[str], scan: Callable, name: str):
+        self.category = category
+        self.platform = platform
+        self.scan = scan
+        self.name = name
+
+
+class BackendRegistry:
+    """Categories and their per-platform backends, in registration order."""
+
+    def __init__(self):
+        self._categories: Dict[str, Category] = {}
+        self._backends: Dict[Tuple[str, Optional[str]], Backend] = {}
+
+    def add_category(self, name: str, title: str, record_type: Type, **options) -> Category:
+        """Add or replace a category; options are passed to Category."""
+        category = Category(name, title, record_type, **options)
+        self._categories[name] = category
+        return category
+
+    def register(self, category: str, platform: Optional[str], scan: Callable, name: Optional[str] = None) -> Backend:
+        """Register the scan function of a category on a platform.
+
+        Args:
+            category: Name of a category added with add_category().
+            platform: platform.system() value, or None for every platform
+                without a backend of its own.
+            scan: Callable taking the DeviceScanner and returning records.
+            name: Name used in metrics; defaults to the callable's name.
+        """
+        if category not in self._categories:
+            raise KeyError(f"Unknown device category: {category}")
+        backend = Backend(category, platform, scan, name or getattr(scan, '__name__', category))
+        self._backends[category, platform] = backend
+        return backend
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._categories
+
+    def category(self, name: str) -> Category:
+        return self._categories[name]
+
+    def backend(self, category: str, system: str) -> Optional[Backend]:
+        """Return the backend for a category on a platform, or None if it has none."""
+        return self._backends.get((category, system)) or self._backends.get((category, None))
+
+    def categories(self, system: Optional[str] = None) -> List[Category]:
+        """Return the categories that have a backend on a platform, or all of them."""
+        return [category for name, category in self._categories.items()
+                if system is None or self.backend(name, system)]
+
+
+# The built-in categories; device_scanner registers their backends
+default_registry = BackendRegistry()
+default_registry.add_category('usb', "USB Devices", UsbDevice, empty_text="No USB devices detected",
+                              timeout=20.0, interval=(2.0, 30.0, 0.5))
+default_registry.add_category('network', "Network Adapters", NetworkAdapter, view=CARD_VIEW, timeout=20.0,
+                              interval=(5.0, 60.0, 1.0))
@@ -0,0 +1,321 @@
+"""Headless command line interface built directly on DeviceScanner.
+
+Run from the MyApp directory:
+
+    python -m core                  # human-readable inventory
+    python -m core --json           # one JSON document
+    python -m core --jsonl          # one JSON object per device
+    python -m core --watch          # stream change events as JSON lines
+    python -m core --seen-between 2026-01-01 2026-01-02
+    python -m core --collector 0.0.0.0:7640     # merge inventories from agents
+    python -m core --agent collector:7640       # push this machine's changes
+    python -m core --fleet collector:7640       # print the merged state
+    python -m core --serve-metrics 0.0.0.0:9733 # OpenMetrics endpoint at /metrics
+    python -m core --save-snapshot lab.dmsnap   # archive the inventory
+    python -m core --diff-snapshots old.dmsnap new.dmsnap
+
+Nothing here imports PyQt5, so it works on servers without a Qt stack.
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .backends import default_registry
+from .device_scanner import DeviceScanner
+from .metrics import default_metrics
+from .records import diff_records
+
+
+def scan(scanner: DeviceScanner, categories, force: bool = False) -> Dict[str, list]:
+    """Scan the requested categories concurrently and return their records by category.
+
+    A category whose backend fails, times out or is still busy from an
+    earlier scan is reported on stderr and left out, so callers cannot
+    mistake it for a category with no devices.
+    """
+    results = {}
+    # The scanner reports backend errors with print(); keep them off stdout
+    # so JSON output stays parseable
+    with contextlib.redirect_stdout(sys.stderr):
+        for category, records, error in scanner.scan_concurrently(categories, force):
+            if error is not None:
+                print(f"Error scanning {category}: {error}")
+            else:
+                results[category] = records
+    # In the order asked for, not the order the backends finished in
+    return {category: results[category] for category in categories if category in results}
+
+
+def record_to_json(category: str, record) -> Dict:
+    """Flatten a record for JSON output."""
+    data = {'category': category, 'key': record.key}
+    data.update(record.to_dict())
+    return data
+
+
+def parse_address(text: str, default_host: str = "127.0.0.1") -> Tuple[str, int]:
+    """Parse "HOST:PORT", "[IPV6]:PORT" or "PORT"."""
+    host, _, port = text.rpartition(':')
+    return host.strip('[]') or default_host, int(port)
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+
+
+def _write_line(stream, data):
+    stream.write(json.dumps(data, separators=(',', ':')) + "\n")
+    stream.flush()
+
+
+def print_text(inventory: Dict[str, list], stream=sys.stdout):
+    for category, records in inventory.items():
+        stream.write(f"{default_registry.category(category).title} ({len(records)})\n")
+        for record in records:
+            state = "connected" if record.connected else "disconnected"
+            stream.write(f"  {record.name} [{state}]\n")
+            for field, value in record.details():
+                stream.write(f"      {field.replace('_', ' ')}: {value}\n")
+        stream.write("\n")
+
+
+def watch(scanner: DeviceScanner, categories, interval: float, stream=sys.stdout,
+          iterations: Optional[int] = None, history=None):
+    """Poll the scanner and write one JSON line per added, removed or changed record.
+
+    The first scan is reported as "added" events so the stream is
+    self-contained. Each scan is also recorded in history, if given. A
+    category whose scan failed is compared again on the next scan that
+    succeeds, so a failure never shows up as removals.
+    """
+    previous = {category: [] for category in categories}
+    count = 0
+    while iterations is None or count < iterations:
+        inventory = scan(scanner, categories, force=True)
+        for category, records in inventory.items():
+            added, removed, changed = diff_records(previous[category], records)
+            for event, items in (('added', added), ('removed', removed), ('changed', changed)):
+                for record in items:
+                    line = {'time': _timestamp(), 'event': event}
+                    line.update(record_to_json(category, record))
+                    _write_line(stream, line)
+            previous[category] = records
+            if history is not None:
+                history.record_scan(category, records)
+        count += 1
+        if iterations is None or count < iterations:
+            time.sleep(interval)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m core",
+                                     description="List connected USB devices and network adapters.")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="print one JSON document")
+    output.add_argument("--jsonl", action="store_true", help="print one JSON object per line")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep scanning and stream change events as JSON lines")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="seconds between scans in watch mode (default: 2)")
+    categories = tuple(category.name for category in default_registry.categories())
+    parser.add_argument("--category", choices=categories + ('all',), default='all',
+                        help="limit output to one category")
+    parser.add_argument("--history", metavar="PATH", nargs="?", const="",
+                        help="record scans in the device history database (default path if PATH is omitted)")
+    query = parser.add_mutually_exclusive_group()
+    query.add_argument("--seen-between", nargs=2, metavar=("START", "END"),
+                       help="print devices connected at any time between START and END "
+                            "(Unix time or ISO 8601) from the history database")
+    query.add_argument("--timeline", metavar="KEY", help="print the recorded events of one device")
+    query.add_argument("--export-jsonl", metavar="SNAPSHOT",
+                       help="print the records of a snapshot file as JSON lines")
+    query.add_argument("--diff-snapshots", nargs=2, metavar=("OLD", "NEW"),
+                       help="print the devices added, removed and changed between two snapshot files "
+                            "as JSON lines")
+    parser.add_argument("--save-snapshot", metavar="PATH",
+                        help="save the scanned inventory as a compact snapshot file")
+    fleet = parser.add_mutually_exclusive_group()
+    fleet.add_argument("--collector", metavar="[HOST:]PORT",
+                       help="run a fleet collector that merges the inventories pushed by agents")
+    fleet.add_argument("--agent", metavar="HOST:PORT",
+                       help="push inventory changes to the fleet collector at HOST:PORT "
+                            "(every --interval seconds)")
+    fleet.add_argument("--fleet", metavar="HOST:PORT",
+                       help="print the merged state of a fleet collector; with --watch, "
+                            "stream its changes as JSON lines")
+    fleet.add_argument("--serve-metrics", metavar="[HOST:]PORT",
+                       help="serve device and adapter state as OpenMetrics at http://HOST:PORT/metrics, "
+                            "refreshed every --interval seconds")
+    parser.add_argument("--host-name",
+                        help="name an agent reports to the collector, or a snapshot records (default: hostname)")
+    parser.add_argument("--stats", action="store_true",
+                        help="time scans, backends and commands and print the stats as JSON to stderr on exit")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.stats:
+        default_metrics.enabled = True
+    scanner = DeviceScanner()
+    categories = tuple(scanner.categories()) if args.category == 'all' else (args.category,)
+    try:
+        return run(args, scanner, categories)
+    finally:
+        if args.stats:
+            sys.stderr.write(default_metrics.dump() + "\n")
+
+
+def open_history(path):
+    from .history import DEFAULT_PATH, HistoryStore
+    return HistoryStore(path or DEFAULT_PATH)
+
+
+def query_history(args, categories) -> int:
+    history = open_history(args.history)
+    try:
+        if args.timeline:
+            for event in history.timeline(args.timeline):
+                _write_line(sys.stdout, event)
+        else:
+            from .history import parse_time
+            start, end = (parse_time(value) for value in args.seen_between)
+            category = categories[0] if len(categories) == 1 else None
+            for device in history.devices_seen(start, end, category):
+                _write_line(sys.stdout, device)
+    finally:
+        history.close()
+    return 0
+
+
+def query_snapshots(args, categories) -> int:
+    from . import snapshot
+
+    try:
+        if args.export_jsonl:
+            for record in snapshot.iter_json(args.export_jsonl):
+                if record['category'] in categories:
+                    _write_line(sys.stdout, record)
+        else:
+            old, new = (snapshot.load(path) for path in args.diff_snapshots)
+            for inventory in (old.inventory, new.inventory):
+                for category in list(inventory):
+                    if category not in categories:
+                        del inventory[category]
+            for change in snapshot.diff(old, new):
+                _write_line(sys.stdout, change)
+    except BrokenPipeError:
+        # Output piped into e.g. head, which has seen enough
+        pass
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"Error reading snapshot: {e}\n")
+        return 1
+    return 0
+
+
+def save_snapshot(path: str, inventory: Dict[str, list], host: Optional[str] = None):
+    import socket
+    from . import snapshot
+
+    snapshot.save(path, snapshot.Snapshot(inventory, host=host or socket.gethostname()))
+
+
+def run_fleet(args, scanner: DeviceScanner, categories) -> int:
+    import asyncio
+    from . import fleet
+
+    if args.collector:
+        collector = fleet.FleetCollector(*parse_address(args.collector, default_host="0.0.0.0"))
+        main = collector.serve_forever()
+    elif args.agent:
+        agent = fleet.FleetAgent(parse_address(args.agent), scanner, host=args.host_name,
+                                 categories=categories, interval=args.interval)
+        main = agent.run()
+    else:
+        main = print_fleet(parse_address(args.fleet), categories, args.watch)
+    try:
+        asyncio.run(main)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    return 0
+
+
+async def print_fleet(address, categories, follow: bool):
+    from . import fleet
+
+    if not follow:
+        state = await fleet.fetch_snapshot(address)
+        for record in fleet.merged_records(state, categories):
+            _write_line(sys.stdout, record)
+        return
+    async for message in fleet.subscribe(address):
+        if message.get('category', categories[0]) in categories:
+            _write_line(sys.stdout, message)
+
+
+def serve_metrics(args, scanner: DeviceScanner, categories) -> int:
+    from .exporter import MetricsExporter
+
+    exporter = MetricsExporter(scanner, parse_address(args.serve_metrics), categories, args.interval)
+    host, port = exporter.address[:2]
+    sys.stderr.write(f"Serving OpenMetrics at http://{host}:{port}/metrics\n")
+    try:
+        # Keep scanner errors off stdout, as in the other modes
+        with contextlib.redirect_stdout(sys.stderr):
+            exporter.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def run(args, scanner: DeviceScanner, categories) -> int:
+    if args.seen_between or args.timeline:
+        return query_history(args, categories)
+    if args.export_jsonl or args.diff_snapshots:
+        return query_snapshots(args, categories)
+    if args.collector or args.agent or args.fleet:
+        return run_fleet(args, scanner, categories)
+    if args.serve_metrics:
+        return serve_metrics(args, scanner, categories)
+
+    history = open_history(args.history) if args.history is not None else None
+    try:
+        return scan_and_print(args, scanner, categories, history)
+    finally:
+        if history is not None:
+            history.close()
+
+
+def scan_and_print(args, scanner: DeviceScanner, categories, history) -> int:
+    if args.watch:
+        try:
+            watch(scanner, categories, args.interval, history=history)
+        except (KeyboardInterrupt, BrokenPipeError):
+            pass
+        return 0
+
+    inventory = scan(scanner, categories)
+    if history is not None:
+        for category, records in inventory.items():
+            history.record_scan(category, records)
+    if args.save_snapshot:
+        save_snapshot(args.save_snapshot, inventory, args.host_name)
+    if args.json:
+        document = {category: [record.to_dict() for record in records]
+                    for category, records in inventory.items()}
+        json.dump(document, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif args.jsonl:
+        for category, records in inventory.items():
+            for record in records:
+                _write_line(sys.stdout, record_to_json(category, record))
+    elif args.save_snapshot:
+        count = sum(len(records) for records in inventory.values())
+        sys.stderr.write(f"Saved {count} records to {args.save_snapshot}\n")
+    else:
+        print_text(inventory)
+    return 0
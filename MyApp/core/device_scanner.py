@@ -1,238 +1,689 @@
+import collections
+import contextlib
+import operator
 import os
 import platform
+import queue
 import re
 import subprocess
-from typing import List, Dict, Any
+import threading
+import time
+from typing import List, Dict, Any, Callable, Hashable, Iterable, Iterator, Optional, TextIO, Tuple
+
+from . import fingerprint, macos, netlink
+from .backends import BackendRegistry, default_registry
+from .ids import IdResolver, default_resolver
+from .metrics import Metrics, default_metrics
+from .powershell import PowerShellSession
+from .records import UsbDevice, NetworkAdapter
+
+
+class _ScanFlight:
+    """One in-flight scan that concurrent callers wait on."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _CacheEntry:
+    """Cached result and in-flight scan for one category."""
+
+    __slots__ = ('result', 'timestamp', 'flight', 'hits', 'misses', 'coalesced')
+
+    def __init__(self):
+        self.result = None
+        self.timestamp = 0.0
+        self.flight = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
 
 class DeviceScanner:
-    """Class to scan and retrieve information about connected devices."""
+    """Class to scan and retrieve information about connected devices.
+
+    Results are cached per category ("usb", "network") for a configurable
+    TTL, and concurrent callers of the same category share one in-flight
+    scan instead of each running the platform commands.
+
+    Each backend fingerprints its raw input before parsing it. If the input
+    is unchanged since the last scan, the previous records are returned as
+    they are, the same objects, and parsing is skipped. Callers can compare
+    records by identity to skip their own work too. Returned records are
+    shared and must not be modified.
+
+    A backend that cannot scan raises instead of returning an empty list, so
+    a failed scan is never mistaken for every device having disconnected.
+    Failures are not cached.
+    """
+
+    # Default cache lifetime in seconds per category
+    DEFAULT_CACHE_TTL = {'usb': 2.0, 'network': 2.0}
     
-    def __init__(self):
+    def __init__(self, sysfs_root: str = "/sys", cache_ttl: Optional[Dict[str, float]] = None,
+                 powershell: Optional[PowerShellSession] = None, metrics: Optional[Metrics] = None,
+                 ids: Optional[IdResolver] = None, registry: Optional[BackendRegistry] = None,
+                 max_workers: int = 4):
+        """
+        Args:
+            sysfs_root: Root of the sysfs mount; overridable so scans can run
+                against a fixture tree.
+            cache_ttl: Per-category cache lifetime in seconds, merged over
+                DEFAULT_CACHE_TTL. A TTL of 0 disables caching but still
+                coalesces concurrent scans.
+            powershell: Session used by the Windows backend; one is started
+                on first use if not given.
+            metrics: Registry for scan, backend and command timings;
+                defaults to the shared default_metrics.
+            ids: Vendor and product name database for devices that do not
+                report their own names; defaults to the installed usb.ids
+                and pci.ids.
+            registry: Categories and their backends; defaults to
+                default_registry, which holds USB devices and network adapters.
+            max_workers: Threads each scan_concurrently() call runs backends on.
+        """
         self.system = platform.system()
+        self.sysfs_root = sysfs_root
+        self.powershell = powershell
+        self.metrics = metrics if metrics is not None else default_metrics
+        self.ids = ids if ids is not None else default_resolver()
+        self.registry = registry if registry is not None else default_registry
+        self.max_workers = max_workers
+        # Categories whose scan_concurrently() call is still running, such
+        # as a backend that hung past its timeout
+        self._running = set()
+        self.cache_ttl = dict(self.DEFAULT_CACHE_TTL)
+        if cache_ttl:
+            self.cache_ttl.update(cache_ttl)
+        self._cache = {category: _CacheEntry() for category in self.cache_ttl}
+        self._cache_lock = threading.Lock()
+        # Per parse stage: (fingerprint, records) of the last parse, and
+        # [skipped, parsed] counts. Backends of different categories run on
+        # worker threads at once, so the counts are kept under _cache_lock.
+        self._parsed = {}
+        self._parse_counts = {}
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hit, miss and coalesced counters per category."""
+        with self._cache_lock:
+            counts = [(category, entry.hits, entry.misses, entry.coalesced)
+                      for category, entry in self._cache.items()]
+        return {category: {'hits': hits, 'misses': misses, 'coalesced': coalesced}
+                for category, hits, misses, coalesced in counts}
+
+    def fingerprint_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return skipped and parsed counts and the skip rate per parse stage."""
+        with self._cache_lock:
+            counts = [(stage, skipped, parsed) for stage, (skipped, parsed) in self._parse_counts.items()]
+        return {stage: {'skipped': skipped, 'parsed': parsed,
+                        'skip_rate': skipped / (skipped + parsed)}
+                for stage, skipped, parsed in counts}
+
+    def _parse_unless_unchanged(self, stage: str, fingerprint: Hashable, parse: Callable[[], list]) -> list:
+        """Return parse(), or the stage's previous result if its input fingerprint is unchanged.
+
+        Args:
+            stage: Name of the parse stage, e.g. "lsusb".
+            fingerprint: Cheap summary of the raw input that parse() reads.
+            parse: Callable that parses the input into records.
+        """
+        previous = self._parsed.get(stage)
+        if previous is not None and previous[0] == fingerprint:
+            return self._keep_previous(stage, previous[1])
+        with self.metrics.span(f"parse.{stage}"):
+            result = parse()
+        return self._keep_new(stage, fingerprint, result)
+
+    def _keep_unless_unchanged(self, stage: str, fingerprint: Hashable, result: list) -> list:
+        """Return the stage's previous result if its input fingerprint is unchanged, else result.
+
+        For input that was parsed while it was read, before its fingerprint
+        was known; the new records are dropped so callers still see the
+        same objects for an unchanged input.
+        """
+        previous = self._parsed.get(stage)
+        if previous is not None and previous[0] == fingerprint:
+            return self._keep_previous(stage, previous[1])
+        return self._keep_new(stage, fingerprint, result)
+
+    def _keep_previous(self, stage: str, result: list) -> list:
+        with self._cache_lock:
+            self._parse_counts.setdefault(stage, [0, 0])[0] += 1
+        self.metrics.increment(f"fingerprint.{stage}.skipped")
+        return result
+
+    def _keep_new(self, stage: str, fingerprint: Hashable, result: list) -> list:
+        self._parsed[stage] = (fingerprint, result)
+        with self._cache_lock:
+            self._parse_counts.setdefault(stage, [0, 0])[1] += 1
+        self.metrics.increment(f"fingerprint.{stage}.parsed")
+        return result
+
+    def invalidate(self, category: Optional[str] = None):
+        """Drop cached results for one category, or for all of them."""
+        with self._cache_lock:
+            for name, entry in self._cache.items():
+                if category is None or name == category:
+                    entry.result = None
+
+    def _cached_scan(self, category: str, scan: Callable[[], list], force: bool,
+                     timeout: Optional[float] = None) -> list:
+        """Return a cached result, join an in-flight scan, or run a new one.
+
+        A forced call skips the cache but still joins a scan that is already
+        running, since that scan started after the caller asked. A joined
+        scan that has not finished within timeout seconds raises TimeoutError.
+        """
+        with self._cache_lock:
+            entry = self._cache.setdefault(category, _CacheEntry())
+            ttl = self.cache_ttl.get(category, 0.0)
+            fresh = entry.result is not None and time.monotonic() - entry.timestamp < ttl
+            if fresh and not force:
+                entry.hits += 1
+                outcome = 'hit'
+            else:
+                flight = entry.flight
+                if flight is not None:
+                    entry.coalesced += 1
+                    outcome = 'coalesced'
+                else:
+                    entry.misses += 1
+                    flight = entry.flight = _ScanFlight()
+                    outcome = 'miss'
+        self.metrics.increment(f"cache.{category}.{outcome}")
+        if outcome == 'hit':
+            return list(entry.result)
+
+        if outcome == 'coalesced':
+            if not flight.done.wait(timeout):
+                raise TimeoutError(f"{category} scan did not finish within {timeout:g} s")
+            if flight.error is not None:
+                raise flight.error
+            return list(flight.result)
+
+        try:
+            with self.metrics.span(f"scan.{category}"):
+                flight.result = scan()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._cache_lock:
+                if flight.error is None:
+                    entry.result = flight.result
+                    entry.timestamp = time.monotonic()
+                entry.flight = None
+            flight.done.set()
+        return list(flight.result)
         
-    def get_connected_devices(self) -> List[Dict[str, Any]]:
+    def categories(self) -> List[str]:
+        """Return the names of the categories this platform has a backend for."""
+        return [category.name for category in self.registry.categories(self.system)]
+
+    def scan(self, category: str, force: bool = False) -> list:
+        """Return the records of one category from its registered backend, through the cache.
+
+        Args:
+            category: Registered category name, e.g. "usb".
+            force: Skip the cache and scan again.
+
+        Raises:
+            Whatever the backend raised when the scan failed, or TimeoutError
+            if a joined scan did not finish within the category's timeout.
+        """
+        timeout = self.registry.category(category).timeout if category in self.registry else None
+        return self._cached_scan(category, lambda: self._run_backend(category), force, timeout)
+
+    def _run_backend(self, category: str) -> list:
+        """Run the platform backend of a category, bypassing the cache."""
+        backend = self.registry.backend(category, self.system)
+        if backend is None:
+            return []
+        with self.metrics.span(f"backend.{backend.name}"):
+            return backend.scan(self)
+
+    def scan_concurrently(self, categories: Optional[Iterable[str]] = None, force: bool = False,
+                          scans: Optional[Dict[str, Callable[[], list]]] = None
+                          ) -> Iterator[Tuple[str, Optional[list], Optional[Exception]]]:
+        """Scan several categories at once, yielding each result as its backend finishes.
+
+        Backends run on up to max_workers daemon threads started for this
+        call. A backend that is still running after its category's timeout,
+        counted from the call, is reported as failed with a TimeoutError.
+        It keeps its thread until it returns, and its result still fills
+        the cache; until then, later calls report the category as busy at
+        once instead of starting it again. A hung backend does not keep
+        the process from exiting.
+
+        Args:
+            categories: Category names; all of this platform's by default.
+            force: Skip the cache and scan again.
+            scans: Callables to use instead of scan() for some categories.
+
+        Yields:
+            Tuples of (category, records, None) or (category, None, error).
+        """
+        if categories is None:
+            categories = self.categories()
+        scans = scans or {}
+
+        timeouts = {category: self.registry.category(category).timeout for category in categories}
+        jobs = []
+        busy = []
+        with self._cache_lock:
+            for category in timeouts:
+                if category in self._running:
+                    busy.append(category)
+                else:
+                    self._running.add(category)
+                    jobs.append((category, scans.get(category) or (lambda category=category: self.scan(category, force))))
+        for category in busy:
+            self.metrics.increment(f"scan.{category}.busy")
+            yield category, None, TimeoutError(f"{category} scan is still running")
+        if not jobs:
+            return
+
+        results = queue.Queue()
+        todo = collections.deque(jobs)
+
+        def work():
+            while True:
+                try:
+                    category, scan = todo.popleft()
+                except IndexError:
+                    return
+                try:
+                    outcome = (category, scan(), None)
+                except Exception as e:
+                    outcome = (category, None, e)
+                with self._cache_lock:
+                    self._running.discard(category)
+                results.put(outcome)
+
+        started = time.monotonic()
+        # category -> (timeout, deadline)
+        pending = {category: (timeouts[category], started + timeouts[category]) for category, _ in jobs}
+        for _ in range(min(self.max_workers, len(jobs))):
+            threading.Thread(target=work, name="device-scan", daemon=True).start()
+
+        while pending:
+            next_deadline = min(deadline for _, deadline in pending.values())
+            try:
+                category, records, error = results.get(timeout=max(0.0, next_deadline - time.monotonic()))
+            except queue.Empty:
+                pass
+            else:
+                if pending.pop(category, None) is not None:
+                    yield category, records, error
+                continue
+            now = time.monotonic()
+            for category, (timeout, deadline) in list(pending.items()):
+                if deadline <= now:
+                    del pending[category]
+                    self.metrics.increment(f"scan.{category}.timeout")
+                    yield category, None, TimeoutError(f"{category} scan did not finish within {timeout:g} s")
+
+    def get_connected_devices(self, force: bool = False) -> List[UsbDevice]:
         """Get a list of all connected devices.
+
+        Args:
+            force: Skip the cache and scan again.
         
         Returns:
-            List of dictionaries containing device information.
-        """
-        if self.system == "Windows":
-            return self._get_windows_devices()
-        elif self.system == "Darwin":  # macOS
-            return self._get_macos_devices()
-        elif self.system == "Linux":
-            return self._get_linux_devices()
-        else:
-            return []
-    
-    def _get_windows_devices(self) -> List[Dict[str, Any]]:
+            List of UsbDevice records.
+
+        Raises:
+            The backend's error if the scan failed; see scan().
+        """
+        return self.scan('usb', force)
+
+    def _get_windows_devices(self) -> List[UsbDevice]:
         """Get connected devices on Windows using PowerShell."""
+        # PowerShell command to get USB devices
+        cmd = "Get-PnpDevice -PresentOnly | Where-Object { $_.InstanceId -match '^USB' } | Select-Object Status, Class, FriendlyName, InstanceId | ConvertTo-Json"
+        stdout = self._run_powershell(cmd)
+        return self._parse_unless_unchanged('powershell_usb', fingerprint.digest(stdout),
+                                            lambda: self._parse_windows_devices(stdout))
+
+    @staticmethod
+    def _parse_windows_devices(stdout: str) -> List[UsbDevice]:
+        """Parse Get-PnpDevice JSON output."""
         devices = []
-        
-        try:
-            # PowerShell command to get USB devices
-            cmd = "Get-PnpDevice -PresentOnly | Where-Object { $_.InstanceId -match '^USB' } | Select-Object Status, Class, FriendlyName, InstanceId | ConvertTo-Json"
-            result = subprocess.run(["powershell", "-Command", cmd], 
-                                   capture_output=True, text=True, check=True)
-            
-            if result.stdout.strip():
-                import json
-                # PowerShell might return a single object or an array
-                output = json.loads(result.stdout)
-                
-                # Ensure we have a list
-                if isinstance(output, dict):
-                    output = [output]
-                
-                for device in output:
-                    devices.append({
-                        'name': device.get('FriendlyName', 'Unknown Device'),
-                        'type': device.get('Class', 'Unknown'),
-                        'id': device.get('InstanceId', ''),
-                        'status': device.get('Status', 'Unknown'),
-                        'connected': device.get('Status') == 'OK'
-                    })
-        except Exception as e:
-            print(f"Error scanning Windows devices: {e}")
-        
-        return devices
-    
-    def _get_macos_devices(self) -> List[Dict[str, Any]]:
-        """Get connected devices on macOS using system_profiler."""
-        devices = []
-        
-        try:
-            result = subprocess.run(["system_profiler", "SPUSBDataType", "-json"], 
-                                   capture_output=True, text=True, check=True)
-            
-            if result.stdout.strip():
-                import json
-                data = json.loads(result.stdout)
-                
-                # Parse the USB devices from the system_profiler output
-                usb_items = data.get('SPUSBDataType', [])
-                for usb_controller in usb_items:
-                    self._parse_macos_usb_device(usb_controller, devices)
-        except Exception as e:
-            print(f"Error scanning macOS devices: {e}")
-        
+        if stdout.strip():
+            import json
+            # PowerShell might return a single object or an array
+            output = json.loads(stdout)
+
+            # Ensure we have a list
+            if isinstance(output, dict):
+                output = [output]
+
+            for device in output:
+                devices.append(UsbDevice(
+                    name=device.get('FriendlyName') or 'Unknown Device',
+                    type=device.get('Class') or 'Unknown',
+                    id=device.get('InstanceId') or '',
+                    status=device.get('Status') or 'Unknown',
+                    connected=device.get('Status') == 'OK'
+                ))
         return devices
     
-    def _parse_macos_usb_device(self, device, devices_list, depth=0):
-        """Recursively parse macOS USB device information."""
-        if "_items" in device:
-            for item in device["_items"]:
-                self._parse_macos_usb_device(item, devices_list, depth+1)
-        
-        # Skip the root USB controllers
-        if depth > 0 and "manufacturer" in device:
-            devices_list.append({
-                'name': device.get('_name', 'Unknown Device'),
-                'type': 'USB',
-                'id': device.get('location_id', ''),
-                'manufacturer': device.get('manufacturer', 'Unknown'),
-                'serial_number': device.get('serial_num', ''),
-                'connected': True
-            })
+    def _run_powershell(self, command: str) -> str:
+        """Run a command in the shared PowerShell host and return its output."""
+        if self.powershell is None:
+            self.powershell = PowerShellSession()
+        with self.metrics.span("command.powershell"):
+            return self.powershell.run(command)
+
+    def _get_macos_devices(self) -> List[UsbDevice]:
+        """Get connected devices on macOS using system_profiler.
+
+        The output is parsed one controller at a time as it is read, and each
+        controller's hub tree is walked iteratively. It is digested on the
+        way through; if it is unchanged, the previous records are returned.
+        """
+        with self._stream_command(["system_profiler", "SPUSBDataType", "-json"]) as stdout:
+            reader = fingerprint.DigestingReader(stdout)
+            with self.metrics.span("parse.system_profiler"):
+                parsed = list(macos.iter_system_profiler_usb(reader))
+            digest = reader.digest()
+        return self._keep_unless_unchanged('system_profiler', digest, parsed)
     
-    def _get_linux_devices(self) -> List[Dict[str, Any]]:
+    def _get_linux_devices(self) -> List[UsbDevice]:
+        """Get connected devices on Linux.
+
+        Reads sysfs directly when it is available and falls back to lsusb.
+        """
+        if os.path.isdir(os.path.join(self.sysfs_root, "bus", "usb", "devices")):
+            return self._get_linux_sysfs_devices()
+        return self._get_linux_lsusb_devices()
+
+    def _get_linux_sysfs_devices(self) -> List[UsbDevice]:
+        """Get connected devices on Linux by walking /sys/bus/usb/devices."""
+        usb_root = os.path.join(self.sysfs_root, "bus", "usb", "devices")
+        # Interface entries look like "1-1.2:1.0"; only devices have a devnum
+        paths = [os.path.join(usb_root, entry) for entry in sorted(os.listdir(usb_root)) if ':' not in entry]
+        # Directory mtimes in sysfs do not follow the devices, but the
+        # kernel hands out a new devnum on every enumeration, so the
+        # entries and their devnums identify the inventory
+        devnums = tuple(self._read_sysfs_attr(path, "devnum") for path in paths)
+        return self._parse_unless_unchanged(
+            'sysfs_usb', (tuple(paths), devnums),
+            lambda: [device for device in map(self.read_sysfs_usb_device, paths) if device])
+
+    def read_sysfs_usb_device(self, device_path: str) -> Optional[UsbDevice]:
+        """Read one USB device directory from sysfs.
+
+        Args:
+            device_path: Path of the device directory, e.g. /sys/bus/usb/devices/1-1.2.
+
+        Returns:
+            UsbDevice record, or None if the directory is not a USB device.
+        """
+        busnum = self._read_sysfs_attr(device_path, "busnum")
+        devnum = self._read_sysfs_attr(device_path, "devnum")
+        if not busnum or not devnum:
+            return None
+
+        vendor_id = self._read_sysfs_attr(device_path, "idVendor")
+        product_id = self._read_sysfs_attr(device_path, "idProduct")
+        # Many devices have no string descriptors; name them from usb.ids, as lsusb does
+        manufacturer = self._read_sysfs_attr(device_path, "manufacturer") or self.ids.usb_vendor(vendor_id)
+        product = self._read_sysfs_attr(device_path, "product") or self.ids.usb_product(vendor_id, product_id)
+        speed = self._read_sysfs_attr(device_path, "speed")
+        name = f"{manufacturer} {product}".strip() or 'Unknown Device'
+
+        return UsbDevice(
+            name=name,
+            bus=busnum.zfill(3),
+            device=devnum.zfill(3),
+            vendor_id=vendor_id,
+            product_id=product_id,
+            manufacturer=manufacturer,
+            serial_number=self._read_sysfs_attr(device_path, "serial"),
+            speed=f"{speed} Mbps" if speed else '',
+            port_path=os.path.basename(device_path.rstrip(os.sep))
+        )
+
+    @staticmethod
+    def _read_sysfs_attr(path: str, name: str) -> str:
+        """Read a single sysfs attribute, returning an empty string if it is missing."""
+        try:
+            with open(os.path.join(path, name), "r", encoding="utf-8", errors="replace") as f:
+                return f.read().strip()
+        except OSError:
+            return ''
+
+    def _get_linux_lsusb_devices(self) -> List[UsbDevice]:
         """Get connected devices on Linux using lsusb."""
+        stdout = self._run_command(["lsusb"])
+        return self._parse_unless_unchanged('lsusb', fingerprint.digest(stdout),
+                                            lambda: self._parse_lsusb(stdout))
+
+    @staticmethod
+    def _parse_lsusb(stdout: str) -> List[UsbDevice]:
+        """Parse lsusb output."""
         devices = []
-        
-        try:
-            # Get device information using lsusb
-            result = subprocess.run(["lsusb"], capture_output=True, text=True, check=True)
-            
-            # Parse lsusb output
-            pattern = r'Bus (\d+) Device (\d+): ID (\w+):(\w+) (.*)'
-            
-            for line in result.stdout.strip().split('\n'):
-                match = re.match(pattern, line)
-                if match:
-                    bus, device_num, vendor_id, product_id, description = match.groups()
-                    
-                    devices.append({
-                        'name': description,
-                        'type': 'USB',
-                        'bus': bus,
-                        'device': device_num,
-                        'vendor_id': vendor_id,
-                        'product_id': product_id,
-                        'connected': True
-                    })
-        except Exception as e:
-            print(f"Error scanning Linux devices: {e}")
-        
+        pattern = r'Bus (\d+) Device (\d+): ID (\w+):(\w+) (.*)'
+
+        for line in stdout.strip().split('\n'):
+            match = re.match(pattern, line)
+            if match:
+                bus, device_num, vendor_id, product_id, description = match.groups()
+
+                devices.append(UsbDevice(
+                    name=description,
+                    bus=bus,
+                    device=device_num,
+                    vendor_id=vendor_id,
+                    product_id=product_id
+                ))
         return devices
     
-    def get_network_adapters(self) -> List[Dict[str, Any]]:
-        """Get information about network adapters."""
-        if self.system == "Windows":
-            return self._get_windows_network()
-        elif self.system == "Darwin":  # macOS
-            return self._get_macos_network()
-        elif self.system == "Linux":
-            return self._get_linux_network()
-        else:
-            return []
-    
-    def _get_windows_network(self) -> List[Dict[str, Any]]:
+    def get_network_adapters(self, force: bool = False) -> List[NetworkAdapter]:
+        """Get information about network adapters.
+
+        Args:
+            force: Skip the cache and scan again.
+
+        Returns:
+            List of NetworkAdapter records.
+
+        Raises:
+            The backend's error if the scan failed; see scan().
+        """
+        return self.scan('network', force)
+
+    def _get_windows_network(self) -> List[NetworkAdapter]:
         """Get network adapters on Windows."""
+        # PowerShell command to get network adapters
+        cmd = "Get-NetAdapter | Select-Object Name, InterfaceDescription, Status, MacAddress, LinkSpeed | ConvertTo-Json"
+        stdout = self._run_powershell(cmd)
+        return self._parse_unless_unchanged('powershell_network', fingerprint.digest(stdout),
+                                            lambda: self._parse_windows_network(stdout))
+
+    @staticmethod
+    def _parse_windows_network(stdout: str) -> List[NetworkAdapter]:
+        """Parse Get-NetAdapter JSON output."""
         adapters = []
-        
-        try:
-            # PowerShell command to get network adapters
-            cmd = "Get-NetAdapter | Select-Object Name, InterfaceDescription, Status, MacAddress, LinkSpeed | ConvertTo-Json"
-            result = subprocess.run(["powershell", "-Command", cmd], 
-                                   capture_output=True, text=True, check=True)
-            
-            if result.stdout.strip():
-                import json
-                # PowerShell might return a single object or an array
-                output = json.loads(result.stdout)
-                
-                # Ensure we have a list
-                if isinstance(output, dict):
-                    output = [output]
-                
-                for adapter in output:
-                    adapters.append({
-                        'name': adapter.get('Name', 'Unknown Adapter'),
-                        'description': adapter.get('InterfaceDescription', ''),
-                        'status': adapter.get('Status', 'Unknown'),
-                        'mac_address': adapter.get('MacAddress', ''),
-                        'speed': adapter.get('LinkSpeed', ''),
-                        'connected': adapter.get('Status') == 'Up'
-                    })
-        except Exception as e:
-            print(f"Error getting Windows network adapters: {e}")
-        
+        if stdout.strip():
+            import json
+            # PowerShell might return a single object or an array
+            output = json.loads(stdout)
+
+            # Ensure we have a list
+            if isinstance(output, dict):
+                output = [output]
+
+            for adapter in output:
+                adapters.append(NetworkAdapter(
+                    name=adapter.get('Name') or 'Unknown Adapter',
+                    description=adapter.get('InterfaceDescription') or '',
+                    status=adapter.get('Status') or 'Unknown',
+                    mac_address=adapter.get('MacAddress') or '',
+                    speed=adapter.get('LinkSpeed') or '',
+                    connected=adapter.get('Status') == 'Up'
+                ))
         return adapters
     
-    def _get_macos_network(self) -> List[Dict[str, Any]]:
-        """Get network adapters on macOS."""
-        adapters = []
-        
+    def _get_macos_network(self) -> List[NetworkAdapter]:
+        """Get network adapters on macOS.
+
+        `networksetup -listallhardwareports` and `ifconfig -a` run side by side
+        and are joined on the BSD device name, so a refresh costs two processes
+        however many adapters there are.
+        """
+        ports_output, ifconfig_output = self._run_commands_parallel([
+            ["networksetup", "-listallhardwareports"],
+            ["ifconfig", "-a"]
+        ])
+        if not ports_output.strip():
+            return []
+        return self._parse_unless_unchanged(
+            'macos_network', fingerprint.digest_all((ports_output, ifconfig_output)),
+            lambda: [NetworkAdapter.from_dict(adapter) for adapter in macos.join_adapters(
+                macos.parse_networksetup_ports(ports_output), macos.parse_ifconfig(ifconfig_output))])
+
+    def _run_command(self, command: List[str]) -> str:
+        """Run a command and return its stdout; raises CalledProcessError on failure."""
+        with self.metrics.span(f"command.{command[0]}"):
+            with self.metrics.span(f"spawn.{command[0]}"):
+                process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            stdout, _ = process.communicate()
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command)
+        return stdout
+
+    @contextlib.contextmanager
+    def _stream_command(self, command: List[str]) -> Iterator[TextIO]:
+        """Run a command and yield its stdout as a text stream.
+
+        Raises CalledProcessError if the command fails after its output was read.
+        """
+        with self.metrics.span(f"spawn.{command[0]}"):
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
         try:
-            # Get network interfaces using networksetup
-            result = subprocess.run(["networksetup", "-listallhardwareports"], 
-                                   capture_output=True, text=True, check=True)
-            
-            if result.stdout.strip():
-                current_adapter = {}
-                
-                for line in result.stdout.strip().split('\n'):
-                    if line.startswith("Hardware Port:"):
-                        # Start a new adapter
-                        if current_adapter:
-                            adapters.append(current_adapter)
-                        current_adapter = {'name': line.split(": ")[1], 'connected': False}
-                    elif line.startswith("Device:"):
-                        current_adapter['device'] = line.split(": ")[1]
-                    elif line.startswith("Ethernet Address:"):
-                        current_adapter['mac_address'] = line.split(": ")[1]
-                
-                # Add the last adapter
-                if current_adapter:
-                    adapters.append(current_adapter)
-                
-                # Get status information for each adapter
-                for adapter in adapters:
-                    if 'device' in adapter:
-                        result = subprocess.run(["ifconfig", adapter['device']], 
-                                              capture_output=True, text=True, check=False)
-                        adapter['connected'] = "status: active" in result.stdout.lower()
-        except Exception as e:
-            print(f"Error getting macOS network adapters: {e}")
-        
-        return adapters
+            yield process.stdout
+            # Drain what the reader did not need so the command can exit
+            process.stdout.read()
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            process.wait()
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command)
+
+    def _run_commands_parallel(self, commands: List[List[str]]) -> List[str]:
+        """Start all commands at once and return their stdout, in order.
+
+        Raises CalledProcessError for the first command that failed, once
+        all of them have exited.
+        """
+        name = "+".join(command[0] for command in commands)
+        with self.metrics.span(f"command.{name}"):
+            with self.metrics.span(f"spawn.{name}"):
+                processes = [subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                             for command in commands]
+            outputs = []
+            for process in processes:
+                stdout, _ = process.communicate()
+                outputs.append(stdout)
+        for command, process in zip(commands, processes):
+            if process.returncode:
+                raise subprocess.CalledProcessError(process.returncode, command)
+        return outputs
     
-    def _get_linux_network(self) -> List[Dict[str, Any]]:
-        """Get network adapters on Linux."""
+    def _get_linux_network(self) -> List[NetworkAdapter]:
+        """Get network adapters on Linux.
+
+        Uses an rtnetlink dump when available and falls back to `ip addr`.
+        Speed, duplex and MTU are filled in from /sys/class/net. Speed and
+        duplex only change when a link renegotiates, which also changes its
+        state in the dump, so an unchanged dump skips the sysfs reads too.
+        """
+        try:
+            with self.metrics.span("command.netlink"):
+                data = netlink.dump_rtnetlink()
+            return self._parse_unless_unchanged(
+                'netlink', netlink.rtnetlink_fingerprint(data),
+                lambda: self._linux_adapters(netlink.parse_rtnetlink_dump(data)))
+        except (OSError, AttributeError) as e:
+            # AttributeError: socket.AF_NETLINK is missing on non-Linux builds
+            print(f"Netlink unavailable, falling back to ip addr: {e}")
+        return self._get_linux_ip_network()
+
+    def _get_linux_ip_network(self) -> List[NetworkAdapter]:
+        """Get network adapters on Linux using ip addr."""
+        stdout = self._run_command(["ip", "addr"])
+        # Address lifetimes count down between runs; leave them out
+        stable = [line for line in stdout.splitlines() if not line.lstrip().startswith('valid_lft')]
+        return self._parse_unless_unchanged(
+            'ip_addr', fingerprint.digest('\n'.join(stable)),
+            lambda: self._linux_adapters(self._parse_ip_addr(stdout)))
+
+    def _linux_adapters(self, adapters: List[Dict[str, Any]]) -> List[NetworkAdapter]:
+        """Fill in link details and PCI names from sysfs and build the NetworkAdapter records."""
+        with self.metrics.span("sysfs.link_details"):
+            for adapter in adapters:
+                details = netlink.read_sysfs_link_details(adapter['name'], self.sysfs_root)
+                adapter['speed'] = details['speed']
+                adapter['duplex'] = details['duplex']
+                if not adapter.get('mtu') and details['mtu']:
+                    adapter['mtu'] = int(details['mtu'])
+                if not adapter.get('description'):
+                    vendor_id, device_id = netlink.read_sysfs_pci_ids(adapter['name'], self.sysfs_root)
+                    if vendor_id:
+                        names = (self.ids.pci_vendor(vendor_id), self.ids.pci_device(vendor_id, device_id))
+                        adapter['description'] = ' '.join(name for name in names if name)
+
+        return [NetworkAdapter.from_dict(adapter) for adapter in adapters]
+
+    @staticmethod
+    def _parse_ip_addr(stdout: str) -> List[Dict[str, Any]]:
+        """Parse `ip addr` output into adapter dictionaries."""
         adapters = []
         
-        try:
-            # Run ip addr to get network interfaces
-            result = subprocess.run(["ip", "addr"], capture_output=True, text=True, check=True)
+        if stdout.strip():
+            current_device = None
             
-            if result.stdout.strip():
-                current_device = None
-                
-                for line in result.stdout.strip().split('\n'):
-                    if ': ' in line and not line.startswith(' '):
-                        # New interface section
-                        parts = line.split(': ')
-                        current_device = {
-                            'name': parts[1],
-                            'connected': 'UP' in line,
-                            'mac_address': ''
-                        }
-                        adapters.append(current_device)
-                    elif current_device and 'link/ether' in line:
-                        # MAC address line
-                        mac = line.split()[1]
-                        current_device['mac_address'] = mac
-        except Exception as e:
-            print(f"Error getting Linux network adapters: {e}")
+            for line in stdout.strip().split('\n'):
+                if ': ' in line and not line.startswith(' '):
+                    # New interface section
+                    parts = line.split(': ')
+                    fields = line.split()
+                    current_device = {
+                        'name': parts[1].split('@')[0],
+                        'connected': 'UP' in line,
+                        'mac_address': '',
+                        'mtu': int(fields[fields.index('mtu') + 1]) if 'mtu' in fields else 0,
+                        'ipv4_addresses': '',
+                        'ipv6_addresses': ''
+                    }
+                    adapters.append(current_device)
+                elif current_device and 'link/ether' in line:
+                    # MAC address line
+                    mac = line.split()[1]
+                    current_device['mac_address'] = mac
+                elif current_device and line.strip().startswith(('inet ', 'inet6 ')):
+                    family, address = line.split()[:2]
+                    key = 'ipv4_addresses' if family == 'inet' else 'ipv6_addresses'
+                    current_device[key] = ', '.join(filter(None, [current_device[key], address]))
         
         return adapters
+
+
+# Looked up by name so subclasses can override a backend method
+for _category, _platform, _method in (
+        ('usb', 'Windows', '_get_windows_devices'),
+        ('usb', 'Darwin', '_get_macos_devices'),
+        ('usb', 'Linux', '_get_linux_devices'),
+        ('network', 'Windows', '_get_windows_network'),
+        ('network', 'Darwin', '_get_macos_network'),
+        ('network', 'Linux', '_get_linux_network')):
+    default_registry.register(_category, _platform, operator.methodcaller(_method), name=_method.lstrip('_'))
@@ -0,0 +1,288 @@
+"""OpenMetrics endpoint for device inventory and interface state.
+
+    python -m core --serve-metrics 0.0.0.0:9733
+
+A background thread reads the DeviceScanner every interval and re-renders
+only what changed. USB counts are rebuilt only when the device list
+changed, and each adapter's lines are cached per record. The finished
+bodies, plain and gzip-compressed, are swapped in whole. A scrape returns
+the last body and never scans, renders or takes a lock, so any number of
+scrapers cost no more than serving a static file.
+
+Scans are bounded by their category's timeout. A category whose scan failed
+or timed out keeps its last series; the failure shows in
+device_monitor_scan_errors_total and in a last-success timestamp that stops
+advancing.
+"""
+import gzip
+import operator
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+DEFAULT_PORT = 9733
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+TEXT_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_SPEED = re.compile(r'^\s*([\d.]+)\s*([kKMGT]?)(?:b/s|bps|bit/s)\s*$')
+_SPEED_SCALE = {'': 1, 'k': 1e3, 'K': 1e3, 'M': 1e6, 'G': 1e9, 'T': 1e12}
+_WINDOWS_VID = re.compile(r'VID_([0-9A-Fa-f]{4})')
+
+
+def escape_label(value) -> str:
+    """Escape a label value for the exposition format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def parse_link_speed(text: str) -> Optional[float]:
+    """Parse "1000 Mb/s" (Linux) or "1 Gbps" (Windows) into bits per second; None if unknown."""
+    match = _SPEED.match(text or '')
+    if not match:
+        return None
+    return float(match.group(1)) * _SPEED_SCALE[match.group(2)]
+
+
+def usb_vendor_id(device) -> str:
+    """Vendor id of a UsbDevice; on Windows it is only part of the instance id."""
+    if device.vendor_id:
+        return device.vendor_id.lower()
+    match = _WINDOWS_VID.search(device.id or '')
+    return match.group(1).lower() if match else ''
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+class OpenMetricsRenderer:
+    """Builds the exposition text from scan results, reusing what did not change."""
+
+    def __init__(self):
+        self._records = {}
+        # Category -> (OpenMetrics, text format) lines of its own families
+        self._sections = {}
+        # Category -> its line of the shared device count family, for
+        # categories without families of their own
+        self._counts = {}
+        # Adapter key -> (record, (up line, speed line, info line))
+        self._adapter_lines = {}
+        self.renders = {}
+
+    def update(self, category: str, records: list) -> bool:
+        """Take a category's latest records; returns True if its section was re-rendered."""
+        previous = self._records.get(category)
+        if previous is not None and len(previous) == len(records) and all(map(operator.is_, previous, records)):
+            # The scanner's fingerprint stage handed back the same records
+            return False
+        self._records[category] = records
+        if category == 'usb':
+            self._sections[category] = self._render_usb(records)
+        elif category == 'network':
+            self._sections[category] = self._render_network(records)
+        else:
+            self._counts[category] = f'device_monitor_devices{{category="{escape_label(category)}"}} {len(records)}\n'
+        self.renders[category] = self.renders.get(category, 0) + 1
+        return True
+
+    @staticmethod
+    def _render_usb(devices) -> Tuple[str, str]:
+        counts = {}
+        for device in devices:
+            labels = (usb_vendor_id(device), device.manufacturer, device.type)
+            counts[labels] = counts.get(labels, 0) + 1
+        lines = ["# TYPE device_monitor_usb_devices gauge\n"
+                 "# HELP device_monitor_usb_devices Connected USB devices by vendor and type.\n"]
+        for (vendor_id, manufacturer, device_type), count in sorted(counts.items()):
+            lines.append(f'device_monitor_usb_devices{{vendor_id="{escape_label(vendor_id)}",'
+                         f'manufacturer="{escape_label(manufacturer)}",type="{escape_label(device_type)}"}} {count}\n')
+        text = ''.join(lines)
+        return text, text
+
+    def _render_network(self, adapters) -> Tuple[str, str]:
+        cache = {}
+        up, speed, info = [], [], []
+        for adapter in adapters:
+            cached = self._adapter_lines.get(adapter.key)
+            if cached is None or cached[0] is not adapter:
+                cached = (adapter, self._adapter_lines_for(adapter))
+            cache[adapter.key] = cached
+            up.append(cached[1][0])
+            speed.append(cached[1][1])
+            info.append(cached[1][2])
+        self._adapter_lines = cache
+        common = ("# TYPE device_monitor_network_adapter_up gauge\n"
+                  "# HELP device_monitor_network_adapter_up Whether the adapter is up (1) or down (0).\n"
+                  + ''.join(up) +
+                  "# TYPE device_monitor_network_adapter_speed_bytes gauge\n"
+                  "# HELP device_monitor_network_adapter_speed_bytes Link speed in bytes per second, "
+                  "where the driver reports one.\n"
+                  + ''.join(speed))
+        help_line = "Adapter details; the value is always 1.\n"
+        # Info families exist only in OpenMetrics; the 0.0.4 text format calls them gauges
+        openmetrics = (common + "# TYPE device_monitor_network_adapter info\n"
+                       "# HELP device_monitor_network_adapter " + help_line + ''.join(info))
+        text = (common + "# TYPE device_monitor_network_adapter_info gauge\n"
+                "# HELP device_monitor_network_adapter_info " + help_line + ''.join(info))
+        return openmetrics, text
+
+    @staticmethod
+    def _adapter_lines_for(adapter) -> Tuple[str, str, str]:
+        name = escape_label(adapter.device or adapter.name)
+        up = f'device_monitor_network_adapter_up{{adapter="{name}"}} {int(bool(adapter.connected))}\n'
+        bits = parse_link_speed(adapter.speed)
+        speed = (f'device_monitor_network_adapter_speed_bytes{{adapter="{name}"}} {_number(bits / 8)}\n'
+                 if bits else '')
+        info = (f'device_monitor_network_adapter_info{{adapter="{name}",'
+                f'display_name="{escape_label(adapter.name)}",'
+                f'mac_address="{escape_label(adapter.mac_address)}",'
+                f'status="{escape_label(adapter.status)}",duplex="{escape_label(adapter.duplex)}",'
+                f'mtu="{adapter.mtu}"}} 1\n')
+        return up, speed, info
+
+    def render(self, scan_times: Dict[str, float],
+               scan_errors: Optional[Dict[str, int]] = None) -> Tuple[bytes, bytes]:
+        """Return the (OpenMetrics, text format) bodies from the current sections.
+
+        Args:
+            scan_times: Category -> Unix time of its last successful scan.
+            scan_errors: Category -> number of failed or timed-out scans.
+        """
+        scan_errors = scan_errors or {}
+        footer = ["# TYPE device_monitor_last_scan_timestamp_seconds gauge\n"
+                  "# HELP device_monitor_last_scan_timestamp_seconds Unix time of the last successful scan.\n"]
+        for category, timestamp in sorted(scan_times.items()):
+            footer.append(f'device_monitor_last_scan_timestamp_seconds{{category="{escape_label(category)}"}} '
+                          f'{timestamp:.3f}\n')
+        errors = []
+        for category in sorted(set(scan_times).union(scan_errors)):
+            errors.append(f'device_monitor_scan_errors_total{{category="{escape_label(category)}"}} '
+                          f'{scan_errors.get(category, 0)}\n')
+        help_line = "Scans that failed or timed out; the category keeps its last series.\n"
+        # OpenMetrics names the counter family without the _total suffix of its sample
+        openmetrics_footer = ''.join(footer) + ("# TYPE device_monitor_scan_errors counter\n"
+                                                "# HELP device_monitor_scan_errors " + help_line + ''.join(errors))
+        footer = ''.join(footer) + ("# TYPE device_monitor_scan_errors_total counter\n"
+                                    "# HELP device_monitor_scan_errors_total " + help_line + ''.join(errors))
+        sections = list(self._sections.values())
+        if self._counts:
+            counts = ("# TYPE device_monitor_devices gauge\n"
+                      "# HELP device_monitor_devices Detected devices by category.\n"
+                      + ''.join(self._counts.values()))
+            sections.append((counts, counts))
+        openmetrics = ''.join(section[0] for section in sections) + openmetrics_footer + "# EOF\n"
+        text = ''.join(section[1] for section in sections) + footer
+        return openmetrics.encode('utf-8'), text.encode('utf-8')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a scraper polling every second reuses its connection
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+        compressed = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = self.server.exporter.payloads[openmetrics, compressed]
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else TEXT_CONTENT_TYPE)
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    """Serves OpenMetrics built from the latest DeviceScanner results over HTTP."""
+
+    def __init__(self, scanner, address: Tuple[str, int] = ("127.0.0.1", DEFAULT_PORT),
+                 categories=None, interval: float = 5.0):
+        """
+        Args:
+            scanner: DeviceScanner to read; its result cache is shared with
+                any other user of the same scanner.
+            address: (host, port) to listen on; port 0 picks a free one.
+            categories: Categories to export; the scanner's categories if None.
+            interval: Seconds between inventory refreshes.
+        """
+        self.scanner = scanner
+        self.categories = tuple(categories if categories is not None else scanner.categories())
+        self.interval = interval
+        self.renderer = OpenMetricsRenderer()
+        self.scan_times = {}
+        self.scan_errors = {}
+        self.refreshes = 0
+        # (openmetrics, gzip) -> body; replaced as a whole so scrapes never lock
+        self.payloads = self._encode(*self.renderer.render({}))
+        self.server = ThreadingHTTPServer(address, _MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.exporter = self
+        self.address = self.server.server_address
+        self._stop = threading.Event()
+        self._threads = []
+
+    @staticmethod
+    def _encode(openmetrics: bytes, text: bytes) -> Dict[Tuple[bool, bool], bytes]:
+        return {
+            (True, False): openmetrics,
+            (False, False): text,
+            (True, True): gzip.compress(openmetrics, compresslevel=6, mtime=0),
+            (False, True): gzip.compress(text, compresslevel=6, mtime=0),
+        }
+
+    def refresh(self):
+        """Read the scanner once and publish new bodies.
+
+        The categories are scanned concurrently, each within its timeout.
+        A category that failed keeps its last series and has its error
+        count raised.
+        """
+        for category, records, error in self.scanner.scan_concurrently(self.categories):
+            if error is not None:
+                print(f"Error refreshing exported metrics for {category}: {error}")
+                self.scan_errors[category] = self.scan_errors.get(category, 0) + 1
+                continue
+            self.renderer.update(category, records)
+            self.scan_times[category] = time.time()
+        self.payloads = self._encode(*self.renderer.render(self.scan_times, self.scan_errors))
+        self.refreshes += 1
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        """Refresh once, then serve and keep refreshing on background threads."""
+        self.refresh()
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._refresh_loop, name="metrics-refresh", daemon=True),
+            threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.server.shutdown()
+        self.server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        self._threads = []
+
+    def serve_forever(self):
+        """Run in the foreground until interrupted."""
+        self.start()
+        try:
+            while not self._stop.wait(3600):
+                pass
+        finally:
+            self.stop()
@@ -0,0 +1,53 @@
+"""Cheap fingerprints of raw scan input.
+
+A backend fingerprints what it read (command output, a netlink dump, a
+sysfs listing) before parsing it. When the fingerprint equals the one of
+the previous scan, the previous records are reused and parsing is skipped;
+see DeviceScanner._parse_unless_unchanged(). Output that is parsed as it
+is read is digested on the way through (DigestingReader), and the new
+records are dropped in favour of the previous ones if it was unchanged.
+"""
+import hashlib
+from typing import Iterable, TextIO, Union
+
+
+def digest(data: Union[str, bytes]) -> bytes:
+    """Return a 128-bit BLAKE2b digest of data."""
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogatepass')
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def digest_all(parts: Iterable[Union[str, bytes]]) -> bytes:
+    """Return one digest over several pieces, as if they were concatenated with separators."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8', 'surrogatepass')
+        h.update(len(part).to_bytes(8, 'little'))
+        h.update(part)
+    return h.digest()
+
+
+class DigestingReader:
+    """Read-only text stream that digests the text of another as it is read.
+
+    A streaming parser reads through it; digest() then reads whatever the
+    parser left and returns the digest of the whole stream. The text is
+    never held in memory as a whole.
+    """
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._hash = hashlib.blake2b(digest_size=16)
+
+    def read(self, size: int = -1) -> str:
+        data = self._stream.read(size)
+        self._hash.update(data.encode('utf-8', 'surrogatepass'))
+        return data
+
+    def digest(self, chunk_size: int = 65536) -> bytes:
+        """Read the stream to the end and return the digest of everything read."""
+        while self.read(chunk_size):
+            pass
+        return self._hash.digest()
@@ -0,0 +1,542 @@
+"""Fleet mode: agents push inventory changes to a collector over TCP.
+
+Every message is one compact JSON object on its own line. An agent opens
+its connection with
+
+    {"type": "hello", "host": "lab-042", "session": "9f2c61d0a4b7e8f3", "seq": 17}
+
+and the collector answers with the last sequence number it applied from
+that agent session, or null if it does not know the session:
+
+    {"type": "welcome", "seq": 15}
+
+The agent resends its messages after that number from a bounded log, or
+sends a snapshot of every category if the log does not reach back far
+enough or the session is unknown. From then on it sends one message per
+category that changed between two scans:
+
+    {"type": "delta", "seq": 18, "category": "usb",
+     "added": [record, ...], "changed": [record, ...], "removed": [key, ...]}
+    {"type": "snapshot", "seq": 19, "category": "usb", "records": [record, ...]}
+
+A record is the record's to_dict() plus its identity key under "key".
+A category whose scan failed is left out until it scans again, so a
+broken backend is not reported as every device being removed. An agent
+that has sent nothing for a while sends an unnumbered
+
+    {"type": "heartbeat"}
+
+and the collector drops agent connections that stay silent for longer than
+its agent timeout, showing their hosts as disconnected.
+
+Clients (the CLI, a GUI) send {"type": "snapshot"} for the merged state of
+all hosts, or {"type": "subscribe"} for that state followed by every
+change, numbered by the collector:
+
+    {"type": "state", "seq": 120, "hosts": {"lab-042": {"connected": true, "usb": [...], "network": [...]}}}
+    {"type": "change", "seq": 121, "time": 1760000000.0, "host": "lab-042", "category": "usb",
+     "added": [...], "changed": [...], "removed": [...]}
+    {"type": "host", "seq": 122, "time": 1760000000.0, "host": "lab-042", "connected": false}
+
+Collector state is held in memory only.
+"""
+import asyncio
+import json
+import os
+import random
+import socket
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .records import diff_records
+
+DEFAULT_PORT = 7640
+# Longest accepted line; a snapshot of a large hub tree can exceed asyncio's 64 KiB default
+LINE_LIMIT = 16 * 1024 * 1024
+
+
+def encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def record_data(record) -> Dict[str, Any]:
+    """Wire form of a record: its fields plus its identity key."""
+    data = record.to_dict()
+    data['key'] = record.key
+    return data
+
+
+def apply_change(hosts: Dict[str, Dict[str, Any]], message: Dict[str, Any]):
+    """Apply a collector "change" or "host" message to a client-side copy of the state.
+
+    Args:
+        hosts: The "hosts" dictionary of a "state" message, updated in place.
+        message: A message received after that state.
+    """
+    host = hosts.setdefault(message['host'], {'connected': False})
+    if message['type'] == 'host':
+        host['connected'] = message['connected']
+        return
+    records = {record['key']: record for record in host.get(message['category'], [])}
+    for key in message['removed']:
+        records.pop(key, None)
+    for record in message['added'] + message['changed']:
+        records[record['key']] = record
+    host[message['category']] = list(records.values())
+
+
+class FleetAgent:
+    """Scans this machine on an interval and pushes the changes to a collector.
+
+    The agent reconnects with exponential backoff when the connection
+    drops. Messages are kept in a bounded log, so after a reconnect only
+    those the collector did not apply are sent again.
+    """
+
+    def __init__(self, address: Tuple[str, int], scanner=None, host: Optional[str] = None,
+                 categories=None, interval: float = 2.0, log_size: int = 1000,
+                 retry_max: float = 30.0, heartbeat: float = 15.0):
+        """
+        Args:
+            address: Collector (host, port).
+            scanner: DeviceScanner used by scan().
+            host: Name reported to the collector; defaults to the hostname.
+            categories: Categories to scan; the scanner's categories if None.
+            interval: Seconds between scans.
+            log_size: Sent messages kept for resending after a reconnect.
+            retry_max: Longest wait between connection attempts, in seconds.
+            heartbeat: Longest silence towards the collector, in seconds;
+                keep it well below the collector's agent timeout.
+        """
+        self.address = address
+        self.scanner = scanner
+        self.host = host or socket.gethostname()
+        self.categories = tuple(categories) if categories is not None else None
+        self.interval = interval
+        self.retry_max = retry_max
+        self.heartbeat = heartbeat
+        # A new session per process: a restarted agent has no log to replay from
+        self.session = os.urandom(8).hex()
+        self.seq = 0
+        self.inventory = {}
+        self.connected = False
+        self.stats = {'connects': 0, 'deltas': 0, 'snapshots': 0, 'replayed': 0, 'heartbeats': 0}
+        self._log = deque(maxlen=log_size)
+        self._writer = None
+        self._last_sent = 0.0
+        self._snapshot_pending = False
+
+    async def scan(self) -> Dict[str, list]:
+        """Return the current records by category.
+
+        Runs the scanner on the default executor; override to supply
+        inventories from elsewhere, e.g. for simulated agents. Categories
+        whose scan failed or timed out are left out.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self._scan_blocking)
+
+    def _scan_blocking(self) -> Dict[str, list]:
+        inventory = {}
+        for category, records, error in self.scanner.scan_concurrently(self.categories, force=True):
+            if error is not None:
+                print(f"Error scanning {category}: {error}")
+            else:
+                inventory[category] = records
+        return inventory
+
+    async def run(self):
+        """Scan and push changes until cancelled."""
+        delay = min(1.0, self.retry_max)
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(*self.address, limit=LINE_LIMIT)
+            except OSError:
+                # Spread out reconnects when many agents lose the collector at once
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, self.retry_max)
+                continue
+            self.stats['connects'] += 1
+            try:
+                await self._resync(reader, writer)
+                self.connected = True
+                delay = min(1.0, self.retry_max)
+                while True:
+                    await self.push()
+                    if not await self._wait(reader, asyncio.get_running_loop().time() + self.interval):
+                        break
+            except (OSError, ValueError, KeyError, asyncio.IncompleteReadError) as e:
+                print(f"Error in fleet agent connection: {e}")
+            finally:
+                self.connected = False
+                self._writer = None
+                writer.close()
+
+    async def _wait(self, reader, deadline: float) -> bool:
+        """Send heartbeats until the loop time reaches deadline.
+
+        Returns:
+            False if the collector closed the connection.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return True
+            # The collector never sends after the welcome; a read
+            # completing early means it closed the connection
+            try:
+                if not await asyncio.wait_for(reader.read(1), min(remaining, self.heartbeat)):
+                    return False
+            except asyncio.TimeoutError:
+                pass
+            await self._send_heartbeat()
+
+    async def _send_heartbeat(self):
+        """Tell the collector the agent is alive if nothing was sent for a heartbeat interval."""
+        if self._writer is None or time.monotonic() - self._last_sent < self.heartbeat:
+            return
+        self._writer.write(encode({'type': 'heartbeat'}))
+        self._last_sent = time.monotonic()
+        self.stats['heartbeats'] += 1
+        await self._writer.drain()
+
+    async def _resync(self, reader, writer):
+        """Say hello and bring the collector up to date from its acknowledged sequence number."""
+        writer.write(encode({'type': 'hello', 'host': self.host, 'session': self.session, 'seq': self.seq}))
+        await writer.drain()
+        line = await reader.readline()
+        if not line:
+            raise ConnectionResetError("collector closed the connection")
+        welcome = json.loads(line)
+        if welcome.get('type') != 'welcome':
+            raise ValueError(f"unexpected message {welcome.get('type')!r}")
+        acked = welcome['seq']
+        self._writer = writer
+        self._last_sent = time.monotonic()
+        if acked is not None and acked <= self.seq and (
+                acked == self.seq or (self._log and self._log[0][0] <= acked + 1)):
+            for seq, data in self._log:
+                if seq > acked:
+                    writer.write(data)
+                    self.stats['replayed'] += 1
+        else:
+            # Unknown session, or too far behind: send everything again
+            self._snapshot_pending = True
+            self._send_snapshots()
+        await writer.drain()
+
+    def _send_snapshots(self):
+        if not self.inventory:
+            # Nothing scanned yet; the first scan is sent as snapshots
+            return
+        for category, records in self.inventory.items():
+            self._send({'type': 'snapshot', 'category': category,
+                        'records': [record_data(record) for record in records]})
+            self.stats['snapshots'] += 1
+        self._snapshot_pending = False
+
+    def _send(self, message: Dict[str, Any]):
+        """Number a message, log it and write it if connected."""
+        self.seq += 1
+        message['seq'] = self.seq
+        data = encode(message)
+        self._log.append((self.seq, data))
+        if self._writer is not None:
+            self._writer.write(data)
+            self._last_sent = time.monotonic()
+
+    async def push(self):
+        """Scan once and send a delta for every category that changed.
+
+        A category missing from the scan keeps its last inventory.
+        """
+        inventory = await self.scan()
+        if self._snapshot_pending:
+            self.inventory.update(inventory)
+            self._send_snapshots()
+        else:
+            for category, records in inventory.items():
+                added, removed, changed = diff_records(self.inventory.get(category, []), records)
+                self.inventory[category] = records
+                if added or removed or changed:
+                    self._send({'type': 'delta', 'category': category,
+                                'added': [record_data(record) for record in added],
+                                'changed': [record_data(record) for record in changed],
+                                'removed': [record.key for record in removed]})
+                    self.stats['deltas'] += 1
+        if self._writer is not None:
+            await self._writer.drain()
+            await self._send_heartbeat()
+
+
+class _HostState:
+    """What the collector knows about one agent host."""
+
+    __slots__ = ('session', 'seq', 'inventories', 'writer')
+
+    def __init__(self):
+        self.session = None
+        self.seq = 0
+        self.inventories = {}
+        self.writer = None
+
+
+class FleetCollector:
+    """asyncio TCP server merging the inventories of many agents.
+
+    Agents and clients connect to the same port; the first message of a
+    connection tells them apart.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, client_queue_size: int = 10000,
+                 agent_timeout: Optional[float] = 60.0):
+        """
+        Args:
+            host: Address to listen on.
+            port: Port to listen on; 0 picks a free one (see self.port after start()).
+            client_queue_size: Messages buffered per subscriber before a
+                subscriber that does not keep up is disconnected.
+            agent_timeout: Seconds an agent may stay silent before its
+                connection is dropped and its host shown as disconnected;
+                None waits forever.
+        """
+        self.host = host
+        self.port = port
+        self.client_queue_size = client_queue_size
+        self.agent_timeout = agent_timeout
+        self.hosts = {}
+        self.seq = 0
+        self.stats = {'deltas': 0, 'snapshots': 0, 'duplicates': 0, 'gaps': 0, 'resyncs': 0, 'expired': 0}
+        self._subscribers = set()
+        self._connections = set()
+        self._server = None
+
+    async def start(self):
+        # A large backlog absorbs every agent reconnecting at once
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  limit=LINE_LIMIT, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and drop every connection."""
+        if self._server is not None:
+            self._server.close()
+        self.disconnect_agents()
+        for queue in list(self._subscribers):
+            self._end_subscription(queue)
+        # Let the connection handlers finish rather than leaving them to be cancelled
+        if self._connections:
+            await asyncio.wait(list(self._connections), timeout=5.0)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def disconnect_agents(self):
+        """Close every agent connection; the agents reconnect and resync."""
+        for state in self.hosts.values():
+            if state.writer is not None:
+                state.writer.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the merged state of all hosts as a "state" message."""
+        hosts = {}
+        for name, state in self.hosts.items():
+            host = {'connected': state.writer is not None}
+            for category, records in state.inventories.items():
+                host[category] = list(records.values())
+            hosts[name] = host
+        return {'type': 'state', 'seq': self.seq, 'hosts': hosts}
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            kind = message.get('type')
+            if kind == 'hello':
+                await self._serve_agent(message, reader, writer)
+            elif kind == 'snapshot':
+                writer.write(encode(self.snapshot()))
+                await writer.drain()
+            elif kind == 'subscribe':
+                await self._serve_subscriber(reader, writer)
+        except (OSError, ValueError, KeyError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            print(f"Error serving fleet connection: {e}")
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _serve_agent(self, hello, reader, writer):
+        name = hello['host']
+        state = self.hosts.get(name)
+        if state is None:
+            state = self.hosts[name] = _HostState()
+        if state.writer is not None:
+            # The agent reconnected before its old connection was noticed as dead
+            state.writer.close()
+        if state.session == hello['session']:
+            acked = state.seq
+            self.stats['resyncs'] += 1
+        else:
+            # New agent process: keep the old records until its snapshot
+            # replaces them, so unchanged devices do not flap for clients
+            state.session = hello['session']
+            state.seq = 0
+            acked = None
+        was_connected = state.writer is not None
+        state.writer = writer
+        writer.write(encode({'type': 'welcome', 'seq': acked}))
+        await writer.drain()
+        if not was_connected:
+            self._publish({'type': 'host', 'host': name, 'connected': True})
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.agent_timeout)
+                except asyncio.TimeoutError:
+                    self.stats['expired'] += 1
+                    print(f"Fleet agent {name} sent nothing for {self.agent_timeout:g} s; disconnecting it")
+                    break
+                if not line or not self._apply(name, state, json.loads(line)):
+                    break
+        finally:
+            if state.writer is writer:
+                state.writer = None
+                self._publish({'type': 'host', 'host': name, 'connected': False})
+
+    def _apply(self, name: str, state: _HostState, message: Dict[str, Any]) -> bool:
+        """Merge one agent message; returns False if the connection must be reset."""
+        if message['type'] == 'heartbeat':
+            return True
+        seq = message['seq']
+        if seq <= state.seq:
+            self.stats['duplicates'] += 1
+            return True
+        category = message['category']
+        records = state.inventories.setdefault(category, {})
+        if message['type'] == 'snapshot':
+            # Sequence numbers may jump: a snapshot replaces what was missed
+            new = {record['key']: record for record in message['records']}
+            added = [record for key, record in new.items() if key not in records]
+            changed = [record for key, record in new.items() if key in records and records[key] != record]
+            removed = [key for key in records if key not in new]
+            state.inventories[category] = new
+            self.stats['snapshots'] += 1
+        elif seq != state.seq + 1:
+            # A delta after a gap cannot be applied; reconnecting makes the
+            # agent resend from state.seq
+            self.stats['gaps'] += 1
+            return False
+        else:
+            added = []
+            changed = []
+            for record in message['added'] + message['changed']:
+                (changed if record['key'] in records else added).append(record)
+                records[record['key']] = record
+            removed = [key for key in message['removed'] if records.pop(key, None) is not None]
+            self.stats['deltas'] += 1
+        state.seq = seq
+        if added or changed or removed:
+            self._publish({'type': 'change', 'host': name, 'category': category,
+                           'added': added, 'changed': changed, 'removed': removed})
+        return True
+
+    def _publish(self, message: Dict[str, Any]):
+        """Number a change and queue it for every subscriber."""
+        self.seq += 1
+        if not self._subscribers:
+            return
+        message['seq'] = self.seq
+        message['time'] = time.time()
+        data = encode(message)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                print("Fleet subscriber is not keeping up; disconnecting it")
+                self._end_subscription(queue)
+
+    def _end_subscription(self, queue):
+        """Stop feeding a subscriber; its connection closes once the queue is drained."""
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def _serve_subscriber(self, reader, writer):
+        queue = asyncio.Queue(self.client_queue_size)
+        self._subscribers.add(queue)
+
+        def on_closed(_):
+            if queue in self._subscribers:
+                self._end_subscription(queue)
+
+        # Clients send nothing after subscribing; end when they disconnect
+        closed = asyncio.ensure_future(reader.read())
+        closed.add_done_callback(on_closed)
+        try:
+            writer.write(encode(self.snapshot()))
+            await writer.drain()
+            while True:
+                data = await queue.get()
+                if data is None:
+                    break
+                writer.write(data)
+                if queue.empty():
+                    await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
+            closed.cancel()
+
+
+async def fetch_snapshot(address: Tuple[str, int]) -> Dict[str, Any]:
+    """Return the collector's merged state ("state" message)."""
+    reader, writer = await asyncio.open_connection(*address, limit=LINE_LIMIT)
+    try:
+        writer.write(encode({'type': 'snapshot'}))
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+
+
+async def subscribe(address: Tuple[str, int]) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the collector's state, then every change message as it happens."""
+    reader, writer = await asyncio.open_connection(*address, limit=LINE_LIMIT)
+    try:
+        writer.write(encode({'type': 'subscribe'}))
+        await writer.drain()
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            yield json.loads(line)
+    finally:
+        writer.close()
+
+
+def merged_records(state: Dict[str, Any], categories=None) -> List[Dict[str, Any]]:
+    """Flatten a "state" message into records tagged with their host and category.
+
+    Args:
+        state: A "state" message.
+        categories: Categories to include; all of them if None.
+    """
+    rows = []
+    for host, inventories in sorted(state['hosts'].items()):
+        names = categories if categories is not None else [name for name in inventories if name != 'connected']
+        for category in names:
+            for record in inventories.get(category, []):
+                row = {'host': host, 'category': category}
+                row.update(record)
+                rows.append(row)
+    return rows
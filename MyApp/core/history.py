@@ -0,0 +1,263 @@
+"""SQLite store of device connect, disconnect and change events.
+
+Consecutive scans of a category are diffed by identity key and the
+transitions are appended to an events table:
+
+    devices(id, key, category, name)        one row per identity key
+    events(time, device_id, kind, data)     kind 0 = added, 1 = removed, 2 = changed
+
+data holds the record as JSON for added and changed events. The database
+runs in WAL mode; events are queued and written by a background thread in
+batches, so recording a scan never waits on the disk.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .backends import default_registry
+from .records import diff_records
+
+ADDED, REMOVED, CHANGED = 0, 1, 2
+EVENT_NAMES = {ADDED: 'added', REMOVED: 'removed', CHANGED: 'changed'}
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".device-monitor", "history.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    time REAL NOT NULL,
+    device_id INTEGER NOT NULL REFERENCES devices(id),
+    kind INTEGER NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS events_time ON events(time);
+CREATE INDEX IF NOT EXISTS events_device_time ON events(device_id, time);
+"""
+
+# Present-at-time test: the device's last event before the time is not a removal
+_LAST_KIND_BEFORE = ("(SELECT kind FROM events WHERE device_id = d.id AND time < ? "
+                     "ORDER BY time DESC, rowid DESC LIMIT 1)")
+
+
+class HistoryStore:
+    """Persistent device event history.
+
+    Each category's last recorded inventory is restored from the database on
+    first use, so a restart does not report every device as newly added.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, retention: Optional[float] = 30 * 86400,
+                 batch_size: int = 1000, flush_interval: float = 1.0):
+        """
+        Args:
+            path: Database file; ":memory:" keeps the history in memory.
+            retention: Seconds of history to keep when compact() runs (it also
+                runs on open); None keeps everything.
+            batch_size: Events written per transaction at most.
+            flush_interval: Seconds the writer waits to fill a batch.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.retention = retention
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+        self._device_ids = dict(self._db.execute("SELECT key, id FROM devices"))
+        self._inventories = {}
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+        self.compact()
+
+    # Recording
+
+    def record_scan(self, category: str, records: List[Any], timestamp: Optional[float] = None) -> int:
+        """Diff a scan against the category's previous one and queue the transitions.
+
+        Returns:
+            Number of events queued.
+        """
+        previous = self._inventories.get(category)
+        if previous is None:
+            previous = self._load_inventory(category)
+        added, removed, changed = diff_records(previous, records)
+        self._inventories[category] = list(records)
+
+        timestamp = time.time() if timestamp is None else timestamp
+        for kind, items in ((ADDED, added), (REMOVED, removed), (CHANGED, changed)):
+            for record in items:
+                self.record_event(category, record, kind, timestamp)
+        return len(added) + len(removed) + len(changed)
+
+    def record_event(self, category: str, record: Any, kind: int, timestamp: Optional[float] = None):
+        """Queue one event (ADDED, REMOVED or CHANGED) for the background writer."""
+        self._queue.put((time.time() if timestamp is None else timestamp, category, record, kind))
+
+    def flush(self):
+        """Block until every queued event has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write pending events and close the database."""
+        self._queue.put(None)
+        self._writer.join()
+        with self._db_lock:
+            self._db.close()
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._write_batch(batch)
+            except sqlite3.Error as e:
+                print(f"Error writing device history: {e}")
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        with self._db_lock:
+            self._db.execute("BEGIN")
+            try:
+                rows = []
+                for timestamp, category, record, kind in batch:
+                    device_id = self._device_ids.get(record.key)
+                    if device_id is None:
+                        device_id = self._db.execute(
+                            "INSERT INTO devices (key, category, name) VALUES (?, ?, ?)",
+                            (record.key, category, record.name)).lastrowid
+                        self._device_ids[record.key] = device_id
+                    data = None if kind == REMOVED else json.dumps(record.to_dict(), separators=(',', ':'))
+                    rows.append((timestamp, device_id, kind, data))
+                self._db.executemany("INSERT INTO events (time, device_id, kind, data) VALUES (?, ?, ?, ?)", rows)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                # Ids handed out in the failed transaction no longer exist
+                self._device_ids = dict(self._db.execute("SELECT key, id FROM devices"))
+                raise
+
+    def _load_inventory(self, category: str) -> List[Any]:
+        """Rebuild a category's last recorded inventory from its latest events."""
+        if category not in default_registry:
+            return []
+        record_type = default_registry.category(category).record_type
+        self.flush()
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT (SELECT data FROM events WHERE device_id = d.id ORDER BY time DESC, rowid DESC LIMIT 1) "
+                "FROM devices d WHERE d.category = ?", (category,)).fetchall()
+        return [record_type.from_dict(json.loads(data)) for (data,) in rows if data]
+
+    # Queries
+
+    def devices_seen(self, start: float, end: float, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the devices that were connected at any time between start and end.
+
+        A device counts if it had an event in the interval or was connected
+        when it began. Both tests are index lookups, so the cost grows with
+        the number of devices and of events in the interval, not with the
+        size of the history.
+
+        Returns:
+            List of dictionaries with key, category and name, ordered by key.
+        """
+        category_filter = " AND d.category = ?" if category else ""
+        in_range = ("SELECT d.key, d.category, d.name FROM devices d WHERE d.id IN "
+                    "(SELECT DISTINCT device_id FROM events WHERE time BETWEEN ? AND ?)" + category_filter)
+        at_start = ("SELECT d.key, d.category, d.name FROM devices d "
+                    f"WHERE {_LAST_KIND_BEFORE} IN ({ADDED}, {CHANGED})" + category_filter)
+        params = [start, end] + ([category] if category else []) + [start] + ([category] if category else [])
+        with self._db_lock:
+            rows = self._db.execute(f"{in_range} UNION {at_start} ORDER BY 1", params).fetchall()
+        return [{'key': key, 'category': cat, 'name': name} for key, cat, name in rows]
+
+    def timeline(self, key: str, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return one device's events, oldest first."""
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT e.time, e.kind, e.data FROM events e JOIN devices d ON d.id = e.device_id "
+                "WHERE d.key = ? AND e.time BETWEEN ? AND ? ORDER BY e.time, e.rowid",
+                (key, float('-inf') if start is None else start, float('inf') if end is None else end)).fetchall()
+        return [{'time': timestamp, 'event': EVENT_NAMES[kind], 'device': json.loads(data) if data else None}
+                for timestamp, kind, data in rows]
+
+    def event_count(self) -> int:
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    # Retention
+
+    def compact(self, before: Optional[float] = None) -> int:
+        """Delete events older than the retention window (or than before).
+
+        The last event of each device before the cutoff is kept when it
+        leaves the device connected, so devices_seen() and a restart still
+        know what was attached at the cutoff. Devices left without events
+        are deleted.
+
+        Returns:
+            Number of events deleted.
+        """
+        if before is None:
+            if self.retention is None:
+                return 0
+            before = time.time() - self.retention
+        self.flush()
+        with self._db_lock:
+            self._db.execute("BEGIN")
+            deleted = self._db.execute(
+                "DELETE FROM events WHERE time < ? AND rowid NOT IN ("
+                "SELECT last FROM (SELECT (SELECT e.rowid FROM events e WHERE e.device_id = d.id AND e.time < ? "
+                "ORDER BY e.time DESC, e.rowid DESC LIMIT 1) AS last FROM devices d) WHERE last IS NOT NULL)",
+                (before, before)).rowcount
+            # Keep only surviving events whose device is still connected at the cutoff
+            deleted += self._db.execute(
+                f"DELETE FROM events WHERE time < ? AND kind = {REMOVED}", (before,)).rowcount
+            self._db.execute("DELETE FROM devices WHERE id NOT IN (SELECT DISTINCT device_id FROM events)")
+            self._db.execute("COMMIT")
+            self._device_ids = dict(self._db.execute("SELECT key, id FROM devices"))
+            if deleted:
+                self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+
+def parse_time(value: str) -> float:
+    """Parse a Unix timestamp or an ISO 8601 date/time (local time if no zone)."""
+    try:
+        return float(value)
+    except ValueError:
+        from datetime import datetime
+        return datetime.fromisoformat(value).timestamp()
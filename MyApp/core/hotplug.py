@@ -0,0 +1,232 @@
+import errno
+import os
+import queue
+import socket
+import threading
+from typing import List, Dict, Callable, Optional
+
+from .records import UsbDevice
+
+# Kernel uevent multicast group (linux/netlink.h: NETLINK_KOBJECT_UEVENT)
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+
+
+def parse_uevent(data: bytes) -> Dict[str, str]:
+    """Parse a raw kernel uevent message into its environment dictionary.
+
+    Kernel messages look like "add@/devices/...\\0ACTION=add\\0DEVPATH=...\\0...".
+    Messages re-broadcast by udev (prefixed with "libudev") are ignored.
+
+    Returns:
+        Dictionary of uevent keys, or an empty dictionary if the message is
+        not a kernel uevent.
+    """
+    fields = data.split(b'\0')
+    if not fields or b'@' not in fields[0]:
+        return {}
+
+    event = {}
+    for field in fields[1:]:
+        key, sep, value = field.partition(b'=')
+        if sep:
+            event[key.decode('ascii', 'replace')] = value.decode('utf-8', 'replace')
+    return event
+
+
+class UeventSocket:
+    """Event source reading kernel uevents from a NETLINK_KOBJECT_UEVENT socket."""
+
+    def __init__(self, buffer_size: int = 1024 * 1024):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_size)
+        except OSError:
+            pass
+        self.sock.bind((0, UEVENT_KERNEL_GROUP))
+
+    def receive(self) -> bytes:
+        """Block until the next uevent arrives.
+
+        Raises:
+            OSError: with errno ENOBUFS when the kernel dropped events.
+        """
+        return self.sock.recv(65536)
+
+    def close(self):
+        self.sock.close()
+
+
+class QueueUeventSource:
+    """In-process event source for feeding synthetic uevent messages."""
+
+    _OVERFLOW = object()
+    _CLOSED = object()
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def push(self, data: bytes):
+        """Queue one raw uevent message."""
+        self._queue.put(data)
+
+    def push_overflow(self):
+        """Simulate the kernel dropping events (ENOBUFS)."""
+        self._queue.put(self._OVERFLOW)
+
+    def receive(self) -> bytes:
+        item = self._queue.get()
+        if item is self._OVERFLOW:
+            raise OSError(errno.ENOBUFS, os.strerror(errno.ENOBUFS))
+        if item is self._CLOSED:
+            raise OSError(errno.EBADF, "event source closed")
+        return item
+
+    def close(self):
+        self._queue.put(self._CLOSED)
+
+
+class UsbHotplugMonitor:
+    """Keeps a USB inventory current by applying kernel uevents incrementally.
+
+    A full scan is only done on start() and after the event source reports
+    an overflow; every other change is applied from a single add, remove or
+    change event.
+    """
+
+    def __init__(self, scanner, on_change: Optional[Callable[[List[UsbDevice]], None]] = None,
+                 source=None):
+        """
+        Args:
+            scanner: DeviceScanner used for full rescans and per-device sysfs reads.
+            on_change: Called from the monitor thread with the new device list
+                whenever the inventory changes.
+            source: Object with receive() and close(); defaults to a UeventSocket.
+        """
+        self.scanner = scanner
+        self.on_change = on_change
+        self.source = source
+        self.full_scans = 0
+        self._inventory = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Run the initial full scan and start listening for events.
+
+        The initial inventory is not passed to on_change; read it with devices().
+        If the initial scan fails, the event source is closed and the scan's
+        error is raised.
+        """
+        if self.source is None:
+            self.source = UeventSocket()
+        try:
+            self.resync(notify=False)
+        except BaseException:
+            self.source.close()
+            raise
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="usb-hotplug", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop listening and close the event source."""
+        self._running = False
+        if self.source is not None:
+            self.source.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def devices(self) -> List[UsbDevice]:
+        """Return a snapshot of the current inventory, ordered by identity key."""
+        with self._lock:
+            return [self._inventory[key] for key in sorted(self._inventory)]
+
+    def resync(self, notify: bool = True):
+        """Replace the inventory with a full scan.
+
+        If the scan raises, the inventory is left as it was.
+
+        Args:
+            notify: Call on_change with the new inventory.
+        """
+        devices = self.scanner.get_connected_devices(force=True)
+        with self._lock:
+            self._inventory = {device.key: device for device in devices}
+            self.full_scans += 1
+        if notify:
+            self._notify()
+
+    def handle_message(self, data: bytes) -> bool:
+        """Apply one raw uevent message to the inventory.
+
+        Returns:
+            True if the inventory changed.
+        """
+        event = parse_uevent(data)
+        if event.get('SUBSYSTEM') != 'usb' or event.get('DEVTYPE') != 'usb_device':
+            return False
+
+        action = event.get('ACTION')
+        port_path = os.path.basename(event.get('DEVPATH', ''))
+        if not port_path:
+            return False
+        key = UsbDevice.port_key(port_path)
+
+        with self._lock:
+            if action == 'remove':
+                changed = self._inventory.pop(key, None) is not None
+            elif action in ('add', 'change', 'bind'):
+                device = self._read_device(port_path, event)
+                changed = not device.same_as(self._inventory.get(key))
+                self._inventory[key] = device
+            else:
+                changed = False
+
+        if changed:
+            self._notify()
+        return changed
+
+    def _run(self):
+        while self._running:
+            try:
+                data = self.source.receive()
+            except OSError as e:
+                if not self._running:
+                    break
+                if e.errno == errno.ENOBUFS:
+                    # Events were dropped, so the inventory can no longer be trusted
+                    try:
+                        self.resync()
+                    except Exception as e:
+                        print(f"Error rescanning USB devices: {e}")
+                    continue
+                print(f"Error reading USB hotplug events: {e}")
+                break
+            try:
+                self.handle_message(data)
+            except Exception as e:
+                print(f"Error applying USB hotplug event: {e}")
+
+    def _read_device(self, port_path: str, event: Dict[str, str]) -> UsbDevice:
+        device_path = os.path.join(self.scanner.sysfs_root, "bus", "usb", "devices", port_path)
+        device = self.scanner.read_sysfs_usb_device(device_path)
+        if device:
+            return device
+
+        # The sysfs entry is not readable (or this is a synthetic event), so
+        # build the record from the event itself. PRODUCT is "vid/pid/bcdDevice".
+        product = event.get('PRODUCT', '').split('/')
+        return UsbDevice(
+            bus=event.get('BUSNUM', ''),
+            device=event.get('DEVNUM', ''),
+            vendor_id=product[0].zfill(4) if product[0] else '',
+            product_id=product[1].zfill(4) if len(product) > 1 else '',
+            port_path=port_path
+        )
+
+    def _notify(self):
+        if self.on_change is not None:
+            self.on_change(self.devices())
@@ -0,0 +1,301 @@
+"""Vendor and product names from the usb.ids and pci.ids databases.
+
+The databases are text files of roughly 700 KB (usb.ids) and 1.4 MB
+(pci.ids) in this layout:
+
+    046d  Logitech, Inc.
+    	c52b  Unifying Receiver
+    	c534  Unifying Receiver
+
+Parsing them on every start would cost more than the scan they annotate.
+Instead, each file is memory-mapped and an index of (id, offset) pairs is
+built once and saved next to the history database, under
+~/.device-monitor/ids/. The index is rebuilt when the file's size or
+modification time changes. A lookup is a binary search in the index and
+one read of the name's line from the mapping. Only the pages touched are
+read from disk. Recent results are kept in an LRU cache.
+"""
+import array
+import bisect
+import functools
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".device-monitor", "ids")
+
+# Where distributions install the databases (hwdata, usbutils, pciutils)
+SEARCH_DIRS = ("/usr/share/hwdata", "/usr/share/misc", "/usr/share", "/var/lib/usbutils",
+               "/usr/local/share/hwdata", "/usr/local/share")
+
+_INDEX_MAGIC = b"DMIDSIDX"
+_INDEX_VERSION = 1
+# magic, version, source size, source mtime (ns), vendor count, product count
+_INDEX_HEADER = struct.Struct("<8sIQQII")
+
+# Vendor lines start in column 0, product (device) lines after one tab.
+# Deeper lines (interfaces, subsystems) and other sections do not match.
+_ENTRY = re.compile(rb'^(\t?)([0-9a-fA-F]{4})  ', re.MULTILINE)
+
+IdValue = Union[str, int]
+
+
+def parse_id(value: IdValue) -> Optional[int]:
+    """Parse a 16-bit id given as "046d", "0x046D" or an int; None if invalid."""
+    if isinstance(value, int):
+        return value if 0 <= value <= 0xFFFF else None
+    try:
+        number = int(value, 16)
+    except (TypeError, ValueError):
+        return None
+    return number if 0 <= number <= 0xFFFF else None
+
+
+def find_database(name: str) -> Optional[str]:
+    """Return the path of an installed database ("usb.ids" or "pci.ids"), or None."""
+    for directory in SEARCH_DIRS:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _pack(values: array.array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(typecode: str, data: bytes) -> array.array:
+    values = array.array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class IdDatabase:
+    """One memory-mapped usb.ids or pci.ids file with its offset index."""
+
+    def __init__(self, path: str, index_dir: Optional[str] = DEFAULT_INDEX_DIR, cache_size: int = 4096):
+        """
+        Args:
+            path: Database file.
+            index_dir: Directory for the saved index; None builds the index
+                in memory on every open.
+            cache_size: Names kept in each LRU cache.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            # An empty file cannot be mapped
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b''
+        self._source = (stat.st_size, stat.st_mtime_ns)
+        self.index_path = None
+        if index_dir is not None:
+            # One index per source path, so two copies of usb.ids do not clash
+            tag = hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=6).hexdigest()
+            self.index_path = os.path.join(index_dir, f"{os.path.basename(path)}-{tag}.idx")
+        # True if the index was read from index_path rather than built
+        self.index_loaded = False
+        self._vendor_keys, self._vendor_offsets, self._product_keys, self._product_offsets = self._load_index()
+        self._vendor_cache = functools.lru_cache(maxsize=cache_size)(self._vendor)
+        self._product_cache = functools.lru_cache(maxsize=cache_size)(self._product)
+
+    def __len__(self):
+        return len(self._vendor_keys) + len(self._product_keys)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+    def _load_index(self) -> Tuple[array.array, array.array, array.array, array.array]:
+        if self.index_path:
+            try:
+                with open(self.index_path, "rb") as f:
+                    data = f.read()
+                index = self._decode_index(data)
+                if index is not None:
+                    self.index_loaded = True
+                    return index
+            except OSError:
+                pass
+        index = self._build_index()
+        if self.index_path:
+            try:
+                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+                temporary = f"{self.index_path}.{os.getpid()}.tmp"
+                with open(temporary, "wb") as f:
+                    f.write(self._encode_index(index))
+                os.replace(temporary, self.index_path)
+            except OSError as e:
+                # The index still works from memory; it is rebuilt next time
+                print(f"Error saving ID database index: {e}")
+        return index
+
+    def _build_index(self) -> Tuple[array.array, array.array, array.array, array.array]:
+        data = self._map
+        # The vendor list ends where the device class section ("C 00  ...") begins
+        end = data.find(b"\nC ")
+        end = len(data) if end < 0 else end
+        vendors = []
+        products = []
+        vendor = None
+        for match in _ENTRY.finditer(data, 0, end):
+            number = int(match.group(2), 16)
+            if not match.group(1):
+                vendor = number
+                vendors.append((number, match.end()))
+            elif vendor is not None:
+                products.append((vendor << 16 | number, match.end()))
+        vendors.sort()
+        products.sort()
+        return (array.array('H', [key for key, _ in vendors]), array.array('I', [offset for _, offset in vendors]),
+                array.array('I', [key for key, _ in products]), array.array('I', [offset for _, offset in products]))
+
+    def _encode_index(self, index) -> bytes:
+        vendor_keys, vendor_offsets, product_keys, product_offsets = index
+        header = _INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, *self._source,
+                                    len(vendor_keys), len(product_keys))
+        return header + b''.join(_pack(values) for values in index)
+
+    def _decode_index(self, data: bytes):
+        """Return the index stored in data, or None if it is stale or damaged."""
+        if len(data) < _INDEX_HEADER.size:
+            return None
+        magic, version, size, mtime, vendors, products = _INDEX_HEADER.unpack_from(data)
+        if magic != _INDEX_MAGIC or version != _INDEX_VERSION or (size, mtime) != self._source:
+            return None
+        sizes = (('H', vendors), ('I', vendors), ('I', products), ('I', products))
+        if len(data) != _INDEX_HEADER.size + sum(array.array(code).itemsize * count for code, count in sizes):
+            return None
+        index = []
+        offset = _INDEX_HEADER.size
+        for typecode, count in sizes:
+            length = array.array(typecode).itemsize * count
+            index.append(_unpack(typecode, data[offset:offset + length]))
+            offset += length
+        return tuple(index)
+
+    def _name_at(self, offset: int) -> str:
+        end = self._map.find(b"\n", offset)
+        line = self._map[offset:end if end >= 0 else len(self._map)]
+        return line.rstrip(b"\r").decode('utf-8', 'replace')
+
+    @staticmethod
+    def _find(keys: array.array, offsets: array.array, key: int) -> int:
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return offsets[i]
+        return -1
+
+    def _vendor(self, vendor_id: IdValue) -> str:
+        vendor = parse_id(vendor_id)
+        if vendor is None:
+            return ''
+        offset = self._find(self._vendor_keys, self._vendor_offsets, vendor)
+        return self._name_at(offset) if offset >= 0 else ''
+
+    def _product(self, vendor_id: IdValue, product_id: IdValue) -> str:
+        vendor = parse_id(vendor_id)
+        product = parse_id(product_id)
+        if vendor is None or product is None:
+            return ''
+        offset = self._find(self._product_keys, self._product_offsets, vendor << 16 | product)
+        return self._name_at(offset) if offset >= 0 else ''
+
+    def vendor(self, vendor_id: IdValue) -> str:
+        """Return the vendor name for an id, or '' if it is not listed."""
+        return self._vendor_cache(vendor_id)
+
+    def product(self, vendor_id: IdValue, product_id: IdValue) -> str:
+        """Return the product (PCI: device) name for a vendor and product id, or ''."""
+        return self._product_cache(vendor_id, product_id)
+
+    def cache_info(self) -> Dict[str, int]:
+        """Return hit and miss counts of the name caches."""
+        vendor = self._vendor_cache.cache_info()
+        product = self._product_cache.cache_info()
+        return {'hits': vendor.hits + product.hits, 'misses': vendor.misses + product.misses}
+
+
+class IdResolver:
+    """Resolves USB and PCI vendor and product names, opening each database on first use.
+
+    A database that is not installed resolves every id to ''.
+    """
+
+    def __init__(self, usb_path: Optional[str] = None, pci_path: Optional[str] = None,
+                 index_dir: Optional[str] = DEFAULT_INDEX_DIR):
+        """
+        Args:
+            usb_path: usb.ids file; searched for in SEARCH_DIRS if None.
+            pci_path: pci.ids file; searched for in SEARCH_DIRS if None.
+            index_dir: Directory for saved indexes, see IdDatabase.
+        """
+        self._paths = {'usb': usb_path, 'pci': pci_path}
+        self.index_dir = index_dir
+        self._databases = {}
+        self._lock = threading.Lock()
+
+    def database(self, bus: str) -> Optional[IdDatabase]:
+        """Return the open database for "usb" or "pci", or None if there is none."""
+        try:
+            return self._databases[bus]
+        except KeyError:
+            pass
+        with self._lock:
+            if bus not in self._databases:
+                path = self._paths[bus] or find_database(f"{bus}.ids")
+                database = None
+                if path:
+                    try:
+                        database = IdDatabase(path, self.index_dir)
+                    except (OSError, ValueError) as e:
+                        print(f"Error opening ID database {path}: {e}")
+                self._databases[bus] = database
+            return self._databases[bus]
+
+    def _lookup(self, bus: str, vendor_id: IdValue, product_id: Optional[IdValue] = None) -> str:
+        database = self.database(bus)
+        if database is None:
+            return ''
+        return database.vendor(vendor_id) if product_id is None else database.product(vendor_id, product_id)
+
+    def usb_vendor(self, vendor_id: IdValue) -> str:
+        return self._lookup('usb', vendor_id)
+
+    def usb_product(self, vendor_id: IdValue, product_id: IdValue) -> str:
+        return self._lookup('usb', vendor_id, product_id)
+
+    def pci_vendor(self, vendor_id: IdValue) -> str:
+        return self._lookup('pci', vendor_id)
+
+    def pci_device(self, vendor_id: IdValue, device_id: IdValue) -> str:
+        return self._lookup('pci', vendor_id, device_id)
+
+    def close(self):
+        with self._lock:
+            for database in self._databases.values():
+                if database is not None:
+                    database.close()
+            self._databases.clear()
+
+
+_default_resolver = None
+_default_lock = threading.Lock()
+
+
+def default_resolver() -> IdResolver:
+    """Return the process-wide resolver for the installed databases."""
+    global _default_resolver
+    with _default_lock:
+        if _default_resolver is None:
+            _default_resolver = IdResolver()
+        return _default_resolver
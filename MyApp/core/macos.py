@@ -0,0 +1,237 @@
+import json
+import re
+from typing import List, Dict, Any, Iterator, TextIO
+
+from .records import UsbDevice
+
+_IFCONFIG_HEADER = re.compile(r'^(\S+): flags=\w+<([^>]*)>(?:.*\bmtu (\d+))?')
+
+
+def parse_networksetup_ports(text: str) -> List[Dict[str, Any]]:
+    """Parse `networksetup -listallhardwareports` output.
+
+    Returns:
+        List of dictionaries with the hardware port name, BSD device name and
+        MAC address, in the order networksetup lists them.
+    """
+    adapters = []
+    current_adapter = {}
+
+    for line in text.strip().split('\n'):
+        if line.startswith("Hardware Port:"):
+            # Start a new adapter
+            if current_adapter:
+                adapters.append(current_adapter)
+            current_adapter = {'name': line.split(": ", 1)[1], 'connected': False}
+        elif line.startswith("Device:") and current_adapter:
+            current_adapter['device'] = line.split(": ", 1)[1]
+        elif line.startswith("Ethernet Address:") and current_adapter:
+            address = line.split(": ", 1)[1]
+            # Bridges and tunnels report "N/A"
+            current_adapter['mac_address'] = '' if address == 'N/A' else address
+
+    # Add the last adapter
+    if current_adapter:
+        adapters.append(current_adapter)
+
+    return adapters
+
+
+def parse_ifconfig(text: str) -> Dict[str, Dict[str, Any]]:
+    """Parse `ifconfig -a` output in a single pass.
+
+    Returns:
+        Dictionary keyed by interface name with flags, MTU, MAC address,
+        media status and IPv4/IPv6 addresses (in CIDR notation).
+    """
+    interfaces = {}
+    current = None
+
+    for line in text.split('\n'):
+        if not line:
+            continue
+        if not line[0].isspace():
+            match = _IFCONFIG_HEADER.match(line)
+            if not match:
+                current = None
+                continue
+            name, flags, mtu = match.groups()
+            current = interfaces[name] = {
+                'flags': flags.split(',') if flags else [],
+                'mtu': int(mtu) if mtu else 0,
+                'mac_address': '',
+                'status': '',
+                'ipv4_addresses': [],
+                'ipv6_addresses': []
+            }
+            continue
+        if current is None:
+            continue
+
+        fields = line.split()
+        if fields[0] == 'ether' and len(fields) > 1:
+            current['mac_address'] = fields[1]
+        elif fields[0] == 'inet' and len(fields) > 1:
+            prefix = ''
+            if 'netmask' in fields:
+                mask = fields[fields.index('netmask') + 1]
+                prefix = f"/{bin(int(mask, 16)).count('1')}" if mask.startswith('0x') else ''
+            current['ipv4_addresses'].append(fields[1] + prefix)
+        elif fields[0] == 'inet6' and len(fields) > 1:
+            # Link-local addresses carry a "%en0" scope suffix
+            address = fields[1].split('%')[0]
+            if 'prefixlen' in fields:
+                address += f"/{fields[fields.index('prefixlen') + 1]}"
+            current['ipv6_addresses'].append(address)
+        elif fields[0] == 'status:' and len(fields) > 1:
+            current['status'] = fields[1]
+
+    return interfaces
+
+
+def join_adapters(ports: List[Dict[str, Any]], interfaces: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Join the hardware-port list with parsed ifconfig state.
+
+    Returns:
+        List of adapter dictionaries, one per hardware port.
+    """
+    adapters = []
+    for port in ports:
+        adapter = dict(port)
+        interface = interfaces.get(port.get('device', ''))
+        if interface is not None:
+            adapter['status'] = interface['status']
+            adapter['connected'] = interface['status'] == 'active'
+            adapter['mtu'] = interface['mtu']
+            adapter['mac_address'] = adapter.get('mac_address') or interface['mac_address']
+            adapter['ipv4_addresses'] = ', '.join(interface['ipv4_addresses'])
+            adapter['ipv6_addresses'] = ', '.join(interface['ipv6_addresses'])
+        adapters.append(adapter)
+    return adapters
+
+
+def iter_json_array(stream: TextIO, key: str, chunk_size: int = 65536) -> Iterator[Any]:
+    """Yield the items of the top-level array stored under key, one at a time.
+
+    The stream is read in chunks and each item is decoded as soon as it is
+    complete, so only one item (e.g. one USB controller tree) is held in
+    memory at a time instead of the whole document.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+
+    def read_more(size):
+        nonlocal buffer, eof
+        data = stream.read(size)
+        if data:
+            buffer += data
+        else:
+            eof = True
+
+    # Find the opening bracket of the array
+    marker = json.dumps(key)
+    while True:
+        index = buffer.find(marker)
+        if index >= 0:
+            bracket = buffer.find('[', index + len(marker))
+            if bracket >= 0:
+                buffer = buffer[bracket + 1:]
+                break
+        if eof:
+            return
+        read_more(chunk_size)
+
+    pos = 0
+    wanted = chunk_size
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError(f"Unterminated {key} array")
+            buffer, pos = '', 0
+            read_more(chunk_size)
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except RecursionError:
+            raise ValueError(f"{key} item is nested too deeply to decode") from None
+        except ValueError:
+            if eof:
+                raise
+            # Incomplete item; read at least as much again as is buffered so
+            # a large item is re-decoded a logarithmic number of times
+            buffer, pos = buffer[pos:], 0
+            wanted = max(wanted, len(buffer))
+            read_more(wanted)
+            continue
+        wanted = chunk_size
+        buffer, pos = buffer[end:], 0
+        yield item
+
+
+def location_port_path(location_id: str) -> str:
+    """Turn a location id such as "0x14120000 / 4" into a port path ("20-1.2").
+
+    The top byte of a location id is the bus; each following nibble is the
+    port number at one tier of the hub chain, up to the first zero.
+
+    Returns:
+        Port path in the same bus-port.port form as Linux sysfs, or '' if the
+        location id cannot be parsed.
+    """
+    try:
+        location = int(location_id.split()[0], 16)
+    except (ValueError, IndexError):
+        return ''
+    ports = []
+    for shift in range(20, -4, -4):
+        port = (location >> shift) & 0xF
+        if not port:
+            break
+        ports.append(str(port))
+    if not ports:
+        return ''
+    return f"{location >> 24}-{'.'.join(ports)}"
+
+
+def iter_usb_tree(controller: Dict[str, Any], controller_index: int = 0) -> Iterator[UsbDevice]:
+    """Walk one system_profiler USB controller tree without recursion.
+
+    Devices are yielded parent first. Each device's port path comes from its
+    location id; when that is missing, it is built from the parent's path
+    and the device's position under it.
+    """
+    # Stack of (node, port path, depth); children are pushed in reverse so
+    # they come off the stack in document order
+    stack = [(controller, str(controller_index), 0)]
+    while stack:
+        node, path, depth = stack.pop()
+
+        # Skip the root USB controllers
+        if depth > 0 and "manufacturer" in node:
+            yield UsbDevice(
+                name=node.get('_name', 'Unknown Device'),
+                id=node.get('location_id', ''),
+                manufacturer=node.get('manufacturer', 'Unknown'),
+                serial_number=node.get('serial_num', ''),
+                port_path=path
+            )
+
+        children = node.get('_items') or []
+        for index in range(len(children) - 1, -1, -1):
+            child = children[index]
+            child_path = location_port_path(child.get('location_id', ''))
+            if not child_path:
+                separator = '-' if depth == 0 else '.'
+                child_path = f"{path}{separator}{index + 1}"
+            stack.append((child, child_path, depth + 1))
+
+
+def iter_system_profiler_usb(stream: TextIO) -> Iterator[UsbDevice]:
+    """Yield USB devices from `system_profiler SPUSBDataType -json` output as it is read."""
+    for index, controller in enumerate(iter_json_array(stream, 'SPUSBDataType')):
+        yield from iter_usb_tree(controller, index)
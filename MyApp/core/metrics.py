@@ -0,0 +1,182 @@
+"""Lightweight timing spans, latency histograms and counters.
+
+Instrumented code calls span(), increment() or wrap() on a Metrics object.
+While the object is disabled these return shared no-op objects or the
+original callable after a single attribute check, so instrumentation can stay
+in hot paths. Set DEVICE_MONITOR_METRICS=1 to enable the default registry at
+startup; the Devices page overlay enables it on demand.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Histogram bucket upper bounds in seconds; a final bucket catches the rest
+BUCKET_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Latency histogram over fixed logarithmic buckets."""
+
+    __slots__ = ('buckets', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Approximate percentile: the upper bound of the bucket it falls in, capped at max."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'mean_s': self.total / self.count if self.count else 0.0,
+            'min_s': self.min or 0.0,
+            'max_s': self.max,
+            'p50_s': self.percentile(0.5),
+            'p95_s': self.percentile(0.95),
+            'buckets': {('inf' if index == len(BUCKET_BOUNDS) else str(BUCKET_BOUNDS[index])): count
+                        for index, count in enumerate(self.buckets) if count},
+        }
+
+
+class _NullSpan:
+    """Span returned while metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# Counter suffixes paired up into skip rates by Metrics.snapshot()
+SKIPPED = ".skipped"
+PERFORMED = (".parsed", ".rendered")
+
+
+class Metrics:
+    """Registry of named latency histograms and counters; safe to use from any thread."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str):
+        """Context manager that records the time spent inside it under name."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Return func timed under name, or func itself while disabled."""
+        if not self.enabled:
+            return func
+
+        def timed(*args, **kwargs):
+            with _Span(self, name):
+                return func(*args, **kwargs)
+        return timed
+
+    def record(self, name: str, seconds: float):
+        """Add one latency sample."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def increment(self, name: str, amount: int = 1):
+        """Add amount to a counter."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all histograms and counters as plain data.
+
+        skip_rates holds, for every "<name>.skipped" counter that has a
+        "<name>.parsed" or "<name>.rendered" sibling, the fraction of the
+        work under <name> that was skipped.
+        """
+        with self._lock:
+            counters = dict(sorted(self._counters.items()))
+            spans = {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+        skip_rates = {}
+        for name, skipped in counters.items():
+            if not name.endswith(SKIPPED):
+                continue
+            prefix = name[:-len(SKIPPED)]
+            if any(prefix + outcome in counters for outcome in PERFORMED):
+                done = sum(counters.get(prefix + outcome, 0) for outcome in PERFORMED)
+                skip_rates[prefix] = skipped / (skipped + done)
+        return {'enabled': self.enabled, 'spans': spans, 'counters': counters, 'skip_rates': skip_rates}
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """Return the snapshot as JSON, also writing it to path if given."""
+        text = json.dumps(self.snapshot(), indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        return text
+
+
+# Registry shared by the scanner and the UI unless they are given their own
+default_metrics = Metrics(enabled=os.environ.get("DEVICE_MONITOR_METRICS") == "1")
@@ -0,0 +1,239 @@
+import os
+import socket
+import struct
+from typing import List, Dict, Any, Iterable, Tuple
+
+# Netlink message types (linux/netlink.h, linux/rtnetlink.h)
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLMSG_OVERRUN = 4
+RTM_NEWLINK = 16
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+
+NLM_F_REQUEST = 0x01
+NLM_F_ROOT = 0x100
+NLM_F_MATCH = 0x200
+NLM_F_DUMP = NLM_F_ROOT | NLM_F_MATCH
+
+# Link attributes (linux/if_link.h)
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_MTU = 4
+IFLA_OPERSTATE = 16
+
+# Address attributes (linux/if_addr.h)
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+IFF_UP = 0x1
+
+OPERSTATES = ["unknown", "notpresent", "down", "lowerlayerdown",
+              "testing", "dormant", "up"]
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_IFINFOMSG = struct.Struct("=BxHiII")
+_IFADDRMSG = struct.Struct("=BBBBI")
+_RTATTR = struct.Struct("=HH")
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def _iter_messages(data: bytes) -> Iterable[Tuple[int, bytes]]:
+    """Yield (type, payload) for every netlink message in a buffer."""
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _flags, _seq, _pid = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            break
+        yield msg_type, data[offset + _NLMSGHDR.size:offset + length]
+        offset += _align(length)
+
+
+def _iter_attrs(payload: bytes, offset: int) -> Iterable[Tuple[int, bytes]]:
+    """Yield (type, value) for every rtattr in a payload starting at offset."""
+    while offset + _RTATTR.size <= len(payload):
+        length, attr_type = _RTATTR.unpack_from(payload, offset)
+        if length < _RTATTR.size:
+            break
+        yield attr_type, payload[offset + _RTATTR.size:offset + length]
+        offset += _align(length)
+
+
+def parse_rtnetlink_dump(data: bytes) -> List[Dict[str, Any]]:
+    """Parse a captured RTM_GETLINK/RTM_GETADDR dump into adapter dictionaries.
+
+    Args:
+        data: Raw bytes received from a NETLINK_ROUTE socket, possibly
+            containing several concatenated datagrams.
+
+    Returns:
+        List of dictionaries containing adapter information, in link index order.
+    """
+    links = {}
+    addresses = {}
+
+    for msg_type, payload in _iter_messages(data):
+        if msg_type == RTM_NEWLINK and len(payload) >= _IFINFOMSG.size:
+            _family, _if_type, index, flags, _change = _IFINFOMSG.unpack_from(payload)
+            link = {'name': '', 'flags': flags, 'mac_address': '', 'mtu': 0, 'operstate': 'unknown'}
+            for attr_type, value in _iter_attrs(payload, _IFINFOMSG.size):
+                if attr_type == IFLA_IFNAME:
+                    link['name'] = value.rstrip(b'\0').decode('utf-8', 'replace')
+                elif attr_type == IFLA_ADDRESS:
+                    link['mac_address'] = ':'.join(f"{b:02x}" for b in value)
+                elif attr_type == IFLA_MTU and len(value) >= 4:
+                    link['mtu'] = struct.unpack_from("=I", value)[0]
+                elif attr_type == IFLA_OPERSTATE and value:
+                    state = value[0]
+                    link['operstate'] = OPERSTATES[state] if state < len(OPERSTATES) else 'unknown'
+            links[index] = link
+        elif msg_type == RTM_NEWADDR and len(payload) >= _IFADDRMSG.size:
+            family, prefixlen, _flags, _scope, index = _IFADDRMSG.unpack_from(payload)
+            attrs = dict(_iter_attrs(payload, _IFADDRMSG.size))
+            # IFA_LOCAL is the interface address on point-to-point links
+            raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+            if raw is None or family not in (socket.AF_INET, socket.AF_INET6):
+                continue
+            text = f"{socket.inet_ntop(family, raw)}/{prefixlen}"
+            key = 'ipv4_addresses' if family == socket.AF_INET else 'ipv6_addresses'
+            addresses.setdefault(index, {}).setdefault(key, []).append(text)
+
+    adapters = []
+    for index in sorted(links):
+        link = links[index]
+        addrs = addresses.get(index, {})
+        adapters.append({
+            'name': link['name'],
+            'status': link['operstate'],
+            'mac_address': link['mac_address'],
+            'mtu': link['mtu'],
+            'ipv4_addresses': ', '.join(addrs.get('ipv4_addresses', [])),
+            'ipv6_addresses': ', '.join(addrs.get('ipv6_addresses', [])),
+            'connected': bool(link['flags'] & IFF_UP)
+        })
+    return adapters
+
+
+_LINK_FINGERPRINT_ATTRS = frozenset((IFLA_IFNAME, IFLA_ADDRESS, IFLA_MTU, IFLA_OPERSTATE))
+_ADDR_FINGERPRINT_ATTRS = frozenset((IFA_ADDRESS, IFA_LOCAL))
+
+
+def rtnetlink_fingerprint(data: bytes) -> bytes:
+    """Return the parts of a dump that parse_rtnetlink_dump() reads, concatenated.
+
+    Link messages also carry traffic counters and address messages carry
+    lifetimes, both of which change from one dump to the next; they are
+    left out so that two dumps of an unchanged inventory compare equal.
+    """
+    parts = []
+    for msg_type, payload in _iter_messages(data):
+        if msg_type == RTM_NEWLINK:
+            wanted = _LINK_FINGERPRINT_ATTRS
+            offset = _IFINFOMSG.size
+        elif msg_type == RTM_NEWADDR:
+            wanted = _ADDR_FINGERPRINT_ATTRS
+            offset = _IFADDRMSG.size
+        else:
+            continue
+        parts.append(_NLMSGHDR.pack(0, msg_type, 0, 0, 0))
+        parts.append(payload[:offset])
+        while offset + _RTATTR.size <= len(payload):
+            length, attr_type = _RTATTR.unpack_from(payload, offset)
+            if length < _RTATTR.size:
+                break
+            if attr_type in wanted:
+                parts.append(payload[offset:offset + length])
+            offset += _align(length)
+    return b''.join(parts)
+
+
+def dump_rtnetlink(timeout: float = 2.0) -> bytes:
+    """Dump all links and addresses from the kernel over one NETLINK_ROUTE socket.
+
+    The link dump and the address dump are issued back to back on the same
+    socket, so the whole inventory costs one socket session and no process.
+
+    Returns:
+        The raw reply bytes, suitable for parse_rtnetlink_dump().
+    """
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    try:
+        sock.settimeout(timeout)
+        sock.bind((0, 0))
+        requests = []
+        for seq, msg_type in enumerate((RTM_GETLINK, RTM_GETADDR), start=1):
+            # rtgenmsg: family byte padded to 4 bytes
+            body = struct.pack("=Bxxx", socket.AF_UNSPEC)
+            requests.append(_NLMSGHDR.pack(_NLMSGHDR.size + len(body), msg_type,
+                                           NLM_F_REQUEST | NLM_F_DUMP, seq, 0) + body)
+        # The kernel serves one dump at a time per socket, so the address dump
+        # is sent as soon as the link dump completes
+        sock.send(requests.pop(0))
+
+        chunks = []
+        done = 0
+        while done < 2:
+            data = sock.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+            for msg_type, payload in _iter_messages(data):
+                if msg_type == NLMSG_DONE:
+                    done += 1
+                    if requests:
+                        sock.send(requests.pop(0))
+                elif msg_type == NLMSG_ERROR:
+                    errno = struct.unpack_from("=i", payload)[0] if len(payload) >= 4 else 0
+                    if errno:
+                        raise OSError(-errno, os.strerror(-errno))
+                elif msg_type == NLMSG_OVERRUN:
+                    raise OSError("netlink dump overrun")
+        return b''.join(chunks)
+    finally:
+        sock.close()
+
+
+def read_sysfs_link_details(name: str, sysfs_root: str = "/sys") -> Dict[str, Any]:
+    """Read speed, duplex and MTU for one interface from /sys/class/net.
+
+    Attributes the driver does not report (virtual links, links that are down)
+    are returned as empty strings.
+    """
+    base = os.path.join(sysfs_root, "class", "net", name)
+    details = {}
+    for attr in ("speed", "duplex", "mtu"):
+        try:
+            with open(os.path.join(base, attr), "r") as f:
+                details[attr] = f.read().strip()
+        except OSError:
+            # Reading speed on a down link raises EINVAL rather than returning a value
+            details[attr] = ''
+    speed = details['speed']
+    if speed and speed.lstrip('-').isdigit() and int(speed) > 0:
+        details['speed'] = f"{speed} Mb/s"
+    else:
+        details['speed'] = ''
+    return details
+
+
+def read_sysfs_pci_ids(name: str, sysfs_root: str = "/sys") -> Tuple[str, str]:
+    """Return the PCI (vendor, device) ids of an interface, e.g. ("8086", "15bb").
+
+    Both are empty for interfaces that are not PCI functions: virtual
+    links, USB adapters and virtio devices, whose ids are not PCI ids.
+    """
+    device = os.path.join(sysfs_root, "class", "net", name, "device")
+    try:
+        if os.path.basename(os.readlink(os.path.join(device, "subsystem"))) != "pci":
+            return '', ''
+        ids = []
+        for attr in ("vendor", "device"):
+            with open(os.path.join(device, attr), "r") as f:
+                ids.append(f.read().strip().lower().replace("0x", "", 1))
+    except OSError:
+        return '', ''
+    return ids[0], ids[1]
@@ -0,0 +1,183 @@
+"""Long-lived PowerShell host for the Windows backend.
+
+Starting powershell.exe costs far more than the commands the scanner runs,
+so one host is started on first use and reused for every scan.
+
+Protocol (one UTF-8 JSON object per line in each direction):
+
+    request:  {"id": 7, "command": "Get-NetAdapter | ConvertTo-Json"}
+    response: {"id": 7, "ok": true, "output": "<command output as text>"}
+              {"id": 7, "ok": false, "error": "<message>"}
+
+Any process that speaks this protocol on stdin/stdout can stand in for
+PowerShell by passing its argv as ``command``, which is how the session
+logic can be exercised on Linux.
+"""
+import json
+import queue
+import subprocess
+import threading
+from typing import List, Optional
+
+# Read-eval-respond loop run by the PowerShell host. ConvertTo-Json -Compress
+# keeps each response on a single line. Windows PowerShell writes to a pipe
+# in the OEM codepage unless told otherwise, so both directions are set to
+# UTF-8 without a byte order mark.
+HOST_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+$ProgressPreference = 'SilentlyContinue'
+[Console]::InputEncoding = New-Object System.Text.UTF8Encoding $false
+[Console]::OutputEncoding = New-Object System.Text.UTF8Encoding $false
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    $request = $line | ConvertFrom-Json
+    try {
+        $output = Invoke-Expression $request.command | Out-String
+        $response = @{ id = $request.id; ok = $true; output = $output }
+    } catch {
+        $response = @{ id = $request.id; ok = $false; error = $_.Exception.Message }
+    }
+    [Console]::Out.WriteLine(($response | ConvertTo-Json -Compress))
+    [Console]::Out.Flush()
+}
+"""
+
+DEFAULT_COMMAND = ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive",
+                   "-ExecutionPolicy", "Bypass", "-Command", HOST_SCRIPT]
+
+
+class PowerShellError(RuntimeError):
+    """A command ran but PowerShell reported an error."""
+
+
+class PowerShellSession:
+    """A PowerShell host process that is started once and reused.
+
+    The host is restarted automatically if it dies, and a command that does
+    not answer within its timeout kills the host so the next command starts
+    from a clean one.
+    """
+
+    def __init__(self, command: Optional[List[str]] = None, timeout: float = 30.0):
+        """
+        Args:
+            command: argv of the host process; defaults to PowerShell running HOST_SCRIPT.
+            timeout: Default per-command timeout in seconds.
+        """
+        self.command = command or DEFAULT_COMMAND
+        self.timeout = timeout
+        self.restarts = 0
+        self._started = False
+        self._process = None
+        self._lines = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def run(self, command: str, timeout: Optional[float] = None) -> str:
+        """Run one command in the host and return its output text.
+
+        A host that has died is restarted and the command retried once.
+
+        Raises:
+            PowerShellError: The command raised an error in PowerShell.
+            TimeoutError: No answer within the timeout; the host is killed.
+            OSError: The host could not be started.
+        """
+        with self._lock:
+            for attempt in range(2):
+                self._ensure_started()
+                self._next_id += 1
+                request_id = self._next_id
+                try:
+                    self._process.stdin.write(json.dumps({'id': request_id, 'command': command}) + "\n")
+                    self._process.stdin.flush()
+                except (BrokenPipeError, OSError):
+                    self._stop()
+                    if attempt:
+                        raise
+                    continue
+
+                response = self._read_response(request_id, timeout or self.timeout)
+                if response is None:
+                    # Host exited before answering
+                    self._stop()
+                    if attempt:
+                        raise OSError("PowerShell host exited while running a command")
+                    continue
+
+                if not response.get('ok'):
+                    raise PowerShellError(response.get('error', 'Unknown PowerShell error'))
+                return response.get('output') or ''
+
+    def close(self):
+        """Stop the host process."""
+        with self._lock:
+            self._stop()
+
+    def _ensure_started(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        self._stop()
+        if self._started:
+            self.restarts += 1
+        self._started = True
+
+        self._process = subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True, encoding="utf-8", errors="replace", bufsize=1,
+            # Keep the windowed app from flashing a console for the host
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+
+        # A reader thread turns the blocking pipe into a queue that can be
+        # read with a timeout. None marks end of output.
+        lines = queue.Queue()
+        stdout = self._process.stdout
+
+        def pump():
+            try:
+                for line in stdout:
+                    lines.put(line)
+            except (OSError, ValueError):
+                # Pipe closed by _stop() while reading
+                pass
+            finally:
+                lines.put(None)
+
+        threading.Thread(target=pump, name="powershell-reader", daemon=True).start()
+        self._lines = lines
+
+    def _read_response(self, request_id: int, timeout: float):
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                self._stop()
+                raise TimeoutError(f"PowerShell command timed out after {timeout} s")
+            if line is None:
+                return None
+            try:
+                response = json.loads(line.lstrip('\ufeff'))
+            except ValueError:
+                # Stray output (e.g. a warning written to stdout); skip it
+                continue
+            # Answers to earlier, timed-out requests are skipped
+            if isinstance(response, dict) and response.get('id') == request_id:
+                return response
+
+    def _stop(self):
+        process = self._process
+        self._process = None
+        self._lines = None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        if process.poll() is None:
+            process.kill()
+        try:
+            process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            pass
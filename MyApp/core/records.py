@@ -0,0 +1,164 @@
+import operator
+from typing import Any, Dict, List, Tuple
+
+
+class _Record:
+    """Base for compact device records.
+
+    Records use __slots__ so a large inventory costs a fraction of the
+    equivalent list of dicts. Equality and hashing use the identity key
+    only, so a record can be looked up, diffed or cached by identity even
+    when its other fields changed; use same_as() to compare field values.
+    """
+
+    __slots__ = ('key',)
+
+    # Field names in display order, and defaults for fields a backend may omit
+    _fields: Tuple[str, ...] = ()
+    _defaults: Dict[str, Any] = {}
+    # Fields shown in a card's header rather than as a detail line
+    _header_fields = ('name', 'type', 'connected')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # values() in one C call; subclasses always have several fields
+        cls._get_values = operator.attrgetter(*cls._fields)
+
+    def __init__(self, **fields):
+        for name in self._fields:
+            setattr(self, name, fields.pop(name, self._defaults.get(name, '')))
+        if fields:
+            raise TypeError(f"Unknown {type(self).__name__} fields: {', '.join(sorted(fields))}")
+        self.key = self._identity()
+
+    def _identity(self) -> str:
+        raise NotImplementedError
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({values})"
+
+    def values(self) -> Tuple[Any, ...]:
+        """Return all field values, in field order."""
+        return self._get_values(self)
+
+    @classmethod
+    def from_rows(cls, rows) -> list:
+        """Build records from tuples of values in field order, as returned by values().
+
+        Skips the keyword handling of __init__, for bulk loads.
+        """
+        setters = tuple(getattr(cls, name).__set__ for name in cls._fields)
+        new = object.__new__
+        records = []
+        for values in rows:
+            record = new(cls)
+            for setter, value in zip(setters, values):
+                setter(record, value)
+            record.key = record._identity()
+            records.append(record)
+        return records
+
+    def same_as(self, other) -> bool:
+        """Return True if other has the same identity and the same field values."""
+        return type(other) is type(self) and self.values() == other.values()
+
+    def replace(self, **changes):
+        """Return a copy of the record with some fields changed."""
+        fields = self.to_dict()
+        fields.update(changes)
+        return type(self)(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a plain dictionary, e.g. for JSON output."""
+        return {name: getattr(self, name) for name in self._fields}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Build a record from a dictionary, ignoring keys that are not fields."""
+        return cls(**{name: data[name] for name in cls._fields if name in data})
+
+    def details(self) -> List[Tuple[str, Any]]:
+        """Return (field, value) pairs for the non-empty fields shown below the header."""
+        return [(name, getattr(self, name)) for name in self._fields
+                if name not in self._header_fields and getattr(self, name)]
+
+
+class UsbDevice(_Record):
+    """A connected USB device.
+
+    The identity key prefers values that survive a replug into the same
+    port: the sysfs port path on Linux, the location id on macOS or the
+    instance id on Windows, then vendor/product/serial. The Linux device
+    number changes on every replug and is only used as a last resort.
+    """
+
+    _fields = ('name', 'type', 'vendor_id', 'product_id', 'manufacturer', 'serial_number',
+               'speed', 'port_path', 'id', 'bus', 'device', 'status', 'connected')
+    _defaults = {'name': 'Unknown Device', 'type': 'USB', 'connected': True}
+    __slots__ = _fields
+
+    @staticmethod
+    def port_key(port_path: str) -> str:
+        """Identity key of the device attached at a sysfs port path."""
+        return f"usb:port:{port_path}"
+
+    def _identity(self) -> str:
+        if self.port_path:
+            return self.port_key(self.port_path)
+        if self.id:
+            return f"usb:id:{self.id}"
+        if self.serial_number:
+            return f"usb:serial:{self.vendor_id}:{self.product_id}:{self.serial_number}"
+        if self.bus and self.device:
+            return f"usb:bus:{self.bus}:{self.device}"
+        return f"usb:name:{self.name}"
+
+
+class NetworkAdapter(_Record):
+    """A network adapter. Identity is the interface (BSD device) name."""
+
+    _fields = ('name', 'description', 'device', 'status', 'mac_address', 'speed', 'duplex',
+               'mtu', 'ipv4_addresses', 'ipv6_addresses', 'connected')
+    _defaults = {'name': 'Unknown Adapter', 'mtu': 0, 'connected': False}
+    __slots__ = _fields
+
+    # Adapters have no separate type line
+    _header_fields = ('name', 'connected')
+
+    @property
+    def type(self) -> str:
+        return 'Network'
+
+    def _identity(self) -> str:
+        return f"net:{self.device or self.name}"
+
+
+def diff_records(old: List[_Record], new: List[_Record]) -> Tuple[List[_Record], List[_Record], List[_Record]]:
+    """Compare two inventories by identity key in linear time.
+
+    Returns:
+        Tuple of (added, removed, changed) records. Added and changed records
+        come from new, removed records from old.
+    """
+    old_by_key = {record.key: record for record in old}
+    new_keys = set()
+    added = []
+    changed = []
+    for record in new:
+        new_keys.add(record.key)
+        previous = old_by_key.get(record.key)
+        if previous is None:
+            added.append(record)
+        elif not previous.same_as(record):
+            changed.append(record)
+    removed = [record for record in old if record.key not in new_keys]
+    return added, removed, changed
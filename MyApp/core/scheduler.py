@@ -0,0 +1,50 @@
+"""Adaptive rescan intervals.
+
+Each scan category gets its own AdaptiveInterval. While scans keep
+returning the same inventory the interval grows geometrically up to a
+ceiling; a scan that finds a change drops it to a short interval for a few
+scans, since more changes tend to follow (a hub being plugged in, an
+interface coming up), and then back to the base interval.
+"""
+from typing import Optional
+
+
+class AdaptiveInterval:
+    """Delay before the next scan of one category, in seconds."""
+
+    __slots__ = ('base', 'maximum', 'factor', 'fast', 'fast_scans', 'current', '_fast_left')
+
+    def __init__(self, base: float, maximum: float, factor: float = 2.0,
+                 fast: Optional[float] = None, fast_scans: int = 3):
+        """
+        Args:
+            base: Interval after the burst that follows a change.
+            maximum: Ceiling for the backed-off interval.
+            factor: Growth per unchanged scan.
+            fast: Interval right after a change; defaults to base / 4.
+            fast_scans: Scans run at the fast interval after a change.
+        """
+        self.base = base
+        self.maximum = maximum
+        self.factor = factor
+        self.fast = base / 4 if fast is None else fast
+        self.fast_scans = fast_scans
+        self.current = base
+        self._fast_left = 0
+
+    def next(self, changed: bool) -> float:
+        """Return the delay before the next scan given whether this one found a change."""
+        if changed:
+            self._fast_left = self.fast_scans
+            self.current = self.base
+        if self._fast_left:
+            self._fast_left -= 1
+            return self.fast
+        delay = self.current
+        self.current = min(self.current * self.factor, self.maximum)
+        return delay
+
+    def reset(self):
+        """Go back to the base interval, e.g. after the user asked for a refresh."""
+        self.current = self.base
+        self._fast_left = 0
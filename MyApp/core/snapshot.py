@@ -0,0 +1,299 @@
+"""Compact binary snapshots of a scanned inventory, and snapshot diffs.
+
+    python -m core --save-snapshot lab-01.dmsnap
+    python -m core --export-jsonl lab-01.dmsnap
+    python -m core --diff-snapshots monday.dmsnap tuesday.dmsnap
+
+A snapshot file is laid out as:
+
+    magic "DMSNAP", version (uint16 LE), header length (uint32 LE)
+    header      UTF-8 JSON: creation time, host, and for every category
+                its record count, field names and column item widths
+    body        zlib-compressed, in this order:
+                string lengths  one unsigned int per interned string
+                string data     all interned strings, UTF-8, back to back
+                columns         per category, per field, one index per record
+
+Every field value is stored once in a value table (the interned strings,
+then any non-string values listed in the header) and the columns hold
+indices into it, each column as narrow as its largest index allows. Vendor,
+manufacturer, type, speed and status strings repeat across devices and
+machines, so a column costs one or two bytes per record before compression.
+Loading decodes the string data in one call and builds each column with a
+single lookup over the value table.
+"""
+import array
+import itertools
+import json
+import operator
+import os
+import struct
+import sys
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .backends import default_registry
+from .records import diff_records
+
+MAGIC = b"DMSNAP"
+VERSION = 1
+DEFAULT_EXTENSION = ".dmsnap"
+
+_PREAMBLE = struct.Struct("<6sHI")
+# Narrowest array typecode for a largest index
+_WIDTHS = (('B', 0xFF), ('H', 0xFFFF), ('I', 0xFFFFFFFF))
+
+
+def _typecode(largest: int) -> str:
+    for typecode, limit in _WIDTHS:
+        if largest <= limit:
+            return typecode
+    raise ValueError("snapshot has more than 2**32 distinct values")
+
+
+def _pack(values) -> Tuple[str, bytes]:
+    """Return (typecode, little-endian bytes) of the narrowest array holding values."""
+    column = array.array(_typecode(max(values, default=0)), values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.typecode, column.tobytes()
+
+
+def _from_bytes(typecode: str, data, count: int) -> array.array:
+    column = array.array(typecode)
+    column.frombytes(data[:count * column.itemsize])
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+
+class Snapshot:
+    """An inventory with the time and host it was taken on."""
+
+    __slots__ = ('inventory', 'created', 'host')
+
+    def __init__(self, inventory: Dict[str, list], created: Optional[float] = None, host: str = ''):
+        """
+        Args:
+            inventory: Records by category, as returned by the scanner.
+            created: Unix time of the scan; defaults to now.
+            host: Name of the machine that was scanned.
+        """
+        self.inventory = inventory
+        self.created = time.time() if created is None else created
+        self.host = host
+
+    def __len__(self):
+        return sum(len(records) for records in self.inventory.values())
+
+
+def encode(snapshot: Snapshot, level: int = 6) -> bytes:
+    """Serialize a snapshot; level is the zlib compression level."""
+    # Value table: strings first, then the few non-strings (MTU, connected
+    # flags), keyed with their type so that True and 1 stay distinct
+    strings = {}
+    others = {}
+
+    def distinct_values(column) -> Tuple[tuple, dict, Optional[type]]:
+        """Register a column's values; returns the column (as (type, value)
+        markers if its values have mixed types), its distinct values and
+        their type, or None if mixed."""
+        # Checked on the whole column: True and 1 are one key in a dict
+        types = set(map(type, column))
+        distinct = dict.fromkeys(column)
+        if len(types) != 1:
+            column = tuple(zip(map(type, column), column))
+            distinct = dict.fromkeys(column)
+            for marker in distinct:
+                if marker[0] is str:
+                    strings.setdefault(marker[1], None)
+                else:
+                    others.setdefault(marker, None)
+            return column, distinct, None
+        kind = types.pop()
+        if kind is str:
+            for value in distinct:
+                strings.setdefault(value, None)
+        else:
+            for value in distinct:
+                others.setdefault((kind, value), None)
+        return column, distinct, kind
+
+    categories = {}
+    columns = []
+    for category, records in snapshot.inventory.items():
+        fields = _record_type(category)._fields
+        columns.append((category, [distinct_values(column) for column in
+                                   zip(*map(operator.methodcaller('values'), records))]))
+        categories[category] = {'count': len(records), 'fields': list(fields), 'widths': ''}
+
+    for index, value in enumerate(strings):
+        strings[value] = index
+    for index, marker in enumerate(others, start=len(strings)):
+        others[marker] = index
+
+    blob = ''.join(strings).encode('utf-8', 'surrogatepass')
+    string_width, lengths = _pack(list(map(len, strings)))
+    body = [lengths, blob]
+    for category, raw in columns:
+        widths = []
+        for column, distinct, kind in raw:
+            for value in distinct:
+                if kind is str:
+                    distinct[value] = strings[value]
+                elif kind is not None:
+                    distinct[value] = others[kind, value]
+                else:
+                    distinct[value] = strings[value[1]] if value[0] is str else others[value]
+            # One C-level lookup for the whole column
+            indices = [distinct[column[0]]] if len(column) == 1 else operator.itemgetter(*column)(distinct)
+            typecode, data = _pack(indices)
+            widths.append(typecode)
+            body.append(data)
+        categories[category]['widths'] = ''.join(widths)
+
+    header = json.dumps({
+        'created': snapshot.created,
+        'host': snapshot.host,
+        'strings': len(strings),
+        'string_width': string_width,
+        'string_bytes': len(blob),
+        'others': [value for _kind, value in others],
+        'categories': categories,
+    }, separators=(',', ':')).encode('utf-8')
+    return (_PREAMBLE.pack(MAGIC, VERSION, len(header)) + header +
+            zlib.compress(b''.join(body), level))
+
+
+def _record_type(category: str):
+    if category not in default_registry:
+        raise ValueError(f"unknown device category {category!r}")
+    return default_registry.category(category).record_type
+
+
+def _read_header(data: bytes):
+    if len(data) < _PREAMBLE.size:
+        raise ValueError("not a device snapshot (file too short)")
+    magic, version, header_length = _PREAMBLE.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a device snapshot")
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version {version} (this version reads {VERSION})")
+    end = _PREAMBLE.size + header_length
+    return json.loads(data[_PREAMBLE.size:end]), end
+
+
+def _columns(data: bytes):
+    """Decode a snapshot into (header, {category: (fields, columns of values)})."""
+    header, end = _read_header(data)
+    body = memoryview(zlib.decompress(data[end:]))
+    count = header['strings']
+    lengths = _from_bytes(header['string_width'], body, count)
+    offset = count * lengths.itemsize
+    text = str(body[offset:offset + header['string_bytes']], 'utf-8', 'surrogatepass')
+    offset += header['string_bytes']
+
+    values = []
+    position = 0
+    for length in lengths:
+        values.append(text[position:position + length])
+        position += length
+    values.extend(header['others'])
+
+    decoded = {}
+    for category, info in header['categories'].items():
+        count = info['count']
+        columns = []
+        for typecode in info['widths']:
+            column = _from_bytes(typecode, body[offset:], count)
+            offset += count * column.itemsize
+            if count == 1:
+                columns.append((values[column[0]],))
+            elif count:
+                # One C-level lookup per column rather than one per value
+                columns.append(operator.itemgetter(*column)(values))
+        decoded[category] = (info['fields'], columns)
+    return header, decoded
+
+
+def decode(data: bytes) -> Snapshot:
+    """Deserialize a snapshot written by encode()."""
+    header, decoded = _columns(data)
+    inventory = {}
+    for category, (fields, columns) in decoded.items():
+        record_type = _record_type(category)
+        if tuple(fields) == record_type._fields:
+            inventory[category] = record_type.from_rows(zip(*columns))
+        else:
+            # Written by a version with other fields; match them by name
+            inventory[category] = [record_type.from_dict(dict(zip(fields, row))) for row in zip(*columns)]
+    return Snapshot(inventory, header['created'], header['host'])
+
+
+def save(path: str, snapshot: Snapshot, level: int = 6):
+    """Write a snapshot file, replacing it only once it is complete."""
+    data = encode(snapshot, level)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def load(path: str) -> Snapshot:
+    """Read a snapshot file."""
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+
+def iter_json(path: str, chunk_size: int = 4096) -> Iterator[Dict[str, Any]]:
+    """Yield one dictionary per record of a snapshot file, as `--jsonl` prints them.
+
+    Records are built chunk_size at a time, so exporting a large snapshot
+    holds its decoded columns but never all of its records.
+    """
+    with open(path, "rb") as f:
+        _header, decoded = _columns(f.read())
+    for category, (fields, columns) in decoded.items():
+        record_type = _record_type(category)
+        rows = zip(*columns)
+        if tuple(fields) != record_type._fields:
+            rows = (record_type.from_dict(dict(zip(fields, row))).values() for row in rows)
+        while True:
+            records = record_type.from_rows(itertools.islice(rows, chunk_size))
+            if not records:
+                break
+            for record in records:
+                data = {'category': category, 'key': record.key}
+                data.update(record.to_dict())
+                yield data
+
+
+def diff(old: Snapshot, new: Snapshot) -> Iterator[Dict[str, Any]]:
+    """Yield added, removed and changed records between two snapshots.
+
+    Records are matched by identity key in linear time per category.
+    Changed records list the differing fields as {field: [old, new]}.
+    Only categories in both snapshots are compared: a category missing
+    from one was not scanned, or its scan failed, which says nothing
+    about its devices.
+    """
+    for category in old.inventory:
+        if category not in new.inventory:
+            continue
+        before = old.inventory[category]
+        after = new.inventory[category]
+        added, removed, changed = diff_records(before, after)
+        for event, records in (('added', added), ('removed', removed)):
+            for record in records:
+                line = {'event': event, 'category': category, 'key': record.key}
+                line.update(record.to_dict())
+                yield line
+        if changed:
+            previous = {record.key: record for record in before}
+            for record in changed:
+                old_record = previous[record.key]
+                changes = {name: [a, b] for name, a, b in zip(record._fields, old_record.values(), record.values())
+                           if a != b}
+                yield {'event': 'changed', 'category': category, 'key': record.key,
+                       'name': record.name, 'changes': changes}
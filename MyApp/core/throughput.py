@@ -0,0 +1,204 @@
+"""Per-interface RX/TX rate sampling from /proc/net/dev.
+
+One read of /proc/net/dev covers every interface, so a sample costs one
+read syscall plus a single split of the table, however many interfaces
+there are. Rates are kept in fixed-size ring buffers backed by array('d');
+a sample writes two floats per interface into buffers allocated when the
+interface first appears.
+"""
+import os
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+PROC_NET_DEV = "/proc/net/dev"
+
+
+class RateHistory:
+    """Ring buffers of RX and TX rates (bytes per second) for one interface."""
+
+    __slots__ = ('rx', 'tx', 'head', 'count', 'last_rx', 'last_tx')
+
+    def __init__(self, capacity: int, rx_bytes: int, tx_bytes: int):
+        self.rx = array('d', bytes(8 * capacity))
+        self.tx = array('d', bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+        self.last_rx = rx_bytes
+        self.last_tx = tx_bytes
+
+    def add(self, rx_bytes: int, tx_bytes: int, elapsed: float):
+        """Add the rates implied by new byte counters after elapsed seconds."""
+        # A counter that went backwards was reset (e.g. the driver reloaded)
+        rx_rate = (rx_bytes - self.last_rx) / elapsed if rx_bytes >= self.last_rx else 0.0
+        tx_rate = (tx_bytes - self.last_tx) / elapsed if tx_bytes >= self.last_tx else 0.0
+        self.last_rx = rx_bytes
+        self.last_tx = tx_bytes
+        head = self.head
+        self.rx[head] = rx_rate
+        self.tx[head] = tx_rate
+        head += 1
+        self.head = 0 if head == len(self.rx) else head
+        if self.count < len(self.rx):
+            self.count += 1
+
+    def latest(self) -> Tuple[float, float]:
+        """Return the most recent (RX, TX) rates, or zeros before the second sample."""
+        if not self.count:
+            return 0.0, 0.0
+        index = self.head - 1
+        return self.rx[index], self.tx[index]
+
+    def values(self) -> Tuple[List[float], List[float]]:
+        """Return the buffered RX and TX rates, oldest first."""
+        capacity = len(self.rx)
+        start = (self.head - self.count) % capacity
+        if start + self.count <= capacity:
+            return (self.rx[start:start + self.count].tolist(), self.tx[start:start + self.count].tolist())
+        return (self.rx[start:].tolist() + self.rx[:self.head].tolist(),
+                self.tx[start:].tolist() + self.tx[:self.head].tolist())
+
+
+def parse_proc_net_dev(data: bytes) -> Tuple[List[bytes], List[int], List[int]]:
+    """Parse the contents of /proc/net/dev.
+
+    Returns:
+        Tuple of (interface names, RX byte counters, TX byte counters), in
+        file order.
+    """
+    # Two header lines, then "  eth0: rx_bytes packets errs drop fifo frame
+    # compressed multicast tx_bytes ..." (16 counters) per interface. The colon
+    # is not always followed by a space, so it is turned into one and the
+    # whole table is split in a single call; every 17th token is a name.
+    body = data[data.index(b'\n', data.index(b'\n') + 1) + 1:]
+    tokens = body.replace(b':', b' ').split()
+    return tokens[0::17], list(map(int, tokens[1::17])), list(map(int, tokens[9::17]))
+
+
+class ThroughputSampler:
+    """Samples /proc/net/dev on a background thread and keeps recent rates per interface.
+
+    Read the results from any thread with rates() and history(); reads see
+    whole samples because each sample is applied under a lock.
+    """
+
+    def __init__(self, interval: float = 0.1, capacity: int = 100, path: str = PROC_NET_DEV):
+        """
+        Args:
+            interval: Seconds between samples.
+            capacity: Samples kept per interface.
+            path: File in /proc/net/dev format.
+        """
+        self.interval = interval
+        self.capacity = capacity
+        self.path = path
+        self.samples = 0
+        # Histories in /proc/net/dev order, the raw names in that order, and
+        # the same histories by decoded name for readers
+        self._order = []
+        self._names = []
+        self._histories = {}
+        self._last_time = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def start(self):
+        """Start sampling; does nothing if already running."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="throughput-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling. Buffered history is kept; rates resume on the next start()."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        self._last_time = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except OSError as e:
+                print(f"Error sampling network throughput: {e}")
+                return
+            # Fixed-rate schedule; skip ticks rather than bunch them up
+            next_time += self.interval
+            delay = next_time - time.monotonic()
+            if delay < 0:
+                next_time = time.monotonic()
+                delay = 0
+            self._stop.wait(delay)
+
+    def sample(self, now: Optional[float] = None):
+        """Read the counters once and update every interface's rates."""
+        if self._file is None:
+            self._file = open(self.path, "rb", buffering=0)
+        self._file.seek(0)
+        data = self._file.read()
+        now = time.monotonic() if now is None else now
+        names, rx_counters, tx_counters = parse_proc_net_dev(data)
+
+        with self._lock:
+            elapsed = None if self._last_time is None else now - self._last_time
+            self._last_time = now
+            if names != self._names:
+                # Interfaces came or went: rebuild the slot order, keeping
+                # the history of interfaces that are still there
+                previous = dict(zip(self._names, self._order))
+                self._order = [previous.get(name) or RateHistory(self.capacity, rx, tx)
+                               for name, rx, tx in zip(names, rx_counters, tx_counters)]
+                self._names = names
+                self._histories = {name.decode('ascii', 'replace'): history
+                                   for name, history in zip(names, self._order)}
+            if elapsed:
+                for history, rx, tx in zip(self._order, rx_counters, tx_counters):
+                    history.add(rx, tx, elapsed)
+            else:
+                for history, rx, tx in zip(self._order, rx_counters, tx_counters):
+                    history.last_rx = rx
+                    history.last_tx = tx
+            self.samples += 1
+
+    def interfaces(self) -> List[str]:
+        with self._lock:
+            return list(self._histories)
+
+    def rates(self, interface: str) -> Tuple[float, float]:
+        """Latest (RX, TX) bytes per second for an interface."""
+        with self._lock:
+            history = self._histories.get(interface)
+            return history.latest() if history is not None else (0.0, 0.0)
+
+    def history(self, interface: str) -> Tuple[List[float], List[float]]:
+        """Buffered (RX, TX) rates for an interface, oldest first."""
+        with self._lock:
+            history = self._histories.get(interface)
+            return history.values() if history is not None else ([], [])
+
+    def snapshot(self) -> Dict[str, Tuple[List[float], List[float]]]:
+        """Buffered rates of every interface, under one lock acquisition."""
+        with self._lock:
+            return {name: history.values() for name, history in self._histories.items()}
+
+
+def format_rate(bytes_per_second: float) -> str:
+    """Format a rate as e.g. "12.3 kB/s"."""
+    for unit in ("B/s", "kB/s", "MB/s", "GB/s"):
+        if bytes_per_second < 1000 or unit == "GB/s":
+            return f"{bytes_per_second:.0f} {unit}" if unit == "B/s" else f"{bytes_per_second:.1f} {unit}"
+        bytes_per_second /= 1000
@@ -1,39 +1,92 @@
+import os
+import sys
+import time
+
+# Taken before PyQt5 is imported so the startup probe covers import time too
+STARTED = time.perf_counter()
+
 from PyQt5.QtWidgets import QApplication, QStackedWidget
-from ui.welcome_page import WelcomePage
-from ui.info_page import InfoPage
-from ui.devices_page import DevicesPage
+from PyQt5.QtCore import QTimer
+from ui.styles import apply_theme
+
+# --startup-probe opens the Devices page after the first paint, prints the
+# time to first paint and to first inventory, and exits
+PROBE_STARTUP = "--startup-probe" in sys.argv
 
-app = QApplication([])
+app = QApplication(sys.argv)
 
-# Global dark theme
-app.setStyleSheet("""
-    QWidget {
-        background-color: #141217;
-    }
-""")
+# Global dark theme, parsed once for every page and card
+apply_theme(app)
 
 stack = QStackedWidget()
 
-# Navigation functions (defined after page creation)
+# Pages are built (and their modules imported) on first navigation, so
+# startup only pays for the Welcome page
+pages = {}
+
+def create_welcome_page():
+    from ui.welcome_page import WelcomePage
+    return WelcomePage(go_to_devices, go_to_info)
+
+def create_info_page():
+    from ui.info_page import InfoPage
+    return InfoPage(go_back_to_welcome, go_to_devices)
+
+def open_history():
+    """Open the device history database; DEVICE_MONITOR_HISTORY overrides its path."""
+    import sqlite3
+    from core.history import DEFAULT_PATH, HistoryStore
+    try:
+        history = HistoryStore(os.environ.get("DEVICE_MONITOR_HISTORY", DEFAULT_PATH))
+    except (OSError, sqlite3.Error) as e:
+        print(f"Device history disabled: {e}")
+        return None
+    app.aboutToQuit.connect(history.close)
+    return history
+
+def create_devices_page():
+    from ui.devices_page import DevicesPage
+    page = DevicesPage(go_back_to_welcome, history=open_history())
+    if probe is not None:
+        probe.watch_inventory(page)
+    return page
+
+PAGE_FACTORIES = {
+    'welcome': create_welcome_page,
+    'info': create_info_page,
+    'devices': create_devices_page,
+}
+
+def show_page(name):
+    page = pages.get(name)
+    if page is None:
+        page = pages[name] = PAGE_FACTORIES[name]()
+        stack.addWidget(page)
+    stack.setCurrentWidget(page)
+
+# Navigation functions
 def go_to_devices():
-    stack.setCurrentWidget(devices_page)
+    show_page('devices')
 
 def go_to_info():
-    stack.setCurrentWidget(info_page)
+    show_page('info')
 
 def go_back_to_welcome():
-    stack.setCurrentWidget(welcome_page)
+    show_page('welcome')
+
+probe = None
+if PROBE_STARTUP:
+    from ui.startup_probe import StartupProbe
 
-# Pages
-welcome_page = WelcomePage(go_to_devices, go_to_info)
-info_page = InfoPage(go_back_to_welcome, go_to_devices)
-devices_page = DevicesPage(go_back_to_welcome)
+    def finish_probe(timings):
+        print(f"Startup: {probe.report()}")
+        app.quit()
 
-stack.addWidget(welcome_page)
-stack.addWidget(info_page)
-stack.addWidget(devices_page)
+    probe = StartupProbe(STARTED, finish_probe)
+    probe.on_first_paint = lambda: QTimer.singleShot(0, go_to_devices)
+    probe.watch_paint(stack)
 
-stack.setCurrentWidget(welcome_page)
+go_back_to_welcome()
 stack.setFixedSize(1000, 800)
 stack.show()
 app.exec_()
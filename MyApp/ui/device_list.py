@@ -0,0 +1,243 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QListView, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRectF, QSize
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen
+from core.records import UsbDevice
+from ui.styles import COLORS
+
+# Item data roles
+DeviceRole = Qt.UserRole + 1
+DetailsRole = Qt.UserRole + 2
+
+
+def detail_text(field, value):
+    """Format one detail line, e.g. "Vendor Id: 046d"."""
+    return f"{field.replace('_', ' ').title()}: {value}"
+
+
+def detail_items(device, ids=None):
+    """Return (field, text) pairs for the detail lines shown under a device's name and type.
+
+    Args:
+        device: Device record.
+        ids: IdResolver, normally the scanner's. USB vendor and product ids
+            are followed by their names from it, e.g.
+            "Vendor Id: 046d (Logitech, Inc.)"; None shows the ids alone.
+    """
+    items = []
+    for field, value in device.details():
+        text = detail_text(field, value)
+        if ids is not None and isinstance(device, UsbDevice) and field in ('vendor_id', 'product_id'):
+            name = (ids.usb_vendor(value) if field == 'vendor_id'
+                    else ids.usb_product(device.vendor_id, value))
+            if name:
+                text = f"{text} ({name})"
+        items.append((field, text))
+    return items
+
+
+def device_details(device, ids=None):
+    """Return the detail lines shown under a device's name and type; see detail_items()."""
+    return [text for _field, text in detail_items(device, ids)]
+
+
+class DeviceListModel(QAbstractListModel):
+    """List model of device records, reconciled by identity key on every update."""
+
+    def __init__(self, parent=None, ids=None):
+        """
+        Args:
+            parent: Parent QObject.
+            ids: IdResolver for the names shown after vendor and product ids.
+        """
+        super().__init__(parent)
+        self.ids = ids
+        self._keys = []
+        self._devices = []
+        self._details = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._devices)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return self._devices[row].name
+        if role == DeviceRole:
+            return self._devices[row]
+        if role == DetailsRole:
+            # Precomputed so painting a row does no string formatting
+            return self._details[row]
+        return None
+
+    def set_devices(self, devices):
+        """Reconcile the model with a new device list.
+
+        Departed rows are removed, new rows inserted and changed rows reported
+        through dataChanged, so views keep their scroll position and only
+        repaint what changed. A change in the order of surviving devices falls
+        back to a model reset.
+
+        Returns:
+            Dictionary with the number of rows inserted, removed and changed.
+        """
+        stats = {'inserted': 0, 'removed': 0, 'changed': 0}
+        new_keys = []
+        new_devices = {}
+        for device in devices:
+            key = device.key
+            if key not in new_devices:
+                new_keys.append(key)
+                new_devices[key] = device
+
+        # Remove departed rows, last first, in contiguous runs
+        row = len(self._keys) - 1
+        while row >= 0:
+            if self._keys[row] in new_devices:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._keys[row] not in new_devices:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, last)
+            del self._keys[row + 1:last + 1]
+            del self._devices[row + 1:last + 1]
+            del self._details[row + 1:last + 1]
+            self.endRemoveRows()
+            stats['removed'] += last - row
+
+        current = set(self._keys)
+        surviving = [key for key in new_keys if key in current]
+        if surviving != self._keys:
+            self.beginResetModel()
+            self._keys = new_keys
+            self._devices = [new_devices[key] for key in new_keys]
+            self._details = [device_details(device, self.ids) for device in self._devices]
+            self.endResetModel()
+            stats['inserted'] = len(new_keys)
+            return stats
+
+        # Update surviving rows in place
+        for row, key in enumerate(self._keys):
+            device = new_devices[key]
+            if not self._devices[row].same_as(device):
+                self._devices[row] = device
+                self._details[row] = device_details(device, self.ids)
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+                stats['changed'] += 1
+
+        # Insert new rows at their target positions, in contiguous runs
+        row = 0
+        while row < len(new_keys):
+            if row < len(self._keys) and self._keys[row] == new_keys[row]:
+                row += 1
+                continue
+            # Everything up to the next surviving row is new
+            first = row
+            next_key = self._keys[first] if first < len(self._keys) else None
+            while row < len(new_keys) and new_keys[row] != next_key:
+                row += 1
+            run = new_keys[first:row]
+            self.beginInsertRows(QModelIndex(), first, row - 1)
+            self._keys[first:first] = run
+            self._devices[first:first] = [new_devices[key] for key in run]
+            self._details[first:first] = [device_details(new_devices[key], self.ids) for key in run]
+            self.endInsertRows()
+            stats['inserted'] += len(run)
+
+        return stats
+
+
+class DeviceCardDelegate(QStyledItemDelegate):
+    """Paints a device row as a card, matching the look of DeviceCard."""
+
+    PADDING = 12
+    MARGIN = 5
+    SPACING = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.name_font = QFont()
+        self.name_font.setPixelSize(18)
+        self.name_font.setBold(True)
+        self.detail_font = QFont()
+        self.detail_font.setPixelSize(14)
+        self.status_font = QFont(self.detail_font)
+        self.status_font.setBold(True)
+        self.name_height = QFontMetrics(self.name_font).height()
+        self.detail_height = QFontMetrics(self.detail_font).height()
+
+        self.card_color = QColor(COLORS['card'])
+        self.border_color = QColor(255, 255, 255, 26)
+        self.name_color = QColor(COLORS['text'])
+        self.type_color = QColor(COLORS['text_muted'])
+        self.detail_color = QColor(COLORS['text_secondary'])
+        self.connected_color = QColor(COLORS['connected'])
+        self.disconnected_color = QColor(COLORS['disconnected'])
+
+    def sizeHint(self, option, index):
+        details = index.data(DetailsRole) or []
+        height = (2 * (self.PADDING + self.MARGIN) + self.name_height
+                  + (1 + len(details)) * (self.SPACING + self.detail_height))
+        return QSize(option.rect.width(), height)
+
+    def paint(self, painter, option, index):
+        device = index.data(DeviceRole)
+        if device is None:
+            return
+        details = index.data(DetailsRole) or []
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        card = QRectF(option.rect).adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        painter.setPen(QPen(self.border_color, 1))
+        painter.setBrush(self.card_color)
+        painter.drawRoundedRect(card, 8, 8)
+
+        content = card.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING)
+        y = content.top()
+
+        painter.setFont(self.name_font)
+        painter.setPen(self.name_color)
+        painter.drawText(QRectF(content.left(), y, content.width(), self.name_height),
+                         Qt.AlignLeft | Qt.AlignVCenter, device.name)
+        y += self.name_height + self.SPACING
+
+        line = QRectF(content.left(), y, content.width(), self.detail_height)
+        painter.setFont(self.detail_font)
+        painter.setPen(self.type_color)
+        painter.drawText(line, Qt.AlignLeft | Qt.AlignVCenter, device.type)
+
+        connected = device.connected
+        painter.setFont(self.status_font)
+        painter.setPen(self.connected_color if connected else self.disconnected_color)
+        painter.drawText(line, Qt.AlignRight | Qt.AlignVCenter, "Connected" if connected else "Disconnected")
+        y += self.detail_height + self.SPACING
+
+        painter.setFont(self.detail_font)
+        painter.setPen(self.detail_color)
+        for text in details:
+            painter.drawText(QRectF(content.left(), y, content.width(), self.detail_height),
+                             Qt.AlignLeft | Qt.AlignVCenter, text)
+            y += self.detail_height + self.SPACING
+
+        painter.restore()
+
+
+class DeviceListView(QListView):
+    """Virtualized device list: only rows in the viewport are painted."""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(DeviceCardDelegate(self))
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        # Lay out large models in batches so the event loop stays responsive
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setFrameShape(QListView.NoFrame)
@@ -1,167 +1,250 @@
+import operator
+import os
+import time
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                           QPushButton, QScrollArea, QFrame, QGridLayout, QSplitter)
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QIcon, QFont
-from ui.styles import APP_STYLE
+                           QPushButton, QScrollArea, QFrame, QGridLayout, QSplitter, QShortcut)
+from PyQt5.QtCore import Qt, QEvent, QTimer, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QIcon, QFont, QKeySequence
+from core.backends import LIST_VIEW
 from core.device_scanner import DeviceScanner
+from core.hotplug import UsbHotplugMonitor
+from core.metrics import default_metrics
+from core.scheduler import AdaptiveInterval
+from core.throughput import ThroughputSampler, format_rate
+from ui.metrics_overlay import MetricsOverlay
+from ui.refresh_scheduler import RefreshScheduler
+from ui.sparkline import Sparkline
+from ui.scan_worker import ScanWorker
+from ui.device_list import DeviceListModel, DeviceListView, detail_items
 
 class DeviceCard(QFrame):
-    """Card widget to display device information."""
+    """Card widget to display a UsbDevice or NetworkAdapter record."""
+
+    THROUGHPUT_ROW = 1000
     
-    def __init__(self, device_info):
+    def __init__(self, device_info, ids=None):
+        """
+        Args:
+            device_info: The record to show.
+            ids: IdResolver for the names shown after vendor and product ids.
+        """
         super().__init__()
         self.device_info = device_info
+        self.ids = ids
         self.init_ui()
         
     def init_ui(self):
         self.setObjectName("deviceCard")
-        self.setStyleSheet("""
-            QFrame#deviceCard {
-                background-color: #1E1E1E;
-                border-radius: 8px;
-                padding: 12px;
-                margin: 5px;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-            }
-            QLabel#deviceName {
-                font-size: 18px;
-                font-weight: bold;
-                color: #FFFFFF;
-            }
-            QLabel#deviceType {
-                font-size: 14px;
-                color: #9388A2;
-            }
-            QLabel#deviceDetail {
-                font-size: 14px;
-                color: #E5E8EB;
-            }
-            QLabel#deviceStatus {
-                font-size: 14px;
-                color: #66DD91;
-                font-weight: bold;
-            }
-            QLabel#deviceDisconnected {
-                font-size: 14px;
-                color: #F87272;
-                font-weight: bold;
-            }
-        """)
         
-        layout = QGridLayout()
-        layout.setSpacing(8)
+        self.grid = QGridLayout()
+        self.grid.setSpacing(8)
         
         # Device name
-        name_label = QLabel(self.device_info.get('name', 'Unknown Device'))
-        name_label.setObjectName("deviceName")
-        layout.addWidget(name_label, 0, 0, 1, 2)
+        self.name_label = QLabel()
+        self.name_label.setObjectName("deviceName")
+        self.grid.addWidget(self.name_label, 0, 0, 1, 2)
         
         # Device type
-        type_label = QLabel(self.device_info.get('type', 'Unknown Type'))
-        type_label.setObjectName("deviceType")
-        layout.addWidget(type_label, 1, 0)
+        self.type_label = QLabel()
+        self.type_label.setObjectName("deviceType")
+        self.grid.addWidget(self.type_label, 1, 0)
         
         # Status
-        connected = self.device_info.get('connected', False)
-        status_label = QLabel("Connected" if connected else "Disconnected")
-        status_label.setObjectName("deviceStatus" if connected else "deviceDisconnected")
-        layout.addWidget(status_label, 1, 1, alignment=Qt.AlignRight)
-        
-        # Additional details
-        row = 2
-        for key, value in self.device_info.items():
-            # Skip the keys we've already displayed or internal keys
-            if key in ['name', 'type', 'connected'] or key.startswith('_'):
-                continue
-                
-            if value:
-                detail_label = QLabel(f"{key.replace('_', ' ').title()}: {value}")
-                detail_label.setObjectName("deviceDetail")
-                layout.addWidget(detail_label, row, 0, 1, 2)
-                row += 1
+        self.status_label = QLabel()
+        self.grid.addWidget(self.status_label, 1, 1, alignment=Qt.AlignRight)
         
-        self.setLayout(layout)
+        # Additional details, keyed by record field
+        self.detail_labels = {}
+
+        # Live RX/TX rates, created on the first set_throughput()
+        self.rate_label = None
+        self.sparkline = None
+        
+        self.setLayout(self.grid)
+        # Widgets the card is made of: itself, name, type and status labels,
+        # plus the detail and throughput widgets as they are added
+        self.widget_count = 4
+        self.update_info(self.device_info)
+
+    def update_info(self, device_info):
+        """Update the card in place for a new record of the same device.
+
+        Only labels whose text changed are touched; detail labels are created
+        or destroyed only when a field appears or disappears.
+
+        Returns:
+            Tuple of (widgets created, widgets destroyed).
+        """
+        self.device_info = device_info
+        created = destroyed = 0
+
+        self._set_text(self.name_label, device_info.name)
+        self._set_text(self.type_label, device_info.type)
+
+        connected = device_info.connected
+        self._set_text(self.status_label, "Connected" if connected else "Disconnected")
+        status_name = "deviceStatus" if connected else "deviceDisconnected"
+        if self.status_label.objectName() != status_name:
+            self.status_label.setObjectName(status_name)
+            # Object name selectors only re-apply after a re-polish
+            self.status_label.style().unpolish(self.status_label)
+            self.status_label.style().polish(self.status_label)
+
+        details = dict(detail_items(device_info, self.ids))
+
+        for key in list(self.detail_labels):
+            if key not in details:
+                label = self.detail_labels.pop(key)
+                self.grid.removeWidget(label)
+                label.deleteLater()
+                destroyed += 1
+
+        layout_changed = destroyed > 0
+        for key, text in details.items():
+            label = self.detail_labels.get(key)
+            if label is None:
+                label = QLabel(text)
+                label.setObjectName("deviceDetail")
+                self.detail_labels[key] = label
+                created += 1
+                layout_changed = True
+            else:
+                self._set_text(label, text)
+
+        if layout_changed:
+            # Re-pack detail rows in field order
+            for key in details:
+                self.grid.removeWidget(self.detail_labels[key])
+            for row, key in enumerate(details, start=2):
+                self.grid.addWidget(self.detail_labels[key], row, 0, 1, 2)
+
+        self.widget_count += created - destroyed
+        return created, destroyed
+
+    def set_throughput(self, rx, tx):
+        """Show recent RX/TX rates (bytes per second, oldest first) below the details.
+
+        Returns:
+            Number of widgets created.
+        """
+        created = 0
+        if self.sparkline is None:
+            self.rate_label = QLabel()
+            self.rate_label.setObjectName("deviceDetail")
+            self.sparkline = Sparkline()
+            # Far below the detail rows; QGridLayout skips the empty rows between
+            self.grid.addWidget(self.rate_label, self.THROUGHPUT_ROW, 0, 1, 2)
+            self.grid.addWidget(self.sparkline, self.THROUGHPUT_ROW + 1, 0, 1, 2)
+            created = 2
+            self.widget_count += created
+        rx_rate = rx[-1] if rx else 0.0
+        tx_rate = tx[-1] if tx else 0.0
+        self._set_text(self.rate_label, f"RX {format_rate(rx_rate)}  ·  TX {format_rate(tx_rate)}")
+        self.sparkline.set_values(rx, tx)
+        return created
+
+    @staticmethod
+    def _set_text(label, text):
+        if label.text() != text:
+            label.setText(text)
+
+
+class _Section:
+    """Widgets of one category's section: a list model and view, or cards in a layout."""
+
+    __slots__ = ('category', 'empty_label', 'model', 'view', 'layout', 'cards')
+
+    def __init__(self, category, empty_label):
+        self.category = category
+        self.empty_label = empty_label
+        self.model = None
+        self.view = None
+        self.layout = None
+        self.cards = None
 
 
 class DevicesPage(QWidget):
     """Page displaying all detected devices."""
-    
-    def __init__(self, go_back_callback):
+
+    # Emitted (possibly from the hotplug thread) with the new USB device list
+    usb_devices_changed = pyqtSignal(list)
+    # Emitted on the GUI thread after scan results have been shown
+    scan_applied = pyqtSignal()
+
+    def __init__(self, go_back_callback, hotplug_source=None, history=None, scanner=None):
+        """
+        Args:
+            go_back_callback: Called by the Go Back button.
+            hotplug_source: Uevent source for the USB hotplug monitor; the
+                kernel socket is used when None.
+            history: HistoryStore that records connect/disconnect events, if any.
+            scanner: DeviceScanner to use; a default one if None. Its
+                registry decides the sections and its ID databases name
+                the vendor and product ids shown.
+        """
         super().__init__()
+        # Lets the application theme scope page-specific rules
+        self.setObjectName("devicesPage")
         self.go_back_callback = go_back_callback
-        self.device_scanner = DeviceScanner()
-        
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #141217;
-                color: #FFFFFF;
-                font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            }
-            QPushButton {
-                background-color: #801AE5;
-                color: white;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 20px;
-                padding: 16px 24px;
-                font-weight: bold;
-                font-size: 20px;
-                min-width: 160px;
-                max-width: 250px;
-                height: 35px;
-            }
-            QPushButton:hover {
-                background-color: #9025F5;
-                min-width: 170px;
-                height: 40px;
-                font-size: 21px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            QPushButton:pressed {
-                background-color: #7015D5;
-                min-width: 165px;
-                height: 38px;
-            }
-            QPushButton#secondary {
-                background-color: #302938;
-            }
-            QPushButton#secondary:hover {
-                background-color: #403948;
-                min-width: 170px;
-                height: 40px;
-                font-size: 21px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            QPushButton#secondary:pressed {
-                background-color: #201928;
-                min-width: 165px;
-                height: 38px;
-            }
-            QLabel#title {
-                font-size: 24px;
-                font-weight: bold;
-                color: #FFFFFF;
-            }
-            QLabel#sectionTitle {
-                font-size: 20px;
-                font-weight: bold;
-                color: #FFFFFF;
-                margin-top: 20px;
-            }
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QSplitter::handle {
-                background-color: #333333;
-            }
-        """)
+        self.device_scanner = scanner if scanner is not None else DeviceScanner()
+        self.history = history
+        self.usb_monitor = None
+        self._hotplug_source = hotplug_source
+        self._usb_monitor_tried = False
+        # One section per registered category with a backend on this
+        # platform, in registration order; filled by init_ui()
+        self.categories = tuple(self.device_scanner.categories())
+        self.sections = {}
+        # Widget and row churn of the last refresh, and widgets since the page was created
+        self.last_refresh_stats = self._empty_refresh_stats()
+        self.widget_totals = {'created': 0, 'destroyed': 0}
+        self.usb_devices_changed.connect(self._on_usb_devices_changed)
+
+        # Scans run on a worker thread. Every scan (and every hotplug update)
+        # gets a generation number so results older than what is shown are
+        # dropped, per category. Categories that come due while a scan runs
+        # are scanned as soon as it finishes.
+        self.thread_pool = QThreadPool.globalInstance()
+        self._scan_in_progress = False
+        self._scanning_categories = ()
+        self._pending_categories = set()
+        self._scan_generation = 0
+        self._applied_generation = {category: 0 for category in self.categories}
+        # Categories of the running scan that have not reported yet, and
+        # whether any of its results were applied or rendered
+        self._unanswered = set()
+        self._scan_results_applied = False
+        self._scan_results_rendered = False
+        # Records last rendered per category, to recognise a repeated scan
+        self._shown_records = {}
+        self._scan_started_at = 0.0
+
+        # Refresh phase timings; shown by the overlay (Ctrl+Shift+M)
+        self.metrics = default_metrics
+        self._metrics_enabled_before_overlay = self.metrics.enabled
         
         self.init_ui()
-        
-        # Set up a timer to refresh device list periodically
-        self.refresh_timer = QTimer(self)
-        self.refresh_timer.timeout.connect(self.refresh_devices)
-        self.refresh_timer.start(5000)  # Refresh every 5 seconds
+
+        # Each category is rescanned on its own adaptive interval while the
+        # page is visible and the window is not minimized. Nothing is scanned
+        # until the page is first shown; see showEvent().
+        registry = self.device_scanner.registry
+        self.scheduler = RefreshScheduler({
+            name: AdaptiveInterval(base=base, maximum=maximum, fast=fast)
+            for name in self.categories
+            for base, maximum, fast in (registry.category(name).interval,)
+        }, self)
+        self.scheduler.due.connect(self._on_refresh_due)
+        self._refresh_active = False
+        self._watched_window = None
+
+        # Network RX/TX rates are sampled at 10 Hz off the GUI thread; the
+        # cards' sparklines are redrawn twice a second while the page is visible
+        sampler = ThroughputSampler(interval=0.1, capacity=100)
+        self.throughput = sampler if sampler.available() else None
+        self.throughput_timer = QTimer(self)
+        self.throughput_timer.setInterval(500)
+        self.throughput_timer.timeout.connect(self._update_throughput)
         
     def init_ui(self):
         main_layout = QVBoxLayout()
@@ -178,110 +261,425 @@ class DevicesPage(QWidget):
         title = QLabel("Connected Devices")
         title.setObjectName("title")
         
-        refresh_button = QPushButton("Refresh")
-        refresh_button.clicked.connect(self.refresh_devices)
+        self.scan_status_label = QLabel("Scanning...")
+        self.scan_status_label.setObjectName("scanStatus")
+        self.scan_status_label.hide()
+        
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.clicked.connect(self._on_refresh_clicked)
         
         header_layout.addWidget(back_button)
         header_layout.addWidget(title)
         header_layout.addStretch()
-        header_layout.addWidget(refresh_button)
+        header_layout.addWidget(self.scan_status_label)
+        header_layout.addWidget(self.refresh_button)
         
         main_layout.addLayout(header_layout)
         
         # Create a splitter to allow resizing sections
         splitter = QSplitter(Qt.Vertical)
         
-        # USB Devices Section
-        usb_section = QWidget()
-        usb_layout = QVBoxLayout(usb_section)
-        usb_layout.setContentsMargins(0, 0, 0, 0)
-        
-        usb_title = QLabel("USB Devices")
-        usb_title.setObjectName("sectionTitle")
-        usb_layout.addWidget(usb_title)
-        
-        self.usb_devices_area = QScrollArea()
-        self.usb_devices_area.setWidgetResizable(True)
-        self.usb_devices_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        
-        self.usb_devices_container = QWidget()
-        self.usb_devices_layout = QVBoxLayout(self.usb_devices_container)
-        self.usb_devices_layout.setAlignment(Qt.AlignTop)
-        self.usb_devices_area.setWidget(self.usb_devices_container)
-        
-        usb_layout.addWidget(self.usb_devices_area)
-        splitter.addWidget(usb_section)
-        
-        # Network Adapters Section
-        network_section = QWidget()
-        network_layout = QVBoxLayout(network_section)
-        network_layout.setContentsMargins(0, 0, 0, 0)
-        
-        network_title = QLabel("Network Adapters")
-        network_title.setObjectName("sectionTitle")
-        network_layout.addWidget(network_title)
-        
-        self.network_devices_area = QScrollArea()
-        self.network_devices_area.setWidgetResizable(True)
-        self.network_devices_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        
-        self.network_devices_container = QWidget()
-        self.network_devices_layout = QVBoxLayout(self.network_devices_container)
-        self.network_devices_layout.setAlignment(Qt.AlignTop)
-        self.network_devices_area.setWidget(self.network_devices_container)
-        
-        network_layout.addWidget(self.network_devices_area)
-        splitter.addWidget(network_section)
+        registry = self.device_scanner.registry
+        for name in self.categories:
+            splitter.addWidget(self._create_section(registry.category(name)))
         
         main_layout.addWidget(splitter)
         
         self.setLayout(main_layout)
-        
-        # Initial device scan
-        self.refresh_devices()
-    
-    def refresh_devices(self):
-        """Refresh the device list."""
-        # Clear current devices
-        self._clear_layout(self.usb_devices_layout)
-        self._clear_layout(self.network_devices_layout)
-        
-        # Get connected devices
-        devices = self.device_scanner.get_connected_devices()
-        network_adapters = self.device_scanner.get_network_adapters()
-        
-        # Add device cards to layout
-        if devices:
-            for device in devices:
-                self.usb_devices_layout.addWidget(DeviceCard(device))
+
+        # Performance overlay, floating over the page
+        self.metrics_overlay = MetricsOverlay(self.metrics, self)
+        QShortcut(QKeySequence("Ctrl+Shift+M"), self, activated=self.toggle_metrics_overlay)
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.dump_metrics)
+
+    def _create_section(self, category):
+        """Build the section widget of a category and register it in self.sections."""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        title = QLabel(category.title)
+        title.setObjectName("sectionTitle")
+        layout.addWidget(title)
+
+        # Empty-state label is toggled against the devices
+        empty_label = QLabel(category.empty_text)
+        empty_label.setAlignment(Qt.AlignCenter)
+        empty_label.hide()
+
+        section = _Section(category.name, empty_label)
+        if category.view == LIST_VIEW:
+            # Only the rows in the viewport are laid out and painted, so hubs
+            # with hundreds of devices cost no more than a handful
+            section.model = DeviceListModel(self, self.device_scanner.ids)
+            section.view = DeviceListView(section.model)
+            layout.addWidget(section.view)
+            layout.addWidget(empty_label)
         else:
-            no_devices_label = QLabel("No USB devices detected")
-            no_devices_label.setAlignment(Qt.AlignCenter)
-            self.usb_devices_layout.addWidget(no_devices_label)
-        
-        # Add network adapter cards to layout
-        if network_adapters:
-            for adapter in network_adapters:
-                self.network_devices_layout.addWidget(DeviceCard(adapter))
+            # One card per record, keyed by record identity
+            area = QScrollArea()
+            area.setWidgetResizable(True)
+            area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            container = QWidget()
+            section.layout = QVBoxLayout(container)
+            section.layout.setAlignment(Qt.AlignTop)
+            section.cards = {}
+            area.setWidget(container)
+            # The empty-state label stays in the layout after the cards
+            section.layout.addWidget(empty_label)
+            layout.addWidget(area)
+        self.sections[category.name] = section
+        return widget
+
+    def toggle_metrics_overlay(self):
+        """Show or hide the metrics overlay; metrics are collected while it is shown."""
+        if self.metrics_overlay.isVisible():
+            self.metrics_overlay.hide()
+            self.metrics.enabled = self._metrics_enabled_before_overlay
         else:
-            no_adapters_label = QLabel("No network adapters detected")
-            no_adapters_label.setAlignment(Qt.AlignCenter)
-            self.network_devices_layout.addWidget(no_adapters_label)
+            self._metrics_enabled_before_overlay = self.metrics.enabled
+            self.metrics.enabled = True
+            self.metrics_overlay.show()
+
+    def dump_metrics(self, path="device-monitor-stats.json"):
+        """Write the collected metrics as JSON."""
+        self.metrics.dump(path)
+        print(f"Metrics written to {os.path.abspath(path)}")
+
+    def _start_usb_monitor(self, force=False):
+        """Switch USB scanning to event mode if the kernel uevent socket is usable.
+
+        Runs on the scan worker as part of the first scan, since starting the
+        monitor does a full USB scan.
+
+        Returns:
+            The current list of USB devices, from the monitor or a regular scan.
+        """
+        usb_root = os.path.join(self.device_scanner.sysfs_root, "bus", "usb", "devices")
+        if self._hotplug_source is not None or (self.device_scanner.system == "Linux" and os.path.isdir(usb_root)):
+            monitor = UsbHotplugMonitor(self.device_scanner, self.usb_devices_changed.emit, self._hotplug_source)
+            try:
+                monitor.start()
+            except OSError as e:
+                print(f"USB hotplug events unavailable, polling instead: {e}")
+            else:
+                self.usb_monitor = monitor
+                return monitor.devices()
+        return self.device_scanner.get_connected_devices(force=force)
+    
+    def refresh_devices(self, force=False, categories=None):
+        """Start a background scan of the given categories.
+
+        The categories' backends run concurrently and each section is
+        updated as soon as its backend finishes. While another scan is
+        running, categories it does not cover are scanned as soon as it
+        finishes; the rest are skipped.
+
+        Args:
+            force: Bypass the scanner's result cache.
+            categories: Categories to scan; all of self.categories by default.
+        """
+        if categories is None:
+            categories = self.categories
+        if self._scan_in_progress:
+            missing = set(categories).difference(self._scanning_categories)
+            if missing:
+                self._pending_categories.update(missing)
+            else:
+                self.metrics.increment("refresh.skipped")
+            return
+
+        scanner = self.device_scanner
+        scans = {}
+        for category in categories:
+            if category == 'usb' and self.usb_monitor is not None:
+                # In event mode the USB inventory is kept current by the hotplug monitor
+                scan = self.usb_monitor.devices
+            elif category == 'usb' and not self._usb_monitor_tried:
+                # Prefer kernel hotplug events over polling when they are available
+                self._usb_monitor_tried = True
+                scan = lambda: self._start_usb_monitor(force)
+            else:
+                scan = lambda category=category: scanner.scan(category, force=force)
+            scans[category] = self.metrics.wrap(f"refresh.scan.{category}", scan)
+
+        self._scan_generation += 1
+        self._scan_started_at = time.perf_counter()
+        self._scanning_categories = tuple(categories)
+        self._unanswered = set(categories)
+        self._scan_results_applied = self._scan_results_rendered = False
+        self.last_refresh_stats = self._empty_refresh_stats()
+
+        def results():
+            # Detail lines name USB ids from the scanner's usb.ids; open it
+            # (and build its index, on first use) here rather than on the GUI thread
+            scanner.ids.database('usb')
+            return scanner.scan_concurrently(categories, force, scans)
+
+        worker = ScanWorker(self._scan_generation, results)
+        worker.signals.result.connect(self._on_scan_result)
+        worker.signals.failed.connect(self._on_scan_failed)
+        worker.signals.finished.connect(self._on_scan_finished)
+        self._set_scanning(True)
+        self.thread_pool.start(worker)
+
+    def _on_refresh_clicked(self):
+        """An explicit refresh always rescans instead of reusing cached results."""
+        self.refresh_devices(force=True)
+
+    def _set_scanning(self, scanning):
+        """Toggle the visible scanning state."""
+        self._scan_in_progress = scanning
+        self.scan_status_label.setVisible(scanning)
+        self.refresh_button.setEnabled(not scanning)
+
+    def _on_scan_result(self, generation, category, records):
+        """Apply one category's scan result unless newer data is already shown."""
+        self._unanswered.discard(category)
+        # Worker queueing plus this category's backend
+        self.metrics.record(f"refresh.wait.{category}", time.perf_counter() - self._scan_started_at)
+        if generation < self._applied_generation[category]:
+            self.metrics.increment("refresh.stale")
+            self._schedule_next(category, False)
+            return
+        self._applied_generation[category] = generation
+        self._scan_results_applied = True
+        shown = self._shown_records.get(category)
+        if shown is not None and self._same_records(shown, records):
+            # The scanner's input fingerprint matched and it handed back
+            # the records already shown: nothing to render or record
+            self.metrics.increment(f"render.{category}.skipped")
+            self._schedule_next(category, False)
+            return
+        with self.metrics.span(f"refresh.render.{category}"):
+            changed = self._show_records(category, records)
+        self.metrics.increment(f"render.{category}.rendered")
+        self._shown_records[category] = records
+        self._scan_results_rendered = True
+        self._record_history(**{category: records})
+        # Filling the empty page is not a change worth polling faster for
+        self._schedule_next(category, changed and shown is not None)
+
+    def _on_scan_failed(self, generation, category, message):
+        """Report a backend that failed or timed out; its category keeps what is shown."""
+        self.metrics.increment("refresh.failed")
+        print(f"Error scanning {category or 'devices'}: {message}")
+        if category in self._unanswered:
+            self._unanswered.discard(category)
+            self._schedule_next(category, False)
+
+    def _on_scan_finished(self, generation):
+        """Finish a scan once every category has reported, and start any pending one."""
+        self._set_scanning(False)
+        for category in self._unanswered:
+            self._schedule_next(category, False)
+        self._unanswered = set()
+        if self._scan_results_rendered:
+            self._log_refresh_stats()
+        if self._scan_results_applied:
+            self.metrics.record("refresh.total", time.perf_counter() - self._scan_started_at)
+            self.scan_applied.emit()
+        self._run_pending()
+
+    def _run_pending(self):
+        """Scan the categories that came due while the last scan was running."""
+        if self._pending_categories and self._refresh_active:
+            categories = tuple(c for c in self.categories if c in self._pending_categories)
+            self._pending_categories.clear()
+            self.refresh_devices(categories=categories)
+        else:
+            self._pending_categories.clear()
+
+    def _on_refresh_due(self, category):
+        """Rescan a category whose interval has elapsed."""
+        self.metrics.increment(f"scheduler.due.{category}")
+        if category == 'usb' and self.usb_monitor is not None:
+            # Hotplug events keep the USB list current; nothing to poll
+            return
+        self.refresh_devices(categories=(category,))
+
+    def _schedule_next(self, category, changed):
+        """Arm the category's timer: sooner after a change, later while nothing changes."""
+        delay = self.scheduler.report(category, changed)
+        if self.metrics.enabled:
+            self.metrics.increment(f"scheduler.{category}.{'changed' if changed else 'unchanged'}")
+            self.metrics.record(f"scheduler.interval.{category}", delay)
+
+    def _on_usb_devices_changed(self, devices):
+        """Apply a hotplug update; any USB scan started before it is now stale."""
+        self._scan_generation += 1
+        self._applied_generation['usb'] = self._scan_generation
+        self.last_refresh_stats = self._empty_refresh_stats()
+        with self.metrics.span("hotplug.render"):
+            self._show_records('usb', devices)
+        self._shown_records['usb'] = devices
+        self._log_refresh_stats()
+        self._record_history(usb=devices)
+
+    @staticmethod
+    def _same_records(old, new):
+        """True if new holds the very record objects of old, in the same order."""
+        return len(old) == len(new) and all(map(operator.is_, old, new))
+
+    def _record_history(self, **inventories):
+        """Queue connect/disconnect/change events for the shown inventories."""
+        if self.history is None:
+            return
+        with self.metrics.span("refresh.history"):
+            for category, records in inventories.items():
+                self.history.record_scan(category, records)
+
+    def _show_records(self, category, records):
+        """Bring a category's section in line with its latest records.
+
+        Returns:
+            True if any row or card was added, removed, updated or moved.
+        """
+        section = self.sections[category]
+        if section.model is not None:
+            return self._show_list(section, records)
+        return self._reconcile(section.layout, section.cards, records, section.empty_label)
+
+    def _show_list(self, section, records):
+        """Reconcile a list section's model with the given records.
+
+        Returns:
+            True if any row was inserted, removed or changed.
+        """
+        row_stats = section.model.set_devices(records)
+        stats = self.last_refresh_stats
+        stats['rows_inserted'] += row_stats['inserted']
+        stats['rows_removed'] += row_stats['removed']
+        stats['updated'] += row_stats['changed']
+
+        has_devices = section.model.rowCount() > 0
+        section.view.setVisible(has_devices)
+        section.empty_label.setVisible(not has_devices)
+        return bool(row_stats['inserted'] or row_stats['removed'] or row_stats['changed'])
+
+    def _reconcile(self, layout, cards, items, empty_label):
+        """Bring a section's cards in line with items, keyed by record identity.
+
+        New items get a card, departed items lose theirs, and existing cards
+        are updated in place and moved only if their position changed.
+
+        Returns:
+            True if any card was added, removed, updated or moved.
+        """
+        stats = self.last_refresh_stats
+        seen = set()
+        changed = False
+
+        for item in items:
+            key = item.key
+            if key in seen:
+                # Two entries with the same identity; keep the first
+                continue
+            seen.add(key)
+
+            card = cards.get(key)
+            if card is None:
+                card = DeviceCard(item, self.device_scanner.ids)
+                cards[key] = card
+                stats['created'] += card.widget_count
+                changed = True
+            elif not card.device_info.same_as(item):
+                created, destroyed = card.update_info(item)
+                stats['created'] += created
+                stats['destroyed'] += destroyed
+                stats['updated'] += 1
+                changed = True
+
+            position = len(seen) - 1
+            if layout.indexOf(card) != position:
+                layout.removeWidget(card)
+                layout.insertWidget(position, card)
+                changed = True
+
+        for key in list(cards):
+            if key not in seen:
+                card = cards.pop(key)
+                layout.removeWidget(card)
+                stats['destroyed'] += card.widget_count
+                card.deleteLater()
+                changed = True
+
+        empty_label.setVisible(not cards)
+        return changed
+
+    def _update_throughput(self):
+        """Push the sampler's recent rates to the network cards."""
+        section = self.sections.get('network')
+        if section is None or section.cards is None:
+            return
+        histories = self.throughput.snapshot()
+        for card in section.cards.values():
+            adapter = card.device_info
+            values = histories.get(adapter.device or adapter.name)
+            if values is not None:
+                self.widget_totals['created'] += card.set_throughput(*values)
+
+    @staticmethod
+    def _empty_refresh_stats():
+        return {'created': 0, 'destroyed': 0, 'updated': 0, 'rows_inserted': 0, 'rows_removed': 0}
+
+    def _log_refresh_stats(self):
+        """Accumulate and report the widget churn of the last refresh."""
+        stats = self.last_refresh_stats
+        self.widget_totals['created'] += stats['created']
+        self.widget_totals['destroyed'] += stats['destroyed']
+        if self.metrics.enabled:
+            for name, value in stats.items():
+                self.metrics.increment(f"refresh.{name}", value)
+        if stats['created'] or stats['destroyed'] or stats['rows_inserted'] or stats['rows_removed']:
+            print(f"Device refresh: {stats['created']} widgets created, "
+                  f"{stats['destroyed']} destroyed, {stats['rows_inserted']} rows inserted, "
+                  f"{stats['rows_removed']} rows removed, {stats['updated']} items updated")
     
-    def _clear_layout(self, layout):
-        """Clear all widgets from a layout."""
-        while layout.count():
-            item = layout.takeAt(0)
-            widget = item.widget()
-            if widget is not None:
-                widget.deleteLater()
-                
     def showEvent(self, event):
         """Overriden show event to refresh devices when page is shown."""
         super().showEvent(event)
-        self.refresh_devices()
+        window = self.window()
+        if window is not self._watched_window:
+            # Minimizing does not hide child widgets on every platform
+            if self._watched_window is not None:
+                self._watched_window.removeEventFilter(self)
+            window.installEventFilter(self)
+            self._watched_window = window
+        if not window.isMinimized():
+            self._resume_refresh()
         
     def hideEvent(self, event):
-        """Overriden hide event to stop timer when page is hidden."""
+        """Overriden hide event to stop refreshing when page is hidden."""
         super().hideEvent(event)
-        self.refresh_timer.stop()
+        self._pause_refresh()
+
+    def eventFilter(self, watched, event):
+        if watched is self._watched_window and event.type() == QEvent.WindowStateChange:
+            if watched.isMinimized():
+                self._pause_refresh()
+            elif self.isVisible():
+                self._resume_refresh()
+        return super().eventFilter(watched, event)
+
+    def _resume_refresh(self):
+        """Rescan now and restart the scheduler and throughput sampling; idempotent."""
+        if self._refresh_active:
+            return
+        self._refresh_active = True
+        # Let the page paint before the scan is started
+        QTimer.singleShot(0, self.refresh_devices)
+        self.scheduler.resume()
+        if self.throughput is not None:
+            self.throughput.start()
+            self.throughput_timer.start()
+
+    def _pause_refresh(self):
+        """Stop scheduled scans and throughput sampling; idempotent."""
+        if not self._refresh_active:
+            return
+        self._refresh_active = False
+        self.scheduler.pause()
+        if self.throughput is not None:
+            self.throughput_timer.stop()
+            self.throughput.stop()
@@ -1,75 +1,10 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPalette, QColor
-from ui.styles import APP_STYLE
 
 class InfoPage(QWidget):
     def __init__(self, go_back_callback, go_to_devices_callback):
         super().__init__()
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #141217;
-                color: #FFFFFF;
-                font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            }
-            QPushButton {
-                background-color: #801AE5;
-                color: white;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 20px;
-                padding: 16px 24px;
-                font-weight: bold;
-                font-size: 20px;
-                min-width: 160px;
-                max-width: 250px;
-                height: 35px;
-            }
-            QPushButton:hover {
-                background-color: #9025F5;
-                min-width: 170px;
-                height: 40px;
-                font-size: 21px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            QPushButton:pressed {
-                background-color: #7015D5;
-                min-width: 165px;
-                height: 38px;
-            }
-            QPushButton#secondary {
-                background-color: #302938;
-            }
-            QPushButton#secondary:hover {
-                background-color: #403948;
-                min-width: 170px;
-                height: 40px;
-                font-size: 21px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            QPushButton#secondary:pressed {
-                background-color: #201928;
-                min-width: 165px;
-                height: 38px;
-            }
-            QLabel {
-                color: #FFFFFF;
-            }
-            QLabel#title {
-                font-size: 22px;
-                font-weight: bold;
-                color: #FFFFFF;
-            }
-            QLabel#welcome {
-                font-size: 32px;
-                font-weight: bold;
-                color: #FFFFFF;
-            }
-            QLabel#subtitle {
-                font-size: 22px;
-                color: #E5E8EB;
-                line-height: 1.6;
-            }
-        """)
         self.init_ui(go_back_callback, go_to_devices_callback)
 
     def init_ui(self, go_back_callback, go_to_devices_callback):
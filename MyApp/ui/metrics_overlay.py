@@ -0,0 +1,57 @@
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt, QTimer
+
+
+class MetricsOverlay(QLabel):
+    """Translucent panel listing span latencies and counters from a Metrics registry.
+
+    It floats in the top-right corner of its parent and redraws once a
+    second while visible.
+    """
+
+    MARGIN = 16
+
+    def __init__(self, metrics, parent):
+        super().__init__(parent)
+        self.setObjectName("metricsOverlay")
+        self.metrics = metrics
+        self.setTextFormat(Qt.PlainText)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.hide()
+
+        self.update_timer = QTimer(self)
+        self.update_timer.setInterval(1000)
+        self.update_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.update_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_timer.stop()
+
+    def refresh(self):
+        """Redraw from a fresh snapshot and keep the panel in its corner."""
+        self.setText(self.format_snapshot(self.metrics.snapshot()))
+        self.adjustSize()
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - self.MARGIN, self.MARGIN)
+        self.raise_()
+
+    @staticmethod
+    def format_snapshot(snapshot):
+        lines = [f"{'span':<30}{'n':>6}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"]
+        for name, span in snapshot['spans'].items():
+            lines.append(f"{name:<30}{span['count']:>6}{span['p50_s'] * 1000:>9.1f}"
+                         f"{span['p95_s'] * 1000:>9.1f}{span['max_s'] * 1000:>9.1f}")
+        if snapshot['counters']:
+            lines.append("")
+            lines.extend(f"{name:<30}{value:>6}" for name, value in snapshot['counters'].items())
+        if snapshot.get('skip_rates'):
+            lines.append("")
+            lines.extend(f"{name + ' skipped':<30}{rate * 100:>5.0f}%" for name, rate in snapshot['skip_rates'].items())
+        lines.append("")
+        lines.append("Ctrl+Shift+M hide  ·  Ctrl+Shift+D dump JSON")
+        return "\n".join(lines)
@@ -0,0 +1,60 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+class RefreshScheduler(QObject):
+    """Per-category single-shot timers driven by AdaptiveInterval.
+
+    Each scan result is reported back with report(); that arms the
+    category's timer for its next delay. pause() stops every timer and
+    resume() re-arms them, so a paused scheduler never fires.
+    """
+
+    # category whose rescan is due
+    due = pyqtSignal(str)
+
+    def __init__(self, intervals, parent=None):
+        """
+        Args:
+            intervals: Dictionary of category name to AdaptiveInterval.
+            parent: Parent QObject.
+        """
+        super().__init__(parent)
+        self.intervals = intervals
+        self.paused = True
+        self.timers = {}
+        for category in intervals:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda category=category: self.due.emit(category))
+            self.timers[category] = timer
+
+    def report(self, category, changed):
+        """Schedule the category's next scan after a scan that did or did not find a change.
+
+        Returns:
+            Delay before the next scan in seconds.
+        """
+        delay = self.intervals[category].next(changed)
+        if not self.paused:
+            self.timers[category].start(int(delay * 1000))
+        return delay
+
+    def pause(self):
+        self.paused = True
+        for timer in self.timers.values():
+            timer.stop()
+
+    def resume(self):
+        """Re-arm every category at its base interval.
+
+        The caller is expected to rescan right away; the timers are a
+        fallback in case that scan's result is never reported.
+        """
+        self.paused = False
+        for category, interval in self.intervals.items():
+            interval.reset()
+            self.timers[category].start(int(interval.base * 1000))
+
+    def delays(self):
+        """Milliseconds until each category's next scan; -1 if not scheduled."""
+        return {category: timer.remainingTime() for category, timer in self.timers.items()}
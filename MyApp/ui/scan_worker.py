@@ -0,0 +1,40 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class ScanSignals(QObject):
+    """Signals emitted by a ScanWorker; delivered on the GUI thread."""
+
+    # generation, category, records; emitted as each category's backend finishes
+    result = pyqtSignal(int, str, object)
+    # generation, category, error message
+    failed = pyqtSignal(int, str, str)
+    # generation; after the last result
+    finished = pyqtSignal(int)
+
+
+class ScanWorker(QRunnable):
+    """Runs one device scan on a QThreadPool thread, passing results on as they arrive."""
+
+    def __init__(self, generation, results):
+        """
+        Args:
+            generation: Sequence number used by the page to drop stale results.
+            results: Callable returning an iterator of (category, records,
+                error) tuples, such as DeviceScanner.scan_concurrently.
+        """
+        super().__init__()
+        self.generation = generation
+        self.results = results
+        self.signals = ScanSignals()
+
+    def run(self):
+        try:
+            for category, records, error in self.results():
+                if error is None:
+                    self.signals.result.emit(self.generation, category, records)
+                else:
+                    self.signals.failed.emit(self.generation, category, str(error) or type(error).__name__)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, '', str(e))
+        finally:
+            self.signals.finished.emit(self.generation)
@@ -0,0 +1,42 @@
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+from ui.styles import COLORS
+
+
+class Sparkline(QWidget):
+    """Small line chart of recent RX and TX rates, drawn on a shared scale."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("sparkline")
+        self.setFixedHeight(36)
+        self.setMinimumWidth(120)
+        self.rx = []
+        self.tx = []
+        self._rx_pen = QPen(QColor(COLORS['connected']), 1.5)
+        self._tx_pen = QPen(QColor(COLORS['accent_hover']), 1.5)
+
+    def set_values(self, rx, tx):
+        """Show new rate series (oldest first); repaints only if they changed."""
+        if rx == self.rx and tx == self.tx:
+            return
+        self.rx = rx
+        self.tx = tx
+        self.update()
+
+    def paintEvent(self, event):
+        if len(self.rx) < 2:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        peak = max(max(self.rx), max(self.tx), 1.0)
+        width = self.width() - 2
+        height = self.height() - 3
+        for values, pen in ((self.rx, self._rx_pen), (self.tx, self._tx_pen)):
+            step = width / (len(values) - 1)
+            points = QPolygonF([QPointF(1 + i * step, 1 + height - value / peak * height)
+                                for i, value in enumerate(values)])
+            painter.setPen(pen)
+            painter.drawPolyline(points)
+        painter.end()
@@ -0,0 +1,53 @@
+import time
+from PyQt5.QtCore import QObject, QEvent
+
+
+class StartupProbe(QObject):
+    """Measures time to first paint and time to first inventory.
+
+    Times are measured from a perf_counter() value taken by the caller as
+    early as possible, before PyQt5 is imported.
+    """
+
+    def __init__(self, started, on_complete=None):
+        """
+        Args:
+            started: time.perf_counter() value at process start.
+            on_complete: Called with the timings dictionary once both
+                milestones have been reached.
+        """
+        super().__init__()
+        self.started = started
+        self.on_complete = on_complete
+        self.timings = {}
+        self.on_first_paint = None
+
+    def watch_paint(self, widget):
+        """Record the first paint event of widget (e.g. the main window)."""
+        widget.installEventFilter(self)
+
+    def watch_inventory(self, devices_page):
+        """Record when devices_page shows its first scan results."""
+        devices_page.scan_applied.connect(self._on_first_inventory)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and 'first_paint' not in self.timings:
+            obj.removeEventFilter(self)
+            self._mark('first_paint')
+            if self.on_first_paint is not None:
+                self.on_first_paint()
+        return False
+
+    def _on_first_inventory(self):
+        if 'first_inventory' not in self.timings:
+            self._mark('first_inventory')
+
+    def _mark(self, milestone):
+        self.timings[milestone] = time.perf_counter() - self.started
+        if len(self.timings) == 2 and self.on_complete is not None:
+            self.on_complete(self.timings)
+
+    def report(self):
+        """Return the recorded milestones as a one-line summary."""
+        return ", ".join(f"time to {name.replace('_', ' ')}: {seconds * 1000:.1f} ms"
+                         for name, seconds in self.timings.items())
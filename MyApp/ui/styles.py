@@ -1,25 +1,156 @@
 # styles.py
+#
+# Application theme. The stylesheet is applied once to the QApplication by
+# apply_theme(); widgets only set object names (and dynamic properties), so
+# Qt parses the CSS a single time instead of once per page and per card.
+
+# Palette shared by the stylesheet and by code that paints directly
+# (e.g. the device list delegate)
+COLORS = {
+    'background': '#141217',
+    'card': '#1E1E1E',
+    'card_border': 'rgba(255, 255, 255, 0.1)',
+    'text': '#FFFFFF',
+    'text_secondary': '#E5E8EB',
+    'text_muted': '#9388A2',
+    'accent': '#801AE5',
+    'accent_hover': '#9025F5',
+    'accent_pressed': '#7015D5',
+    'secondary': '#302938',
+    'secondary_hover': '#403948',
+    'secondary_pressed': '#201928',
+    'connected': '#66DD91',
+    'disconnected': '#F87272',
+    'splitter': '#333333',
+}
 
 APP_STYLE = """
     QWidget {
-        background-color: #121212;
-        color: #E0E0E0;
-        font-family: Segoe UI, sans-serif;
+        background-color: %(background)s;
+        color: %(text)s;
+        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    }
+    QPushButton {
+        background-color: %(accent)s;
+        color: white;
+        border: 1px solid rgba(255, 255, 255, 0.1);
+        border-radius: 20px;
+        padding: 16px 24px;
+        font-weight: bold;
+        font-size: 20px;
+        min-width: 160px;
+        max-width: 250px;
+        height: 35px;
     }
-
-
     QPushButton:hover {
-        background-color: #800080;
+        background-color: %(accent_hover)s;
+        min-width: 170px;
+        height: 40px;
+        font-size: 21px;
+        border: 1px solid rgba(255, 255, 255, 0.2);
+    }
+    QPushButton:pressed {
+        background-color: %(accent_pressed)s;
+        min-width: 165px;
+        height: 38px;
+    }
+    QPushButton#secondary {
+        background-color: %(secondary)s;
+    }
+    QPushButton#secondary:hover {
+        background-color: %(secondary_hover)s;
+        min-width: 170px;
+        height: 40px;
+        font-size: 21px;
+        border: 1px solid rgba(255, 255, 255, 0.2);
+    }
+    QPushButton#secondary:pressed {
+        background-color: %(secondary_pressed)s;
+        min-width: 165px;
+        height: 38px;
     }
-
     QLabel {
+        color: %(text)s;
+    }
+    QLabel#title {
+        font-size: 22px;
+        font-weight: bold;
+        color: %(text)s;
+    }
+    QWidget#devicesPage QLabel#title {
+        font-size: 24px;
+    }
+    QLabel#welcome {
+        font-size: 32px;
+        font-weight: bold;
+        color: %(text)s;
+    }
+    QLabel#subtitle {
+        font-size: 22px;
+        color: %(text_secondary)s;
+        line-height: 1.6;
+    }
+    QLabel#scanStatus {
         font-size: 16px;
-        color: #CCCCCC;
+        color: %(text_muted)s;
     }
-
-    QListWidget {
-        background-color: #1E1E1E;
-        color: #E0E0E0;
+    QLabel#sectionTitle {
+        font-size: 20px;
+        font-weight: bold;
+        color: %(text)s;
+        margin-top: 20px;
+    }
+    QScrollArea {
         border: none;
+        background-color: transparent;
+    }
+    QSplitter::handle {
+        background-color: %(splitter)s;
+    }
+
+    QFrame#deviceCard {
+        background-color: %(card)s;
+        border-radius: 8px;
+        padding: 12px;
+        margin: 5px;
+        border: 1px solid %(card_border)s;
+    }
+    QLabel#deviceName {
+        font-size: 18px;
+        font-weight: bold;
+        color: %(text)s;
+    }
+    QLabel#deviceType {
+        font-size: 14px;
+        color: %(text_muted)s;
     }
-"""
+    QLabel#deviceDetail {
+        font-size: 14px;
+        color: %(text_secondary)s;
+    }
+    QLabel#deviceStatus {
+        font-size: 14px;
+        color: %(connected)s;
+        font-weight: bold;
+    }
+    QLabel#deviceDisconnected {
+        font-size: 14px;
+        color: %(disconnected)s;
+        font-weight: bold;
+    }
+
+    QLabel#metricsOverlay {
+        background-color: rgba(0, 0, 0, 0.8);
+        color: %(text_secondary)s;
+        border: 1px solid %(card_border)s;
+        border-radius: 6px;
+        padding: 8px;
+        font-family: 'Menlo', 'Consolas', monospace;
+        font-size: 12px;
+    }
+""" % COLORS
+
+
+def apply_theme(app):
+    """Apply the application stylesheet once, at startup."""
+    app.setStyleSheet(APP_STYLE)
@@ -0,0 +1,58 @@
+"""Measure DeviceCard construction and first polish time.
+
+    python benchmarks/bench_card_construction.py --count 500
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MyApp"))
+
+from PyQt5.QtWidgets import QApplication, QVBoxLayout, QWidget
+
+from core.records import UsbDevice
+from ui import styles
+from ui.devices_page import DeviceCard
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    styles.apply_theme(app)
+
+    device = UsbDevice(
+        name='Logitech USB Receiver',
+        bus='001',
+        device='005',
+        vendor_id='046d',
+        product_id='c52b',
+        speed='12 Mbps',
+        port_path='1-1.2'
+    )
+
+    best = None
+    for _ in range(args.repeat):
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        start = time.perf_counter()
+        for _ in range(args.count):
+            layout.addWidget(DeviceCard(device))
+        # Showing the cards forces the style polish that a stylesheet triggers
+        container.show()
+        app.processEvents()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        container.deleteLater()
+        app.processEvents()
+
+    print(f"{args.count} cards: {best * 1000:.1f} ms ({best * 1e6 / args.count:.0f} us per card)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Compare card widgets against the virtualized device list.
+
+Builds synthetic inventories and measures, for each size, the time to show
+them, the time of an unchanged refresh and the resident memory added:
+
+    python benchmarks/bench_device_list.py --sizes 10 1000 10000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MyApp"))
+
+from PyQt5.QtWidgets import QApplication, QVBoxLayout, QWidget, QScrollArea
+
+from core.records import UsbDevice
+from ui.devices_page import DeviceCard
+from ui.device_list import DeviceListModel, DeviceListView
+
+
+def synthetic_devices(count):
+    """Return count UsbDevice records shaped like the sysfs backend's."""
+    return [UsbDevice(
+        name=f"Vendor {i % 37} Device {i}",
+        bus=f"{1 + i // 127:03d}",
+        device=f"{1 + i % 127:03d}",
+        vendor_id=f"{i % 65536:04x}",
+        product_id=f"{(i * 7) % 65536:04x}",
+        manufacturer=f"Vendor {i % 37}",
+        serial_number=f"SN{i:08d}",
+        speed='480 Mbps',
+        port_path=f"{1 + i // 127}-{i % 127}"
+    ) for i in range(count)]
+
+
+def rss_bytes():
+    """Resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def settle(app):
+    for _ in range(3):
+        app.processEvents()
+
+
+def bench_cards(app, devices):
+    area = QScrollArea()
+    area.setWidgetResizable(True)
+    container = QWidget()
+    layout = QVBoxLayout(container)
+    area.setWidget(container)
+    area.resize(940, 600)
+    area.show()
+    settle(app)
+
+    before = rss_bytes()
+    start = time.perf_counter()
+    for device in devices:
+        layout.addWidget(DeviceCard(device))
+    settle(app)
+    populate = time.perf_counter() - start
+    memory = rss_bytes() - before
+
+    # The widget path has no cheap unchanged refresh before keyed
+    # reconciliation, so a refresh is a full rebuild here
+    start = time.perf_counter()
+    while layout.count():
+        layout.takeAt(0).widget().deleteLater()
+    for device in devices:
+        layout.addWidget(DeviceCard(device))
+    settle(app)
+    refresh = time.perf_counter() - start
+
+    area.deleteLater()
+    settle(app)
+    return populate, refresh, memory
+
+
+def bench_model_view(app, devices):
+    model = DeviceListModel()
+    view = DeviceListView(model)
+    view.resize(940, 600)
+    view.show()
+    settle(app)
+
+    before = rss_bytes()
+    start = time.perf_counter()
+    model.set_devices(devices)
+    settle(app)
+    populate = time.perf_counter() - start
+    memory = rss_bytes() - before
+
+    # Same inventory as fresh records, as a rescan would produce
+    rescanned = [device.replace() for device in devices]
+    start = time.perf_counter()
+    model.set_devices(rescanned)
+    settle(app)
+    refresh = time.perf_counter() - start
+
+    view.deleteLater()
+    settle(app)
+    return populate, refresh, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    # Thousands of card widgets take minutes and gigabytes, so by default
+    # only the model/view run covers the largest inventory
+    parser.add_argument("--skip-cards-above", type=int, default=1000,
+                        help="skip the card widget run for larger inventories (0 = never skip)")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    print(f"{'impl':<12}{'devices':>9}{'populate ms':>14}{'refresh ms':>13}{'rss MiB':>10}")
+    for size in args.sizes:
+        devices = synthetic_devices(size)
+        runs = [("model/view", bench_model_view)]
+        if not args.skip_cards_above or size <= args.skip_cards_above:
+            runs.insert(0, ("cards", bench_cards))
+        for name, bench in runs:
+            gc.collect()
+            populate, refresh, memory = bench(app, devices)
+            print(f"{name:<12}{size:>9}{populate * 1000:>14.1f}{refresh * 1000:>13.1f}"
+                  f"{memory / (1024 * 1024):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Measure OpenMetrics exporter render cost and scrape latency.
+
+    python benchmarks/bench_exporter.py --devices 2000 --adapters 200 --scrapers 50
+
+Renders a synthetic inventory from scratch, again when unchanged and again
+after one adapter changed. Then --scrapers threads poll /metrics once a
+second over keep-alive connections for --seconds, while the exporter
+refreshes every --interval seconds from a scanner that changes one adapter
+per refresh. The reported latencies are per scrape, as seen by the client.
+"""
+import argparse
+import http.client
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MyApp"))
+
+from core.exporter import MetricsExporter, OpenMetricsRenderer
+from core.records import NetworkAdapter, UsbDevice
+
+
+class SyntheticScanner:
+    """Returns a fixed inventory; each network scan flips one adapter's state."""
+
+    def __init__(self, devices, adapters):
+        self.devices = [UsbDevice(name=f"Device {i}", vendor_id=f"{i % 40:04x}", manufacturer=f"Vendor {i % 40}",
+                                  port_path=f"{1 + i // 100}-{i % 100}") for i in range(devices)]
+        self.adapters = [NetworkAdapter(name=f"eth{i}", speed="1000 Mb/s", duplex="full", mtu=1500,
+                                        mac_address=f"02:00:00:00:{i // 256:02x}:{i % 256:02x}", connected=True)
+                         for i in range(adapters)]
+        self.scans = 0
+
+    def categories(self):
+        return ['usb', 'network']
+
+    def scan(self, category, force=False):
+        return self.get_connected_devices(force) if category == 'usb' else self.get_network_adapters(force)
+
+    def scan_concurrently(self, categories=None, force=False):
+        for category in categories or self.categories():
+            yield category, self.scan(category, force), None
+
+    def get_connected_devices(self, force=False):
+        return self.devices
+
+    def get_network_adapters(self, force=False):
+        self.scans += 1
+        adapters = list(self.adapters)
+        index = self.scans % len(adapters)
+        adapters[index] = adapters[index].replace(connected=not adapters[index].connected)
+        self.adapters = adapters
+        return adapters
+
+
+def time_renders(scanner, repeat=20):
+    renderer = OpenMetricsRenderer()
+
+    def timed(func):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        return min(samples) * 1000
+
+    def fresh():
+        renderer.__init__()
+        renderer.update('usb', scanner.devices)
+        renderer.update('network', scanner.adapters)
+        renderer.render({'usb': 0.0, 'network': 0.0})
+
+    def unchanged():
+        renderer.update('usb', scanner.devices)
+        renderer.update('network', scanner.adapters)
+        renderer.render({'usb': 0.0, 'network': 0.0})
+
+    def one_changed():
+        renderer.update('usb', scanner.devices)
+        renderer.update('network', scanner.get_network_adapters())
+        renderer.render({'usb': 0.0, 'network': 0.0})
+
+    print(f"{'render, fresh':>22}: {timed(fresh):8.3f} ms")
+    print(f"{'render, unchanged':>22}: {timed(unchanged):8.3f} ms")
+    print(f"{'render, one adapter':>22}: {timed(one_changed):8.3f} ms")
+
+
+def scraper(port, seconds, latencies, compressed):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {'Accept': 'application/openmetrics-text; version=1.0.0'}
+    if compressed:
+        headers['Accept-Encoding'] = 'gzip'
+    deadline = time.monotonic() + seconds
+    next_time = time.monotonic()
+    while next_time < deadline:
+        start = time.perf_counter()
+        connection.request("GET", "/metrics", headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        next_time += 1.0
+        time.sleep(max(0.0, next_time - time.monotonic()))
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--adapters", type=int, default=200)
+    parser.add_argument("--scrapers", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=0.2, help="exporter refresh interval")
+    parser.add_argument("--gzip", action="store_true", help="scrape with Accept-Encoding: gzip")
+    args = parser.parse_args()
+
+    scanner = SyntheticScanner(args.devices, args.adapters)
+    time_renders(scanner)
+
+    exporter = MetricsExporter(scanner, ("127.0.0.1", 0), interval=args.interval)
+    exporter.start()
+    size = len(exporter.payloads[True, args.gzip])
+    latencies = []
+    threads = [threading.Thread(target=scraper, args=(exporter.address[1], args.seconds, latencies, args.gzip))
+               for _ in range(args.scrapers)]
+    for thread in threads:
+        thread.start()
+        # Spread the scrapers over the second, as independent collectors would be
+        time.sleep(1.0 / args.scrapers)
+    for thread in threads:
+        thread.join()
+    exporter.stop()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"{'scrapes':>22}: {len(latencies)} by {args.scrapers} scrapers at 1 Hz, {size} byte body, "
+          f"{exporter.refreshes} refreshes during the run")
+    print(f"{'scrape latency':>22}: p50 {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {p99 * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
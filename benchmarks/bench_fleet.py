@@ -0,0 +1,179 @@
+"""Run a fleet collector and thousands of simulated agents on localhost.
+
+    python benchmarks/bench_fleet.py --agents 2000 --seconds 10
+
+Every agent serves a synthetic inventory (--devices USB devices and a few
+network adapters), and each scan changes it with probability
+--change-rate. The run reports how long the initial sync takes, the
+throughput seen by a subscribed client, and the cost of a resync after the
+collector drops every agent connection. It then checks that the client's
+merged state matches both the collector and every agent. Agents,
+collector and client share one process and event loop, so the CPU figure
+covers all of them.
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MyApp"))
+
+from core import fleet
+from core.records import NetworkAdapter, UsbDevice
+
+
+class SimulatedAgent(fleet.FleetAgent):
+    """Agent whose scans return a synthetic, randomly changing inventory."""
+
+    def __init__(self, address, name, devices, change_rate, interval, rng):
+        super().__init__(address, host=name, interval=interval)
+        self.change_rate = change_rate
+        self.rng = rng
+        # Unplugged devices, ready to be plugged in again
+        self.spare = [UsbDevice(name=f"Spare {i}", vendor_id="1d6b", product_id=f"{i:04x}",
+                                port_path=f"9-{i}") for i in range(4)]
+        self.current = {
+            'usb': [UsbDevice(name=f"Device {i}", vendor_id=f"{i:04x}", product_id="0001",
+                              serial_number=f"{name}-{i}", port_path=f"1-{i}") for i in range(devices)],
+            'network': [NetworkAdapter(name=f"eth{i}", mac_address=f"02:00:00:00:00:{i:02x}",
+                                       ipv4_addresses=f"10.0.{i}.2/24", connected=True) for i in range(3)],
+        }
+
+    async def scan(self):
+        if self.rng.random() < self.change_rate:
+            self._mutate()
+        # Unchanged scans hand back the same lists, as the scanner's
+        # fingerprint stage does
+        return dict(self.current)
+
+    def _mutate(self):
+        choice = self.rng.random()
+        if choice < 0.8:
+            usb = list(self.current['usb'])
+            if choice < 0.4 and self.spare:
+                usb.append(self.spare.pop(self.rng.randrange(len(self.spare))))
+            elif len(usb) > 1:
+                self.spare.append(usb.pop(self.rng.randrange(len(usb))))
+            self.current['usb'] = usb
+        else:
+            network = list(self.current['network'])
+            index = self.rng.randrange(len(network))
+            network[index] = network[index].replace(connected=not network[index].connected)
+            self.current['network'] = network
+
+
+def by_key(records):
+    return {record['key']: record for record in records}
+
+
+async def wait_until(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+async def run(args):
+    collector = fleet.FleetCollector(port=0)
+    await collector.start()
+    address = ("127.0.0.1", collector.port)
+
+    client = {'hosts': None, 'seq': 0, 'changes': 0}
+
+    async def follow():
+        async for message in fleet.subscribe(address):
+            if message['type'] == 'state':
+                client['hosts'] = message['hosts']
+            else:
+                fleet.apply_change(client['hosts'], message)
+                client['changes'] += message['type'] == 'change'
+            client['seq'] = message['seq']
+
+    follower = asyncio.ensure_future(follow())
+    await wait_until(lambda: client['hosts'] is not None, 5)
+
+    rng = random.Random(1)
+    agents = [SimulatedAgent(address, f"lab-{i:05d}", args.devices, args.change_rate, args.interval,
+                             random.Random(rng.random())) for i in range(args.agents)]
+
+    def synced():
+        return (len(collector.hosts) == len(agents) and
+                all(len(state.inventories) == 2 for state in collector.hosts.values()))
+
+    cpu = time.process_time()
+    start = time.perf_counter()
+    tasks = [asyncio.ensure_future(agent.run()) for agent in agents]
+    await wait_until(synced, 120)
+    elapsed = time.perf_counter() - start
+    records = sum(len(r) for state in collector.hosts.values() for r in state.inventories.values())
+    print(f"{'initial sync':>16}: {elapsed:7.2f} s for {len(agents)} agents, {records} records "
+          f"({time.process_time() - cpu:.2f} s CPU)")
+
+    await wait_until(lambda: client['seq'] == collector.seq, 60)
+    changes = client['changes']
+    deltas = collector.stats['deltas']
+    cpu = time.process_time()
+    await asyncio.sleep(args.seconds)
+    cpu = time.process_time() - cpu
+    print(f"{'steady state':>16}: {(collector.stats['deltas'] - deltas) / args.seconds:7.0f} deltas/s in, "
+          f"{(client['changes'] - changes) / args.seconds:.0f} changes/s to the client, "
+          f"{cpu / args.seconds * 100:.0f}% CPU")
+
+    before = {name: sum(agent.stats[name] for agent in agents) for name in ('snapshots', 'replayed', 'connects')}
+    start = time.perf_counter()
+    collector.disconnect_agents()
+    await wait_until(lambda: all(agent.connected and agent.stats['connects'] > 1 for agent in agents) and
+                     all(state.writer is not None for state in collector.hosts.values()), 120)
+    elapsed = time.perf_counter() - start
+    after = {name: sum(agent.stats[name] for agent in agents) for name in before}
+    print(f"{'resync':>16}: {elapsed:7.2f} s, {after['snapshots'] - before['snapshots']} snapshots, "
+          f"{after['replayed'] - before['replayed']} messages replayed, "
+          f"{collector.stats['gaps']} gaps")
+
+    # Stop changing, let the last deltas arrive, then compare all three views
+    for agent in agents:
+        agent.change_rate = 0.0
+    await asyncio.sleep(args.interval * 2 + 0.5)
+    await wait_until(lambda: client['seq'] == collector.seq, 60)
+    state = collector.snapshot()['hosts']
+    mismatches = 0
+    for agent in agents:
+        for category, current in agent.current.items():
+            expected = {record.key: fleet.record_data(record) for record in current}
+            if (by_key(state[agent.host][category]) != expected or
+                    by_key(client['hosts'][agent.host][category]) != expected):
+                mismatches += 1
+    print(f"{'consistency':>16}: {mismatches} mismatched inventories "
+          f"(collector stats: {collector.stats})")
+
+    for task in tasks + [follower]:
+        task.cancel()
+    await asyncio.gather(*tasks, follower, return_exceptions=True)
+    await collector.close()
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=2000)
+    parser.add_argument("--devices", type=int, default=20, help="USB devices per agent")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between agent scans")
+    parser.add_argument("--change-rate", type=float, default=0.05,
+                        help="probability that a scan finds a change")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of the steady-state phase")
+    args = parser.parse_args()
+
+    # Two sockets per agent in this process
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, 2 * args.agents + 256))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+    sys.exit(1 if asyncio.run(run(args)) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Measure HistoryStore write throughput and query latency on a large history.
+
+    python benchmarks/bench_history.py --events 1000000 --devices 5000
+
+Fills a temporary database with connect/disconnect events spread over
+--days, then times devices_seen() over short and long windows, a device
+timeline and a compaction pass.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MyApp"))
+
+from core.history import ADDED, REMOVED, HistoryStore
+from core.records import UsbDevice
+
+
+def timed(label, func, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    size = len(result) if isinstance(result, list) else result
+    print(f"{label:>34}: {min(samples) * 1000:9.2f} ms  ({size} rows)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--devices", type=int, default=5000)
+    parser.add_argument("--days", type=float, default=30.0)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    devices = [UsbDevice(name=f"Device {i}", vendor_id=f"{i % 65536:04x}", product_id="0001",
+                         port_path=f"{1 + i // 127}-{i % 127}") for i in range(args.devices)]
+    connected = [False] * args.devices
+    end = time.time()
+    start = end - args.days * 86400
+    step = (end - start) / args.events
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "history.db")
+        store = HistoryStore(path, retention=None, batch_size=5000, flush_interval=0.5)
+
+        began = time.perf_counter()
+        for n in range(args.events):
+            i = rng.randrange(args.devices)
+            connected[i] = not connected[i]
+            store.record_event('usb', devices[i], ADDED if connected[i] else REMOVED, start + n * step)
+        store.flush()
+        elapsed = time.perf_counter() - began
+        size = os.path.getsize(path) + os.path.getsize(path + "-wal")
+        print(f"{'write':>34}: {elapsed:9.2f} s    ({args.events / elapsed:,.0f} events/s, "
+              f"{size / 1e6:.1f} MB)")
+
+        middle = (start + end) / 2
+        timed("devices_seen, 1 minute window", lambda: store.devices_seen(middle, middle + 60))
+        timed("devices_seen, 1 hour window", lambda: store.devices_seen(middle, middle + 3600))
+        timed("devices_seen, 1 day window", lambda: store.devices_seen(middle, middle + 86400))
+        timed("timeline, one device", lambda: store.timeline(devices[0].key))
+        timed("compact, oldest half", lambda: store.compact(before=middle), repeat=1)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Measure ID database cold start and lookup rates.
+
+    python benchmarks/bench_ids.py
+    python benchmarks/bench_ids.py --database /usr/share/hwdata/usb.ids
+
+Without --database, a synthetic usb.ids of about the real size (3,400
+vendors, 20,000 products) is generated. Cold start is timed three ways:
+parsing the whole file into a dict (the baseline), opening it and building
+the offset index, and opening it with the saved index. Lookups are timed
+for random ids without the LRU cache and for a small working set through
+it, as when the same devices are named on every scan.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MyApp"))
+
+from core.ids import IdDatabase
+
+WORDS = ["Technology", "Electronics", "Systems", "Semiconductor", "Corp.", "Inc.", "Ltd.", "Co.",
+         "Wireless", "Audio", "Storage", "Controller", "Adapter", "Receiver", "Hub", "Camera",
+         "Keyboard", "Mouse", "Bluetooth", "Ethernet", "Card Reader", "Flash Drive", "Gamepad"]
+
+
+def write_synthetic(path, vendors, products, rng):
+    with open(path, "w") as f:
+        f.write("#\n#\tSynthetic usb.ids\n#\n\n")
+        vendor_ids = sorted(rng.sample(range(1, 0xFFFF), vendors))
+        per_vendor = products // vendors
+        for vendor in vendor_ids:
+            f.write(f"{vendor:04x}  {' '.join(rng.sample(WORDS, 3))}\n")
+            count = rng.randrange(0, per_vendor * 2 + 1)
+            for product in sorted(rng.sample(range(0x10000), count)):
+                f.write(f"\t{product:04x}  {' '.join(rng.sample(WORDS, 4))} {rng.randrange(1000)}\n")
+                if rng.random() < 0.02:
+                    f.write(f"\t\t00  {rng.choice(WORDS)}\n")
+        f.write("\n# List of known device classes, subclasses and protocols\n\nC 00  (Defined at Interface level)\n")
+        f.write("C 09  Hub\n\t00  Unused\n\t\t00  Full speed (or root) hub\n")
+
+
+def parse_all(path):
+    """Baseline: read every vendor and product into a dict, as a naive parser would."""
+    names = {}
+    vendor = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("C "):
+                break
+            if line.startswith("#") or not line.strip():
+                continue
+            if line[0] != "\t":
+                vendor = line[:4]
+                names[vendor] = line[6:].rstrip("\n")
+            elif line[1] != "\t":
+                names[vendor, line[1:5]] = line[7:].rstrip("\n")
+    return names
+
+
+def best_of(func, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return result, min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", help="usb.ids or pci.ids file to use instead of a synthetic one")
+    parser.add_argument("--vendors", type=int, default=3400)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.database
+        if path is None:
+            path = os.path.join(directory, "usb.ids")
+            write_synthetic(path, args.vendors, args.products, rng)
+        index_dir = os.path.join(directory, "index")
+
+        names, parse_s = best_of(lambda: parse_all(path))
+
+        def build():
+            for entry in os.listdir(index_dir) if os.path.isdir(index_dir) else []:
+                os.remove(os.path.join(index_dir, entry))
+            return IdDatabase(path, index_dir)
+        database, build_s = best_of(build)
+        assert not database.index_loaded
+        database, load_s = best_of(lambda: IdDatabase(path, index_dir))
+        assert database.index_loaded
+
+        print(f"{'database':>24}: {os.path.getsize(path)} bytes, {len(database)} entries, "
+              f"index {os.path.getsize(database.index_path)} bytes")
+        print(f"{'parse everything':>24}: {parse_s * 1000:8.2f} ms")
+        print(f"{'open, build index':>24}: {build_s * 1000:8.2f} ms")
+        print(f"{'open, saved index':>24}: {load_s * 1000:8.2f} ms")
+
+        keys = [key for key in names if isinstance(key, tuple)]
+        for vendor, product in keys[:1000]:
+            assert database.product(vendor, product) == names[vendor, product]
+        queries = [rng.choice(keys) for _ in range(args.lookups)]
+        # Ids that are not listed cost a full search too
+        queries[::10] = [(f"{rng.randrange(0x10000):04x}", "ffff")] * len(queries[::10])
+
+        uncached = IdDatabase(path, index_dir, cache_size=0)
+        _, elapsed = best_of(lambda: [uncached.product(v, p) for v, p in queries], repeat=3)
+        print(f"{'uncached lookups':>24}: {len(queries) / elapsed:12,.0f} /s")
+
+        working_set = queries[:200]
+        hot = [rng.choice(working_set) for _ in range(args.lookups)]
+        _, elapsed = best_of(lambda: [database.product(v, p) for v, p in hot], repeat=3)
+        print(f"{'cached lookups':>24}: {len(hot) / elapsed:12,.0f} /s ({database.cache_info()})")
+
+
+if __name__ == "__main__":
+    main()
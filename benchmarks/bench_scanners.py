@@ -0,0 +1,369 @@
+"""Replay recorded tool output through the scanner backends and the Devices page.
+
+Fixtures in benchmarks/fixtures/ hold real output of lsusb, ip addr,
+system_profiler -json, networksetup/ifconfig and the PowerShell queries.
+Each is scaled up synthetically to the requested sizes and fed to the
+matching DeviceScanner._get_* backend through its command seams, so the
+timings cover parsing and record construction but no process startup.
+Each backend is timed a second time on the same output ("unchanged"),
+where its input fingerprint matches and parsing is skipped.
+DevicesPage.refresh_devices is measured end to end (worker scan plus
+rendering) on the offscreen Qt platform.
+
+    python benchmarks/bench_scanners.py --sizes 100 10000 --output results.json
+    python benchmarks/bench_scanners.py --compare results.json
+
+With --compare, timings more than --tolerance slower than the baseline
+are reported as regressions and the exit status is 1.
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(BENCH_DIR, "fixtures")
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "MyApp"))
+
+from core.device_scanner import DeviceScanner
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+# Scaling recorded output to N devices or interfaces
+
+def scale_lsusb(text, count):
+    lines = [line for line in text.splitlines() if line.startswith("Bus ")]
+    out = []
+    for i in range(count):
+        rest = lines[i % len(lines)].split(": ", 1)[1]
+        out.append(f"Bus {1 + i // 127:03d} Device {1 + i % 127:03d}: {rest}")
+    return "\n".join(out) + "\n"
+
+
+def _split_blocks(text, header):
+    """Split text into blocks that each start with a line matching header."""
+    blocks = []
+    for line in text.splitlines():
+        if header.match(line):
+            blocks.append([line])
+        elif blocks:
+            blocks[-1].append(line)
+    return blocks
+
+
+_IP_HEADER = re.compile(r'^\d+: ([^:@]+)')
+
+
+def scale_ip_addr(text, count):
+    blocks = _split_blocks(text, _IP_HEADER)
+    out = []
+    for i in range(count):
+        block = blocks[i % len(blocks)]
+        name = _IP_HEADER.match(block[0]).group(1)
+        header = _IP_HEADER.sub(f"{i + 1}: {name}{i}", block[0], count=1)
+        out.append("\n".join([header] + block[1:]))
+    return "\n".join(out) + "\n"
+
+
+_PORT_HEADER = re.compile(r'^Hardware Port: ')
+_IFCONFIG_HEADER = re.compile(r'^(\S+): flags=')
+
+
+def scale_networksetup(ports_text, ifconfig_text, count):
+    """Scale networksetup and ifconfig output together, keeping devices joined."""
+    ports = [[line for line in block if line.strip()] for block in _split_blocks(ports_text, _PORT_HEADER)]
+    # The last block carries the VLAN trailer; keep only port lines
+    ports = [[line for line in block if line.split(":")[0] in ("Hardware Port", "Device", "Ethernet Address")]
+             for block in ports]
+    interfaces = {_IFCONFIG_HEADER.match(block[0]).group(1): block
+                  for block in _split_blocks(ifconfig_text, _IFCONFIG_HEADER)}
+
+    port_out = [""]
+    ifconfig_out = []
+    for i in range(count):
+        block = ports[i % len(ports)]
+        device = next(line.split(": ", 1)[1] for line in block if line.startswith("Device:"))
+        new_device = f"{device}_{i}"
+        for line in block:
+            if line.startswith("Device:"):
+                line = f"Device: {new_device}"
+            elif line.startswith("Hardware Port:"):
+                line = f"{line} {i}"
+            port_out.append(line)
+        port_out.append("")
+        interface = interfaces.get(device)
+        if interface:
+            ifconfig_out.append(interface[0].replace(device, new_device, 1))
+            ifconfig_out.extend(interface[1:])
+    return "\n".join(port_out) + "\n", "\n".join(ifconfig_out) + "\n"
+
+
+def scale_system_profiler(text, count):
+    """Build a controller/hub/device tree with count devices (hubs included)."""
+    data = json.loads(text)
+    controller = data['SPUSBDataType'][0]
+    hub_template = controller['_items'][0]
+    leaves = hub_template['_items']
+
+    controllers = []
+    made = 0
+    while made < count:
+        hub = copy.deepcopy(hub_template)
+        hub['location_id'] = f"0x{made:08x} / 1"
+        made += 1
+        hub['_items'] = []
+        for j in range(min(7, count - made)):
+            leaf = dict(leaves[j % len(leaves)])
+            leaf['location_id'] = f"0x{made:08x} / {j + 2}"
+            hub['_items'].append(leaf)
+            made += 1
+        new_controller = dict(controller)
+        new_controller['_items'] = [hub]
+        controllers.append(new_controller)
+    return json.dumps({'SPUSBDataType': controllers}, indent=2)
+
+
+def deep_system_profiler(text, count, depth=50):
+    """Build chains of depth nested hubs, ending in a leaf, until count devices exist.
+
+    Location ids cannot encode more than six tiers, so they are left out and
+    port paths come from tree positions.
+    """
+    data = json.loads(text)
+    controller = data['SPUSBDataType'][0]
+    hub_template = {k: v for k, v in controller['_items'][0].items() if k not in ('_items', 'location_id')}
+    leaf_template = {k: v for k, v in controller['_items'][0]['_items'][0].items() if k != 'location_id'}
+
+    controllers = []
+    made = 0
+    while made < count:
+        chain = min(depth, count - made)
+        node = dict(leaf_template)
+        for _ in range(chain - 1):
+            node = dict(hub_template, _items=[node])
+        made += chain
+        controllers.append(dict(controller, _items=[node]))
+    return json.dumps({'SPUSBDataType': controllers}, indent=2)
+
+
+def scale_powershell(text, count, key):
+    items = json.loads(text)
+    out = []
+    for i in range(count):
+        item = dict(items[i % len(items)])
+        item[key] = f"{item[key]}\\{i}"
+        out.append(item)
+    return json.dumps(out, indent=4)
+
+
+class ReplayScanner(DeviceScanner):
+    """DeviceScanner whose commands return recorded output instead of running."""
+
+    def __init__(self, system, outputs):
+        """
+        Args:
+            system: platform.system() value whose backends should be used.
+            outputs: Recorded stdout keyed by program name ("lsusb", "ip",
+                "system_profiler", "networksetup", "ifconfig") and by
+                "powershell_usb" / "powershell_network".
+        """
+        # No sysfs: the Linux USB backend falls back to lsusb
+        super().__init__(sysfs_root=os.path.join(FIXTURES, "no-sysfs"))
+        self.system = system
+        self.outputs = outputs
+
+    def _run_command(self, command):
+        return self.outputs[command[0]]
+
+    def _stream_command(self, command):
+        return contextlib.nullcontext(io.StringIO(self.outputs[command[0]]))
+
+    def _run_commands_parallel(self, commands):
+        return [self.outputs[command[0]] for command in commands]
+
+    def _run_powershell(self, command):
+        return self.outputs['powershell_usb' if 'Get-PnpDevice' in command else 'powershell_network']
+
+    def _get_linux_network(self):
+        # The netlink dump is read from the kernel and cannot be replayed;
+        # use the ip addr backend instead
+        return self._get_linux_ip_network()
+
+
+def backend_cases(count):
+    """Return (name, scanner, method name) for each backend at one size."""
+    ports, ifconfig = scale_networksetup(read_fixture("networksetup.txt"), read_fixture("ifconfig.txt"), count)
+    return [
+        ("lsusb", ReplayScanner("Linux", {'lsusb': scale_lsusb(read_fixture("lsusb.txt"), count)}),
+         "_get_linux_lsusb_devices"),
+        ("ip addr", ReplayScanner("Linux", {'ip': scale_ip_addr(read_fixture("ip_addr.txt"), count)}),
+         "_get_linux_network"),
+        ("system_profiler", ReplayScanner("Darwin", {
+            'system_profiler': scale_system_profiler(read_fixture("system_profiler_usb.json"), count)}),
+         "_get_macos_devices"),
+        ("system_profiler deep", ReplayScanner("Darwin", {
+            'system_profiler': deep_system_profiler(read_fixture("system_profiler_usb.json"), count)}),
+         "_get_macos_devices"),
+        ("networksetup", ReplayScanner("Darwin", {'networksetup': ports, 'ifconfig': ifconfig}),
+         "_get_macos_network"),
+        ("powershell usb", ReplayScanner("Windows", {
+            'powershell_usb': scale_powershell(read_fixture("powershell_usb.json"), count, 'InstanceId')}),
+         "_get_windows_devices"),
+        ("powershell network", ReplayScanner("Windows", {
+            'powershell_network': scale_powershell(read_fixture("powershell_net.json"), count, 'Name')}),
+         "_get_windows_network"),
+    ]
+
+
+def result(name, size, samples):
+    best = min(samples)
+    return {
+        'name': name,
+        'size': size,
+        'best_s': best,
+        'median_s': statistics.median(samples),
+        'items_per_s': size / best if best else None,
+    }
+
+
+def bench_backends(sizes, repeat):
+    """Time each backend parsing its output, and again when the output is unchanged."""
+    results = []
+    for size in sizes:
+        for name, scanner, method in backend_cases(size):
+            scan = getattr(scanner, method)
+            samples = []
+            for _ in range(repeat):
+                # Forget the previous parse so the output is parsed again
+                scanner._parsed.clear()
+                start = time.perf_counter()
+                records = scan()
+                samples.append(time.perf_counter() - start)
+            if len(records) != size:
+                raise RuntimeError(f"{name}: expected {size} records, parsed {len(records)}")
+            unchanged = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                scan()
+                unchanged.append(time.perf_counter() - start)
+            results.append(result(name, size, samples))
+            results.append(result(f"{name} unchanged", size, unchanged))
+            print(f"{name:>20} {size:>6}: {min(samples) * 1000:9.2f} ms "
+                  f"({size / min(samples):,.0f} records/s), unchanged {min(unchanged) * 1000:7.2f} ms")
+    return results
+
+
+def bench_page_refresh(sizes, repeat, adapters):
+    """Time DevicesPage.refresh_devices from the call to the scan_applied signal."""
+    from PyQt5.QtCore import QEventLoop
+    from PyQt5.QtWidgets import QApplication
+    from ui import styles
+    from ui.devices_page import DevicesPage
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    styles.apply_theme(app)
+    results = []
+
+    def timed_refresh(page):
+        loop = QEventLoop()
+        page.scan_applied.connect(loop.quit)
+        start = time.perf_counter()
+        page.refresh_devices(force=True)
+        loop.exec_()
+        elapsed = time.perf_counter() - start
+        page.scan_applied.disconnect(loop.quit)
+        return elapsed
+
+    for size in sizes:
+        network_count = min(size, adapters)
+        scanner = ReplayScanner("Linux", {
+            'lsusb': scale_lsusb(read_fixture("lsusb.txt"), size),
+            'ip': scale_ip_addr(read_fixture("ip_addr.txt"), network_count),
+        })
+        initial, unchanged = [], []
+        for _ in range(repeat):
+            page = DevicesPage(lambda: None, scanner=scanner)
+            page.resize(1000, 800)
+            page.show()
+            page.scheduler.pause()
+            # The scan queued by showEvent is skipped while this one runs
+            initial.append(timed_refresh(page))
+            # Let the first results paint so their cost is not charged below
+            app.processEvents()
+            unchanged.append(timed_refresh(page))
+            page.hide()
+            page.deleteLater()
+            app.processEvents()
+        results.append(result("page refresh initial", size, initial))
+        results.append(result("page refresh unchanged", size, unchanged))
+        print(f"{'page refresh':>20} {size:>6}: initial {min(initial) * 1000:9.2f} ms, "
+              f"unchanged {min(unchanged) * 1000:9.2f} ms ({network_count} adapters)")
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    """Print timings against a baseline file; return the number of regressions."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r['name'], r['size']): r for r in json.load(f)['results']}
+    regressions = 0
+    print(f"\nCompared with {baseline_path}:")
+    for r in results:
+        old = baseline.get((r['name'], r['size']))
+        if not old or not old['best_s']:
+            continue
+        ratio = r['best_s'] / old['best_s']
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{r['name']:>22} {r['size']:>6}: {ratio:5.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--page-adapters", type=int, default=50,
+                        help="network adapters in the page refresh benchmark (one card each)")
+    parser.add_argument("--skip-page", action="store_true", help="only benchmark the backends")
+    parser.add_argument("--output", default="bench_results.json", help="results file (JSON)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slowdown reported as a regression (default: 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = bench_backends(args.sizes, args.repeat)
+    if not args.skip_page:
+        results += bench_page_refresh(args.sizes, max(1, args.repeat // 2), args.page_adapters)
+
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
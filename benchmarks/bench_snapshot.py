@@ -0,0 +1,94 @@
+"""Measure snapshot size and save, load, export and diff times.
+
+    python benchmarks/bench_snapshot.py --sizes 1000 100000
+
+For each size, builds a synthetic USB inventory with a realistic mix of
+repeated vendor and product strings and unique serial numbers and port
+paths, plus a few network adapters. It is saved as a snapshot, loaded
+back, exported as JSON lines and diffed against a copy with 1% of the
+devices added, removed or changed. The JSONL size is given for comparison.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MyApp"))
+
+from core import snapshot
+from core.cli import record_to_json
+from core.records import NetworkAdapter, UsbDevice
+
+VENDORS = [("046d", "Logitech, Inc."), ("8087", "Intel Corp."), ("1d6b", "Linux Foundation"),
+           ("0bda", "Realtek Semiconductor Corp."), ("05ac", "Apple, Inc."), ("0781", "SanDisk Corp.")]
+PRODUCTS = ["USB Receiver", "Bluetooth Adapter", "3.0 root hub", "Card Reader", "Keyboard",
+            "Cruzer Blade", "Webcam C920", "Ethernet Adapter"]
+
+
+def build_inventory(size, rng):
+    usb = []
+    for i in range(size):
+        vendor_id, manufacturer = rng.choice(VENDORS)
+        usb.append(UsbDevice(name=rng.choice(PRODUCTS), vendor_id=vendor_id, product_id=f"{rng.randrange(64):04x}",
+                             manufacturer=manufacturer, serial_number=f"{rng.getrandbits(48):012X}",
+                             speed=rng.choice(("12 Mb/s", "480 Mb/s", "5000 Mb/s")),
+                             port_path=f"{1 + i // 1000}-{i % 1000}", bus=f"{1 + i // 1000:03d}",
+                             device=f"{i % 128:03d}"))
+    network = [NetworkAdapter(name=f"eth{i}", speed="1000 Mb/s", duplex="full", mtu=1500,
+                              mac_address=f"02:00:00:00:00:{i:02x}", ipv4_addresses=f"10.0.{i}.2/24",
+                              connected=True) for i in range(8)]
+    return {'usb': usb, 'network': network}
+
+
+def mutate(inventory, rng, fraction=0.01):
+    usb = list(inventory['usb'])
+    count = max(1, int(len(usb) * fraction))
+    for _ in range(count):
+        index = rng.randrange(len(usb))
+        usb[index] = usb[index].replace(speed="5000 Mb/s", status="OK")
+    del usb[:count]
+    usb.extend(UsbDevice(name="New Device", vendor_id="1234", port_path=f"99-{i}") for i in range(count))
+    return {'usb': usb, 'network': inventory['network']}
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            inventory = build_inventory(size, rng)
+            path = os.path.join(directory, f"{size}.dmsnap")
+            _, save_ms = timed(lambda: snapshot.save(path, snapshot.Snapshot(inventory, host="bench")))
+            loaded, load_ms = timed(lambda: snapshot.load(path))
+            assert all(a.same_as(b) for a, b in zip(inventory['usb'], loaded.inventory['usb']))
+
+            jsonl = io.StringIO()
+            _, export_ms = timed(lambda: [jsonl.write(json.dumps(line, separators=(',', ':')) + "\n")
+                                          for line in snapshot.iter_json(path)])
+            expected = sum(len(json.dumps(record_to_json(category, record), separators=(',', ':'))) + 1
+                           for category, records in inventory.items() for record in records)
+            assert jsonl.tell() == expected
+
+            other = snapshot.Snapshot(mutate(inventory, rng))
+            changes, diff_ms = timed(lambda: list(snapshot.diff(loaded, other)))
+
+            print(f"{size:>7} devices: {os.path.getsize(path):>9} bytes (JSONL {jsonl.tell()} bytes), "
+                  f"save {save_ms:7.1f} ms, load {load_ms:7.1f} ms, export {export_ms:7.1f} ms, "
+                  f"diff {diff_ms:6.1f} ms ({len(changes)} changes)")
+
+
+if __name__ == "__main__":
+    main()
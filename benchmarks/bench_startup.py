@@ -0,0 +1,64 @@
+"""Compare startup time of the headless CLI with the GUI.
+
+    python benchmarks/bench_startup.py --repeat 5
+
+Each variant runs in a fresh interpreter so import costs are included:
+
+    cli import   import core.cli (also checks PyQt5 is not loaded)
+    cli json     python -m core --json, a full one-shot scan
+    gui          main.py up to its first event loop pass (offscreen)
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MyApp")
+
+# Runs main.py but returns from app.exec_() after one pass of the event loop
+GUI_SNIPPET = """
+from PyQt5.QtWidgets import QApplication
+QApplication.exec_ = lambda self: self.processEvents()
+import runpy
+runpy.run_path('main.py', run_name='__main__')
+"""
+
+CLI_IMPORT_SNIPPET = """
+import sys
+import core.cli
+assert 'PyQt5' not in sys.modules, 'core.cli imported PyQt5'
+"""
+
+VARIANTS = {
+    'cli import': [sys.executable, "-c", CLI_IMPORT_SNIPPET],
+    'cli json': [sys.executable, "-m", "core", "--json"],
+    'gui': [sys.executable, "-c", GUI_SNIPPET],
+}
+
+
+def time_command(argv, repeat):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=APP_DIR, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, argv in VARIANTS.items():
+        samples = time_command(argv, args.repeat)
+        print(f"{name:>10}: median {statistics.median(samples) * 1000:7.1f} ms, "
+              f"best {min(samples) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
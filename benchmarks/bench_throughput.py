@@ -0,0 +1,59 @@
+"""Measure the CPU cost of ThroughputSampler on a synthetic /proc/net/dev.
+
+    python benchmarks/bench_throughput.py --interfaces 500 --rate 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MyApp"))
+
+from core.throughput import ThroughputSampler
+
+HEADER = ("Inter-|   Receive                                                |  Transmit\n"
+          " face |bytes    packets errs drop fifo frame compressed multicast|"
+          "bytes    packets errs drop fifo colls carrier compressed\n")
+
+
+def proc_net_dev(count):
+    lines = [f"{'veth' + str(i):>8}: {i * 1000 + 12345:8d} 5053 0 0 0 0 0 0 "
+             f"{i * 77 + 43241:8d} 5053 0 0 0 0 0 0\n" for i in range(count)]
+    return HEADER + "".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interfaces", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=10.0, help="samples per second")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix="-net-dev", delete=False) as f:
+        f.write(proc_net_dev(args.interfaces))
+    try:
+        sampler = ThroughputSampler(path=f.name)
+        sampler.sample(0.0)
+        count = 1000
+        start = time.perf_counter()
+        for i in range(count):
+            sampler.sample((i + 1) / args.rate)
+        per_sample = (time.perf_counter() - start) / count
+        print(f"sample(): {per_sample * 1e6:.0f} us for {args.interfaces} interfaces "
+              f"-> {per_sample * args.rate * 100:.2f}% of one core at {args.rate:g} Hz")
+
+        sampler = ThroughputSampler(interval=1 / args.rate, path=f.name)
+        cpu = time.process_time()
+        sampler.start()
+        time.sleep(args.seconds)
+        sampler.stop()
+        cpu = time.process_time() - cpu
+        print(f"sampler thread: {sampler.samples} samples in {args.seconds:g} s, "
+              f"{cpu / args.seconds * 100:.2f}% CPU")
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    main()
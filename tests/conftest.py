@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "MyApp"))
+
+
+@pytest.fixture
+def fixtures_dir():
+    """Directory of the recorded command outputs and databases shared with the benchmarks."""
+    return os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    """Root of an empty sysfs tree with a /bus/usb/devices directory."""
+    root = tmp_path / "sys"
+    (root / "bus" / "usb" / "devices").mkdir(parents=True)
+    return root
+
+
+@pytest.fixture
+def add_usb_device(sysfs):
+    """Create a device directory under the sysfs tree, with the given attribute files."""
+    def add(port_path, busnum="1", devnum="2", **attributes):
+        path = sysfs / "bus" / "usb" / "devices" / port_path
+        path.mkdir(parents=True, exist_ok=True)
+        attributes.update(busnum=busnum, devnum=devnum)
+        for name, value in attributes.items():
+            (path / name).write_text(f"{value}\n")
+        return path
+    return add
+
+
+@pytest.fixture
+def scanner(sysfs, fixtures_dir):
+    """Linux scanner reading the sysfs tree, with names from the usb.ids fixture and no caching."""
+    from core.device_scanner import DeviceScanner
+    from core.ids import IdResolver
+
+    scanner = DeviceScanner(sysfs_root=str(sysfs), cache_ttl={'usb': 0},
+                            ids=IdResolver(os.path.join(fixtures_dir, "usb.ids"), index_dir=None))
+    scanner.system = 'Linux'
+    return scanner
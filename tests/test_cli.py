@@ -0,0 +1,67 @@
+import io
+import json
+
+from core import cli, snapshot
+from core.backends import BackendRegistry
+from core.device_scanner import DeviceScanner
+from core.records import NetworkAdapter, UsbDevice
+
+
+class FlakyBackend:
+    """Returns the same devices, except on the scans listed in failures, which raise."""
+
+    def __init__(self, records, failures):
+        self.records = records
+        self.failures = set(failures)
+        self.calls = 0
+
+    def __call__(self, scanner):
+        self.calls += 1
+        if self.calls in self.failures:
+            raise OSError("lsusb failed")
+        return list(self.records)
+
+
+class RecordingHistory:
+    def __init__(self):
+        self.scans = []
+
+    def record_scan(self, category, records):
+        self.scans.append((category, len(records)))
+
+
+def make_scanner(usb_backend):
+    registry = BackendRegistry()
+    registry.add_category('usb', "USB Devices", UsbDevice, timeout=5.0)
+    registry.add_category('network', "Network Adapters", NetworkAdapter, timeout=5.0)
+    registry.register('usb', None, usb_backend)
+    registry.register('network', None, lambda scanner: [NetworkAdapter(name="eth0", connected=True)])
+    return DeviceScanner(registry=registry, cache_ttl={'usb': 0, 'network': 0})
+
+
+DEVICES = [UsbDevice(name="Keyboard", port_path="1-1"), UsbDevice(name="Mouse", port_path="1-2")]
+
+
+def test_scan_leaves_out_failed_categories(capsys):
+    scanner = make_scanner(FlakyBackend(DEVICES, failures=[1]))
+    assert list(cli.scan(scanner, ['usb', 'network'])) == ['network']
+    assert "Error scanning usb: lsusb failed" in capsys.readouterr().err
+    assert [d.name for d in cli.scan(scanner, ['usb', 'network'])['usb']] == ["Keyboard", "Mouse"]
+
+
+def test_watch_does_not_report_failed_scan_as_removals(capsys):
+    scanner = make_scanner(FlakyBackend(DEVICES, failures=[2, 3]))
+    history = RecordingHistory()
+    stream = io.StringIO()
+    cli.watch(scanner, ['usb', 'network'], 0, stream, iterations=4, history=history)
+    events = [(line['event'], line['key']) for line in map(json.loads, stream.getvalue().splitlines())]
+    assert events == [('added', 'usb:port:1-1'), ('added', 'usb:port:1-2'), ('added', 'net:eth0')]
+    assert history.scans.count(('usb', 2)) == 2
+    assert ('usb', 0) not in history.scans
+    assert history.scans.count(('network', 1)) == 4
+
+
+def test_snapshot_diff_skips_categories_missing_from_one_side():
+    old = snapshot.Snapshot({'usb': DEVICES, 'network': []})
+    new = snapshot.Snapshot({'network': [NetworkAdapter(name="eth0")]})
+    assert [(change['event'], change['key']) for change in snapshot.diff(old, new)] == [('added', 'net:eth0')]
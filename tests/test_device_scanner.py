@@ -0,0 +1,85 @@
+import os
+
+from core.device_scanner import DeviceScanner
+
+
+def test_read_sysfs_usb_device(add_usb_device, scanner):
+    path = add_usb_device("1-1.4", busnum="3", devnum="12", idVendor="0781", idProduct="5581",
+                          manufacturer="SanDisk", product="Ultra", serial="4C53", speed="5000")
+    device = scanner.read_sysfs_usb_device(str(path))
+    assert (device.name, device.manufacturer, device.serial_number) == ("SanDisk Ultra", "SanDisk", "4C53")
+    assert (device.bus, device.device, device.vendor_id, device.product_id) == ("003", "012", "0781", "5581")
+    assert device.speed == "5000 Mbps"
+    assert device.port_path == "1-1.4"
+    assert device.key == "usb:port:1-1.4"
+
+
+def test_read_sysfs_usb_device_without_devnum(sysfs, scanner):
+    # Interface directories and half-removed devices have no devnum
+    path = sysfs / "bus" / "usb" / "devices" / "1-1:1.0"
+    path.mkdir()
+    (path / "bInterfaceClass").write_text("03\n")
+    assert not scanner.read_sysfs_usb_device(str(path))
+    assert not scanner.read_sysfs_usb_device(str(sysfs / "bus" / "usb" / "devices" / "9-9"))
+
+
+def test_sysfs_scan(sysfs, add_usb_device, scanner):
+    add_usb_device("usb1", devnum="1", idVendor="1d6b", idProduct="0002",
+                   manufacturer="Linux 6.1 xhci-hcd", product="xHCI Host Controller", speed="480")
+    add_usb_device("1-1", devnum="4", idVendor="046d", idProduct="c52b", serial="ABC", speed="12")
+    # Interfaces have no busnum/devnum and are skipped by name
+    (sysfs / "bus" / "usb" / "devices" / "1-1:1.0").mkdir()
+    add_usb_device("1-2", devnum="5", idVendor="ffff", idProduct="0001")
+
+    devices = {device.port_path: device for device in scanner.get_connected_devices()}
+    assert sorted(devices) == ["1-1", "1-2", "usb1"]
+    receiver = devices["1-1"]
+    # No string descriptors: named from usb.ids
+    assert receiver.name == "Logitech, Inc. Unifying Receiver"
+    assert (receiver.bus, receiver.device, receiver.speed, receiver.serial_number) == ("001", "004", "12 Mbps", "ABC")
+    assert devices["usb1"].name == "Linux 6.1 xhci-hcd xHCI Host Controller"
+    assert devices["1-2"].name == "Unknown Device"
+
+
+def test_sysfs_scan_reuses_records_until_devnum_changes(add_usb_device, scanner):
+    add_usb_device("1-1", devnum="4", idVendor="046d", idProduct="c52b")
+    first = scanner.get_connected_devices(force=True)
+    second = scanner.get_connected_devices(force=True)
+    assert first[0] is second[0]
+    add_usb_device("1-1", devnum="7", idVendor="046d", idProduct="c534")
+    third = scanner.get_connected_devices(force=True)
+    assert third[0].product_id == "c534"
+    assert scanner.fingerprint_stats()['sysfs_usb']['skipped'] == 1
+
+
+def stub_lsusb(scanner, fixtures_dir):
+    """Answer _run_command from the recorded lsusb output; returns the commands run."""
+    with open(os.path.join(fixtures_dir, "lsusb.txt"), encoding="utf-8") as f:
+        output = f.read()
+    commands = []
+
+    def run_command(command):
+        commands.append(command)
+        return output
+
+    scanner._run_command = run_command
+    return commands
+
+
+def test_lsusb_fallback_without_sysfs(tmp_path, fixtures_dir):
+    scanner = DeviceScanner(sysfs_root=str(tmp_path), cache_ttl={'usb': 0})
+    scanner.system = 'Linux'
+    commands = stub_lsusb(scanner, fixtures_dir)
+    devices = scanner.get_connected_devices()
+    assert commands == [["lsusb"]]
+    assert len(devices) == 6
+    receiver = devices[1]
+    assert (receiver.bus, receiver.device, receiver.vendor_id, receiver.product_id) == ("001", "004", "046d", "c52b")
+    assert receiver.name == "Logitech, Inc. Unifying Receiver"
+
+
+def test_sysfs_preferred_over_lsusb(add_usb_device, scanner, fixtures_dir):
+    add_usb_device("1-1", devnum="4", idVendor="046d", idProduct="c52b")
+    commands = stub_lsusb(scanner, fixtures_dir)
+    assert [device.port_path for device in scanner.get_connected_devices()] == ["1-1"]
+    assert commands == []
@@ -0,0 +1,132 @@
+import gzip
+import http.client
+
+import pytest
+
+from core.backends import CARD_VIEW, BackendRegistry
+from core.device_scanner import DeviceScanner
+from core.exporter import MetricsExporter
+from core.records import NetworkAdapter, UsbDevice
+
+
+class Backend:
+    """Returns self.records, or raises while self.error is set."""
+
+    def __init__(self, records):
+        self.records = records
+        self.error = None
+
+    def __call__(self, scanner):
+        if self.error is not None:
+            raise self.error
+        return list(self.records)
+
+
+@pytest.fixture
+def backends():
+    return {
+        'usb': Backend([UsbDevice(name="Receiver", vendor_id="046D", manufacturer="Logitech", type="HID",
+                                  port_path="1-1"),
+                        UsbDevice(name="Mouse", vendor_id="046d", manufacturer="Logitech", type="HID",
+                                  port_path="1-2")]),
+        'network': Backend([NetworkAdapter(name="eth0", speed="1000 Mb/s", duplex="full", mtu=1500,
+                                           mac_address="02:00:00:00:00:01", connected=True)]),
+        'serial': Backend([UsbDevice(name="ttyS0")]),
+    }
+
+
+@pytest.fixture
+def exporter(backends):
+    registry = BackendRegistry()
+    registry.add_category('usb', "USB Devices", UsbDevice, timeout=5.0)
+    registry.add_category('network', "Network Adapters", NetworkAdapter, view=CARD_VIEW, timeout=5.0)
+    registry.add_category('serial', "Serial Ports", UsbDevice, timeout=5.0)
+    for category, backend in backends.items():
+        registry.register(category, None, backend)
+    scanner = DeviceScanner(registry=registry, cache_ttl={'usb': 0, 'network': 0, 'serial': 0})
+    exporter = MetricsExporter(scanner, ("127.0.0.1", 0), interval=3600)
+    exporter.start()
+    yield exporter
+    exporter.stop()
+
+
+def scrape(exporter, openmetrics=False, compressed=False):
+    connection = http.client.HTTPConnection(*exporter.address, timeout=5)
+    headers = {}
+    if openmetrics:
+        headers['Accept'] = "application/openmetrics-text; version=1.0.0"
+    if compressed:
+        headers['Accept-Encoding'] = "gzip"
+    connection.request("GET", "/metrics", headers=headers)
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    assert response.status == 200
+    assert int(response.getheader("Content-Length")) == len(body)
+    assert response.getheader("Content-Encoding") == ("gzip" if compressed else None)
+    if compressed:
+        body = gzip.decompress(body)
+    return response.getheader("Content-Type"), body.decode('utf-8')
+
+
+def families(body, openmetrics):
+    """Check the exposition structure and return {family: (type, [sample lines])}."""
+    lines = body.splitlines()
+    if openmetrics:
+        assert lines.pop() == "# EOF"
+    assert "# EOF" not in lines
+    result = {}
+    current = None
+    for line in lines:
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert name not in result, f"family {name} declared twice"
+            result[name] = (kind, [])
+            current = name
+        elif line.startswith("# HELP "):
+            assert line.split(" ")[2] == current, "HELP must follow its family's TYPE"
+        else:
+            kind, samples = result[current]
+            sample = line.split("{")[0].split(" ")[0]
+            suffix = {'counter': "_total", 'info': "_info"}.get(kind, "") if openmetrics else ""
+            assert sample == current + suffix
+            samples.append(line)
+    return result
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_openmetrics_scrape(exporter, compressed):
+    content_type, body = scrape(exporter, openmetrics=True, compressed=compressed)
+    assert content_type.startswith("application/openmetrics-text; version=1.0.0")
+    found = families(body, openmetrics=True)
+    assert found['device_monitor_usb_devices'] == ('gauge', [
+        'device_monitor_usb_devices{vendor_id="046d",manufacturer="Logitech",type="HID"} 2'])
+    assert found['device_monitor_network_adapter_up'][1] == ['device_monitor_network_adapter_up{adapter="eth0"} 1']
+    assert found['device_monitor_network_adapter_speed_bytes'][1] == [
+        'device_monitor_network_adapter_speed_bytes{adapter="eth0"} 125000000']
+    assert found['device_monitor_network_adapter'][0] == 'info'
+    assert found['device_monitor_devices'][1] == ['device_monitor_devices{category="serial"} 1']
+    assert found['device_monitor_scan_errors'][1] == [
+        f'device_monitor_scan_errors_total{{category="{category}"}} 0' for category in ('network', 'serial', 'usb')]
+    assert len(found['device_monitor_last_scan_timestamp_seconds'][1]) == 3
+
+
+def test_text_format_scrape(exporter):
+    content_type, body = scrape(exporter)
+    assert content_type.startswith("text/plain; version=0.0.4")
+    found = families(body, openmetrics=False)
+    assert found['device_monitor_network_adapter_info'][0] == 'gauge'
+    assert found['device_monitor_scan_errors_total'][0] == 'counter'
+    assert scrape(exporter, compressed=True)[1] == body
+
+
+def test_failed_scan_keeps_last_series(exporter, backends):
+    before = families(scrape(exporter, openmetrics=True)[1], openmetrics=True)
+    backends['usb'].error = OSError("lsusb failed")
+    exporter.refresh()
+    after = families(scrape(exporter, openmetrics=True)[1], openmetrics=True)
+    assert after['device_monitor_usb_devices'] == before['device_monitor_usb_devices']
+    assert 'device_monitor_scan_errors_total{category="usb"} 1' in after['device_monitor_scan_errors'][1]
+    timestamps = after['device_monitor_last_scan_timestamp_seconds'][1]
+    assert [line for line in timestamps if '"usb"' in line] == \
+        [line for line in before['device_monitor_last_scan_timestamp_seconds'][1] if '"usb"' in line]
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import time
+
+from core import fleet
+from core.backends import BackendRegistry
+from core.device_scanner import DeviceScanner
+from core.records import UsbDevice
+
+
+class ListBackend:
+    """Returns self.records, or raises while self.error is set."""
+
+    def __init__(self, records):
+        self.records = records
+        self.error = None
+
+    def __call__(self, scanner):
+        if self.error is not None:
+            raise self.error
+        return list(self.records)
+
+
+def make_scanner(backend):
+    registry = BackendRegistry()
+    registry.add_category('usb', "USB Devices", UsbDevice, timeout=5.0)
+    registry.register('usb', None, backend)
+    return DeviceScanner(registry=registry, cache_ttl={'usb': 0})
+
+
+async def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def usb_names(collector, host):
+    return sorted(record['name'] for record in collector.hosts[host].inventories.get('usb', {}).values())
+
+
+def test_agent_deltas_merge_into_collector():
+    async def main():
+        collector = fleet.FleetCollector(port=0)
+        await collector.start()
+        backend = ListBackend([UsbDevice(name="Keyboard", port_path="1-1"),
+                               UsbDevice(name="Mouse", port_path="1-2")])
+        agent = fleet.FleetAgent(("127.0.0.1", collector.port), make_scanner(backend), host="lab-001",
+                                 interval=0.05)
+        task = asyncio.ensure_future(agent.run())
+        try:
+            await wait_until(lambda: "lab-001" in collector.hosts and usb_names(collector, "lab-001"))
+            assert usb_names(collector, "lab-001") == ["Keyboard", "Mouse"]
+            assert collector.stats['snapshots'] == 1
+
+            backend.records = [UsbDevice(name="Keyboard", port_path="1-1"),
+                               UsbDevice(name="Webcam", port_path="1-3")]
+            await wait_until(lambda: usb_names(collector, "lab-001") == ["Keyboard", "Webcam"])
+            assert collector.stats['deltas'] == 1
+
+            # A failed scan sends nothing, rather than removing every device
+            backend.error = OSError("lsusb failed")
+            await asyncio.sleep(0.3)
+            assert usb_names(collector, "lab-001") == ["Keyboard", "Webcam"]
+            assert collector.stats['deltas'] == 1
+
+            backend.error = None
+            backend.records = [UsbDevice(name="Keyboard", port_path="1-1")]
+            await wait_until(lambda: usb_names(collector, "lab-001") == ["Keyboard"])
+            state = await fleet.fetch_snapshot(("127.0.0.1", collector.port))
+            assert state['hosts']['lab-001']['connected']
+            assert [record['key'] for record in state['hosts']['lab-001']['usb']] == ["usb:port:1-1"]
+        finally:
+            task.cancel()
+            await collector.close()
+
+    asyncio.run(main())
+
+
+def test_silent_agent_expires_but_heartbeats_keep_agent_connected():
+    async def main():
+        collector = fleet.FleetCollector(port=0, agent_timeout=0.3)
+        await collector.start()
+        address = ("127.0.0.1", collector.port)
+        # Scans every 10 s, so only heartbeats keep it connected
+        agent = fleet.FleetAgent(address, make_scanner(ListBackend([])), host="lab-live",
+                                 interval=10.0, heartbeat=0.1)
+        task = asyncio.ensure_future(agent.run())
+        reader, writer = await asyncio.open_connection(*address)
+        try:
+            writer.write(fleet.encode({'type': 'hello', 'host': "lab-hung", 'session': "0", 'seq': 0}))
+            await writer.drain()
+            assert json.loads(await reader.readline()) == {'type': 'welcome', 'seq': None}
+            await wait_until(lambda: "lab-live" in collector.hosts and collector.hosts["lab-live"].writer)
+
+            await wait_until(lambda: collector.hosts["lab-hung"].writer is None)
+            assert await reader.read() == b""
+            await asyncio.sleep(0.5)
+            state = collector.snapshot()
+            assert not state['hosts']['lab-hung']['connected']
+            assert state['hosts']['lab-live']['connected']
+            assert collector.stats['expired'] == 1
+            assert agent.stats['connects'] == 1 and agent.stats['heartbeats'] >= 3
+        finally:
+            writer.close()
+            task.cancel()
+            await collector.close()
+
+    asyncio.run(main())
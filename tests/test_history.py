@@ -0,0 +1,50 @@
+import io
+import os
+import subprocess
+
+import pytest
+
+from core import cli
+from core.device_scanner import DeviceScanner
+from core.history import HistoryStore
+
+
+@pytest.fixture
+def history():
+    store = HistoryStore(":memory:", flush_interval=0.0)
+    yield store
+    store.close()
+
+
+def lsusb_scanner(tmp_path, fixtures_dir, failures):
+    """Scanner on a tree without sysfs whose lsusb exits non-zero on the listed calls."""
+    with open(os.path.join(fixtures_dir, "lsusb.txt"), encoding="utf-8") as f:
+        output = f.read()
+    scanner = DeviceScanner(sysfs_root=str(tmp_path), cache_ttl={'usb': 0})
+    calls = []
+
+    def run_command(command):
+        calls.append(command)
+        if len(calls) in failures:
+            raise subprocess.CalledProcessError(1, command)
+        return output
+
+    scanner._run_command = run_command
+    return scanner
+
+
+def test_failed_scan_raises(tmp_path, fixtures_dir):
+    scanner = lsusb_scanner(tmp_path, fixtures_dir, failures=[1])
+    with pytest.raises(subprocess.CalledProcessError):
+        scanner.get_connected_devices()
+    assert len(scanner.get_connected_devices()) == 6
+
+
+def test_failed_scan_records_no_disconnects(tmp_path, fixtures_dir, history):
+    scanner = lsusb_scanner(tmp_path, fixtures_dir, failures=[2, 3])
+    cli.watch(scanner, ['usb'], 0, io.StringIO(), iterations=4, history=history)
+    history.flush()
+    assert history.event_count() == 6
+    assert all(event['event'] == 'added'
+               for device in history.devices_seen(float('-inf'), float('inf'))
+               for event in history.timeline(device['key']))
@@ -0,0 +1,92 @@
+import threading
+
+from core.hotplug import QueueUeventSource, UsbHotplugMonitor, parse_uevent
+
+
+def uevent(action, port_path, **fields):
+    fields.setdefault('SUBSYSTEM', 'usb')
+    fields.setdefault('DEVTYPE', 'usb_device')
+    devpath = f"/devices/pci0000:00/0000:00:14.0/usb1/{port_path}"
+    parts = [f"{action}@{devpath}", f"ACTION={action}", f"DEVPATH={devpath}"]
+    parts += [f"{key}={value}" for key, value in fields.items()]
+    return '\0'.join(parts).encode('utf-8') + b'\0'
+
+
+def test_parse_uevent():
+    event = parse_uevent(uevent('add', '1-1', PRODUCT="46d/c52b/1210", BUSNUM="001"))
+    assert event['ACTION'] == 'add'
+    assert event['DEVPATH'].endswith('/1-1')
+    assert event['PRODUCT'] == "46d/c52b/1210"
+    assert parse_uevent(b"libudev\0\xfe\xed\0ACTION=add\0") == {}
+    assert parse_uevent(b"") == {}
+
+
+def test_monitor_applies_events(add_usb_device, scanner):
+    add_usb_device("1-1", devnum="2", idVendor="046d", idProduct="c52b")
+    changes = []
+    monitor = UsbHotplugMonitor(scanner, changes.append, QueueUeventSource())
+    monitor.resync(notify=False)
+    assert [device.port_path for device in monitor.devices()] == ["1-1"]
+
+    add_usb_device("1-2", devnum="3", idVendor="0781", idProduct="5581", product="Ultra")
+    assert monitor.handle_message(uevent('add', '1-2'))
+    assert [device.port_path for device in changes[-1]] == ["1-1", "1-2"]
+    assert monitor.devices()[1].name == "SanDisk Corp. Ultra"
+
+    # A repeated event with nothing new is not a change
+    assert not monitor.handle_message(uevent('change', '1-2'))
+    add_usb_device("1-2", devnum="3", idVendor="0781", idProduct="5581", product="Ultra Fit")
+    assert monitor.handle_message(uevent('change', '1-2'))
+    assert monitor.devices()[1].name == "SanDisk Corp. Ultra Fit"
+
+    assert monitor.handle_message(uevent('remove', '1-1'))
+    assert [device.port_path for device in monitor.devices()] == ["1-2"]
+    assert not monitor.handle_message(uevent('remove', '1-1'))
+    assert len(changes) == 3
+    assert monitor.full_scans == 1
+
+
+def test_monitor_ignores_other_events(scanner):
+    monitor = UsbHotplugMonitor(scanner, source=QueueUeventSource())
+    assert not monitor.handle_message(uevent('add', '1-1:1.0', DEVTYPE='usb_interface'))
+    assert not monitor.handle_message(uevent('add', 'input5', SUBSYSTEM='input'))
+    assert not monitor.handle_message(uevent('unbind', '1-1'))
+    assert monitor.devices() == []
+
+
+def test_monitor_builds_record_from_event_without_sysfs_entry(scanner):
+    monitor = UsbHotplugMonitor(scanner, source=QueueUeventSource())
+    assert monitor.handle_message(uevent('add', '2-3', PRODUCT="46d/c52b/1210", BUSNUM="002", DEVNUM="009"))
+    device, = monitor.devices()
+    assert (device.vendor_id, device.product_id, device.bus, device.device) == ("046d", "c52b", "002", "009")
+    assert device.key == "usb:port:2-3"
+
+
+def test_monitor_thread_and_overflow(add_usb_device, scanner):
+    add_usb_device("1-1", devnum="2", idVendor="046d", idProduct="c52b")
+    source = QueueUeventSource()
+    changed = threading.Event()
+    changes = []
+
+    def on_change(devices):
+        changes.append(devices)
+        changed.set()
+
+    monitor = UsbHotplugMonitor(scanner, on_change, source)
+    monitor.start()
+    try:
+        assert monitor.full_scans == 1
+        add_usb_device("1-4", devnum="6", idVendor="05ac", idProduct="12a8")
+        source.push(uevent('add', '1-4'))
+        assert changed.wait(5.0)
+        assert [device.port_path for device in changes[-1]] == ["1-1", "1-4"]
+
+        # Dropped events: the next state comes from a full scan
+        changed.clear()
+        add_usb_device("1-5", devnum="8", idVendor="0bda", idProduct="8153")
+        source.push_overflow()
+        assert changed.wait(5.0)
+        assert monitor.full_scans == 2
+        assert [device.port_path for device in changes[-1]] == ["1-1", "1-4", "1-5"]
+    finally:
+        monitor.stop()
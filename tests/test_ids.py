@@ -0,0 +1,169 @@
+import os
+import shutil
+
+import pytest
+
+from core import netlink
+from core.device_scanner import DeviceScanner
+from core.ids import IdDatabase, IdResolver, parse_id
+
+
+@pytest.fixture
+def usb_ids(tmp_path, fixtures_dir):
+    path = tmp_path / "usb.ids"
+    shutil.copy(os.path.join(fixtures_dir, "usb.ids"), path)
+    return str(path)
+
+
+@pytest.fixture
+def pci_ids(fixtures_dir):
+    return os.path.join(fixtures_dir, "pci.ids")
+
+
+def test_parse_id():
+    assert parse_id("046d") == 0x046d
+    assert parse_id("0x046D") == 0x046d
+    assert parse_id(0xffff) == 0xffff
+    assert parse_id(0x10000) is None
+    assert parse_id(-1) is None
+    assert parse_id("zz") is None
+    assert parse_id(None) is None
+
+
+def test_usb_lookups(usb_ids):
+    database = IdDatabase(usb_ids, index_dir=None)
+    assert database.vendor("046d") == "Logitech, Inc."
+    assert database.vendor(0x8087) == "Intel Corp."
+    assert database.product("046d", "c52b") == "Unifying Receiver"
+    assert database.product("0x046D", "0xC534") == "Unifying Receiver"
+    assert database.product("8087", "0a2b") == "Bluetooth wireless interface"
+    assert database.product("1d6b", "0003") == "3.0 root hub"
+    assert database.vendor("1234") == ""
+    assert database.product("046d", "ffff") == ""
+    assert database.product("zzzz", "c52b") == ""
+    # Class and HID usage sections are not vendors
+    assert database.vendor("09") == ""
+    assert database.product("0009", "0000") == ""
+    assert len(database) == 7 + 14
+    database.close()
+
+
+def test_pci_lookups_skip_subsystems(pci_ids):
+    database = IdDatabase(pci_ids, index_dir=None)
+    assert database.vendor("8086") == "Intel Corporation"
+    assert database.product("8086", "15bb") == "Ethernet Connection (7) I219-LM"
+    assert database.product("8086", "2723") == "Wi-Fi 6 AX200"
+    # "8086 0084" is a subsystem line of 2723, not a device of 8086
+    assert database.product("8086", "0084") == ""
+    # Neither is the network controller class
+    assert database.vendor("0002") == ""
+
+
+def test_cache_counts_hits(usb_ids):
+    database = IdDatabase(usb_ids, index_dir=None, cache_size=16)
+    for _ in range(3):
+        database.product("046d", "c52b")
+    assert database.cache_info() == {'hits': 2, 'misses': 1}
+
+
+def test_index_is_saved_and_reused(usb_ids, tmp_path):
+    index_dir = str(tmp_path / "index")
+    first = IdDatabase(usb_ids, index_dir)
+    assert not first.index_loaded
+    assert os.path.isfile(first.index_path)
+    second = IdDatabase(usb_ids, index_dir)
+    assert second.index_loaded
+    assert second.product("0781", "5581") == "Ultra"
+    # Another copy of the file gets its own index
+    other = tmp_path / "copy" / "usb.ids"
+    other.parent.mkdir()
+    shutil.copy(usb_ids, other)
+    assert IdDatabase(str(other), index_dir).index_path != first.index_path
+
+
+def test_stale_index_is_rebuilt(usb_ids, tmp_path):
+    index_dir = str(tmp_path / "index")
+    IdDatabase(usb_ids, index_dir).close()
+    with open(usb_ids) as f:
+        text = f.read()
+    with open(usb_ids, "w") as f:
+        f.write(text.replace("8087  Intel Corp.", "abcd  Added Vendor\n\t0001  Added Product\n8087  Intel Corp."))
+    stat = os.stat(usb_ids)
+    os.utime(usb_ids, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    database = IdDatabase(usb_ids, index_dir)
+    assert not database.index_loaded
+    assert database.product("abcd", "0001") == "Added Product"
+    assert database.product("8087", "0029") == "AX200 Bluetooth"
+
+
+def test_damaged_index_is_rebuilt(usb_ids, tmp_path):
+    index_dir = str(tmp_path / "index")
+    path = IdDatabase(usb_ids, index_dir).index_path
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+    database = IdDatabase(usb_ids, index_dir)
+    assert not database.index_loaded
+    assert database.vendor("05ac") == "Apple, Inc."
+
+
+def test_empty_database(tmp_path):
+    path = tmp_path / "usb.ids"
+    path.write_bytes(b"")
+    database = IdDatabase(str(path), index_dir=None)
+    assert len(database) == 0
+    assert database.vendor("046d") == ""
+
+
+def test_resolver(usb_ids, pci_ids, tmp_path):
+    resolver = IdResolver(usb_ids, pci_ids, index_dir=str(tmp_path / "index"))
+    assert resolver.usb_vendor("0bda") == "Realtek Semiconductor Corp."
+    assert resolver.usb_product("0bda", "8153") == "RTL8153 Gigabit Ethernet Adapter"
+    assert resolver.pci_vendor("10ec") == "Realtek Semiconductor Co., Ltd."
+    assert resolver.pci_device("14e4", "165f") == "NetXtreme BCM5720 Gigabit Ethernet PCIe"
+    resolver.close()
+
+
+def test_resolver_without_database(tmp_path):
+    resolver = IdResolver(str(tmp_path / "missing.ids"), str(tmp_path / "missing.ids"), index_dir=None)
+    assert resolver.usb_vendor("046d") == ""
+    assert resolver.pci_device("8086", "15bb") == ""
+    assert resolver.database('usb') is None
+
+
+def add_net_device(sysfs_root, name, subsystem, vendor="", device="", speed="1000", duplex="full"):
+    """Create /sys/class/net/<name> with a device link into the given bus."""
+    bus = sysfs_root / "bus" / subsystem
+    bus.mkdir(parents=True, exist_ok=True)
+    function = sysfs_root / "devices" / f"{name}-function"
+    function.mkdir(parents=True)
+    (function / "subsystem").symlink_to(bus)
+    if vendor:
+        (function / "vendor").write_text(f"0x{vendor}\n")
+        (function / "device").write_text(f"0x{device}\n")
+    interface = sysfs_root / "class" / "net" / name
+    interface.mkdir(parents=True)
+    (interface / "device").symlink_to(function)
+    (interface / "speed").write_text(f"{speed}\n")
+    (interface / "duplex").write_text(f"{duplex}\n")
+    (interface / "mtu").write_text("1500\n")
+
+
+def test_read_sysfs_pci_ids(tmp_path):
+    add_net_device(tmp_path, "eth0", "pci", "8086", "15BB")
+    add_net_device(tmp_path, "eth1", "usb", "0bda", "8153")
+    (tmp_path / "class" / "net" / "lo").mkdir(parents=True)
+    assert netlink.read_sysfs_pci_ids("eth0", str(tmp_path)) == ("8086", "15bb")
+    assert netlink.read_sysfs_pci_ids("eth1", str(tmp_path)) == ("", "")
+    assert netlink.read_sysfs_pci_ids("lo", str(tmp_path)) == ("", "")
+
+
+def test_linux_adapters_named_from_pci_ids(tmp_path, usb_ids, pci_ids):
+    add_net_device(tmp_path, "eth0", "pci", "8086", "15bb")
+    add_net_device(tmp_path, "eth1", "virtio", "1af4", "1041")
+    scanner = DeviceScanner(sysfs_root=str(tmp_path), ids=IdResolver(usb_ids, pci_ids, index_dir=None))
+    adapters = scanner._linux_adapters([
+        {'name': 'eth0', 'mtu': 0}, {'name': 'eth1', 'mtu': 0},
+        {'name': 'eth2', 'description': 'Kept as reported', 'mtu': 9000}])
+    assert [adapter.description for adapter in adapters] == [
+        "Intel Corporation Ethernet Connection (7) I219-LM", "", "Kept as reported"]
+    assert (adapters[0].speed, adapters[0].mtu) == ("1000 Mb/s", 1500)
@@ -0,0 +1,240 @@
+import io
+import json
+import os
+import subprocess
+
+import pytest
+
+from core import macos
+from core.device_scanner import DeviceScanner
+
+
+class TrickleReader:
+    """Text stream that returns at most `step` characters per read, like a slow pipe."""
+
+    def __init__(self, text, step):
+        self._stream = io.StringIO(text)
+        self.step = step
+
+    def read(self, size=-1):
+        return self._stream.read(self.step if size is None or size < 0 else min(size, self.step))
+
+
+def controller(items, name="USB 3.1 Bus"):
+    return {'_name': name, '_items': items}
+
+
+def device(name, location_id='', **fields):
+    node = {'_name': name, 'manufacturer': fields.pop('manufacturer', "Vendor"), 'location_id': location_id}
+    node.update(fields)
+    return node
+
+
+def document(controllers):
+    return json.dumps({'SPUSBDataType': controllers, 'other': [1, 2]}, indent=2)
+
+
+TRICKY = [
+    {'_name': 'bracket ] and brace } in a name, "quoted"', 'path': 'C:\\temp\\', 'list': [[], {}]},
+    {'_name': 'escapes \\u00e9\\n\\t\\\\ \u00e9 \U0001f50c', 'empty': '', 'n': -1.5e3},
+    [],
+    {},
+    "SPUSBDataType",
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 16, 4096])
+def test_json_array_chunk_boundaries(chunk_size):
+    text = json.dumps({'before': 'SPUSBDataType [', 'SPUSBDataType': TRICKY})
+    assert list(macos.iter_json_array(io.StringIO(text), 'SPUSBDataType', chunk_size)) == TRICKY
+
+
+@pytest.mark.parametrize("step", [1, 2, 3, 11])
+def test_json_array_short_reads(step):
+    text = json.dumps({'SPUSBDataType': TRICKY}, indent=1)
+    assert list(macos.iter_json_array(TrickleReader(text, step), 'SPUSBDataType', 64)) == TRICKY
+
+
+def test_json_array_item_larger_than_chunk():
+    items = [{'_name': 'x' * 100000, 'n': i} for i in range(3)]
+    text = json.dumps({'SPUSBDataType': items})
+    assert list(macos.iter_json_array(io.StringIO(text), 'SPUSBDataType', 16)) == items
+
+
+def test_json_array_missing_key():
+    assert list(macos.iter_json_array(io.StringIO('{"SPNetworkDataType": [1]}'), 'SPUSBDataType')) == []
+    assert list(macos.iter_json_array(io.StringIO(''), 'SPUSBDataType')) == []
+
+
+def test_json_array_empty():
+    assert list(macos.iter_json_array(io.StringIO('{"SPUSBDataType" : [ ]}'), 'SPUSBDataType')) == []
+
+
+@pytest.mark.parametrize("cut", [
+    lambda text: 30,
+    lambda text: text.index('"Mouse"') + 3,
+    lambda text: text.index('"Mouse"') + 40,
+    # Every item complete, but no closing bracket
+    lambda text: text.rindex(']', 0, text.index('"other"')),
+])
+def test_json_array_truncated(cut):
+    text = document([controller([device("Keyboard", "0x14100000 / 2")]),
+                     controller([device("Mouse", "0x14200000 / 3")])])
+    with pytest.raises(ValueError):
+        list(macos.iter_json_array(io.StringIO(text[:cut(text)]), 'SPUSBDataType', 8))
+
+
+def test_json_array_truncated_after_complete_items():
+    text = json.dumps({'SPUSBDataType': [{'a': 1}, {'b': 2}, {'c': 3}]})
+    stream = macos.iter_json_array(io.StringIO(text[:text.index('{"c"') + 3]), 'SPUSBDataType', 4)
+    assert next(stream) == {'a': 1}
+    assert next(stream) == {'b': 2}
+    with pytest.raises(ValueError):
+        next(stream)
+
+
+def test_json_array_too_deep_for_decoder():
+    depth = 100000
+    text = '{"SPUSBDataType": [' + '[' * depth + ']' * depth + ']}'
+    with pytest.raises(ValueError, match="nested too deeply"):
+        list(macos.iter_json_array(io.StringIO(text), 'SPUSBDataType'))
+
+
+def test_location_port_path():
+    assert macos.location_port_path("0x14120000 / 4") == "20-1.2"
+    assert macos.location_port_path("0x14100000") == "20-1"
+    assert macos.location_port_path("0x14000000 / 1") == ""
+    assert macos.location_port_path("") == ""
+    assert macos.location_port_path("not hex") == ""
+
+
+def test_usb_tree_fixture(fixtures_dir):
+    with open(f"{fixtures_dir}/system_profiler_usb.json") as f:
+        devices = list(macos.iter_system_profiler_usb(f))
+    names = [device.name for device in devices]
+    assert names[:3] == ["USB2.1 Hub", "USB Receiver", "Ultra"]
+    assert devices[1].port_path == "20-1.1"
+    assert devices[2].port_path == "20-1.2"
+    assert devices[2].serial_number == "4C530001230512116093"
+
+
+def test_usb_tree_skips_controllers_and_nodes_without_manufacturer():
+    tree = controller([{'_name': "Internal hub", '_items': [device("Webcam")]}])
+    devices = list(macos.iter_usb_tree(tree, 2))
+    assert [(d.name, d.port_path) for d in devices] == [("Webcam", "2-1.1")]
+
+
+def test_usb_tree_deep_hub_chain():
+    depth = 5000
+    node = device(f"Hub {depth}")
+    for level in range(depth - 1, 0, -1):
+        node = device(f"Hub {level}", _items=[node])
+    devices = list(macos.iter_usb_tree(controller([node])))
+    assert len(devices) == depth
+    assert [d.name for d in devices[:3]] == ["Hub 1", "Hub 2", "Hub 3"]
+    assert devices[-1].port_path == "0-1" + ".1" * (depth - 1)
+
+
+def test_system_profiler_deep_hub_chain_streamed():
+    # As deep as the C JSON decoder accepts: two nesting levels per hub
+    depth = 300
+    node = device(f"Hub {depth}", f"0x1{depth % 10}000000 / 1")
+    for level in range(depth - 1, 0, -1):
+        node = device(f"Hub {level}", _items=[node])
+    text = document([controller([node])])
+    devices = list(macos.iter_system_profiler_usb(TrickleReader(text, 997)))
+    assert [d.name for d in devices] == [f"Hub {level}" for level in range(1, depth + 1)]
+    assert devices[-2].port_path == "0-1" + ".1" * (depth - 2)
+
+
+def test_system_profiler_thousands_of_leaves():
+    leaves = 5000
+    hubs = [device(f"Hub {hub}", f"0x{0x20 + hub:02x}100000 / 1",
+                   _items=[device(f"Leaf {hub}.{i}", serial_num=f"{hub}-{i}") for i in range(leaves)])
+            for hub in range(2)]
+    text = document([controller(hubs[:1]), controller(hubs[1:])])
+    devices = list(macos.iter_system_profiler_usb(io.StringIO(text)))
+    assert len(devices) == 2 * (leaves + 1)
+    assert devices[0].port_path == "32-1"
+    assert [d.port_path for d in devices[1:4]] == ["32-1.1", "32-1.2", "32-1.3"]
+    assert devices[leaves + 2].port_path == "33-1.1"
+    assert devices[leaves].name == f"Leaf 0.{leaves - 1}"
+    assert devices[leaves].port_path == f"32-1.{leaves}"
+    assert devices[leaves + 1].name == "Hub 1"
+    assert len({d.key for d in devices}) == len(devices)
+
+
+def read_fixture(fixtures_dir, name):
+    with open(os.path.join(fixtures_dir, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_networksetup_ports_fixture(fixtures_dir):
+    assert macos.parse_networksetup_ports(read_fixture(fixtures_dir, "networksetup.txt")) == [
+        {'name': "Ethernet", 'connected': False, 'device': "en0", 'mac_address': "a8:20:66:3b:01:9c"},
+        {'name': "Wi-Fi", 'connected': False, 'device': "en1", 'mac_address': "3c:22:fb:12:34:56"},
+        {'name': "Thunderbolt Bridge", 'connected': False, 'device': "bridge0", 'mac_address': ""},
+    ]
+
+
+def test_ifconfig_fixture(fixtures_dir):
+    interfaces = macos.parse_ifconfig(read_fixture(fixtures_dir, "ifconfig.txt"))
+    assert list(interfaces) == ["lo0", "en0", "en1", "bridge0"]
+    assert interfaces["lo0"]['ipv4_addresses'] == ["127.0.0.1/8"]
+    assert interfaces["lo0"]['ipv6_addresses'] == ["::1/128", "fe80::1/64"]
+    assert interfaces["en0"] == {
+        'flags': ["UP", "BROADCAST", "SMART", "RUNNING", "SIMPLEX", "MULTICAST"],
+        'mtu': 1500,
+        'mac_address': "a8:20:66:3b:01:9c",
+        'status': "active",
+        'ipv4_addresses': ["192.168.1.40/24"],
+        'ipv6_addresses': ["fe80::1c8a:5f2e:9b1d:42a7/64"],
+    }
+    assert interfaces["en1"]['status'] == "inactive" and not interfaces["en1"]['ipv4_addresses']
+    # The bridge's indented "Configuration:" block is not an interface
+    assert interfaces["bridge0"]['mac_address'] == "82:6a:1e:40:90:00"
+
+
+def test_join_adapters_fixture(fixtures_dir):
+    adapters = macos.join_adapters(macos.parse_networksetup_ports(read_fixture(fixtures_dir, "networksetup.txt")),
+                                   macos.parse_ifconfig(read_fixture(fixtures_dir, "ifconfig.txt")))
+    assert [(a['name'], a['status'], a['connected'], a['mac_address']) for a in adapters] == [
+        ("Ethernet", "active", True, "a8:20:66:3b:01:9c"),
+        ("Wi-Fi", "inactive", False, "3c:22:fb:12:34:56"),
+        # networksetup has no address for the bridge; ifconfig's is used
+        ("Thunderbolt Bridge", "inactive", False, "82:6a:1e:40:90:00"),
+    ]
+    assert adapters[0]['ipv4_addresses'] == "192.168.1.40/24"
+    assert adapters[0]['mtu'] == 1500
+
+
+def test_join_adapters_port_without_interface():
+    assert macos.join_adapters([{'name': "iPhone USB", 'device': "en9", 'connected': False}], {}) == [
+        {'name': "iPhone USB", 'device': "en9", 'connected': False}]
+
+
+def fake_commands(tmp_path, fixtures_dir, monkeypatch, failing=()):
+    """Put networksetup and ifconfig stand-ins that print the fixtures first on PATH."""
+    for command, fixture in (("networksetup", "networksetup.txt"), ("ifconfig", "ifconfig.txt")):
+        script = tmp_path / command
+        exit_code = 1 if command in failing else 0
+        script.write_text(f"#!/bin/sh\n/bin/cat '{os.path.join(fixtures_dir, fixture)}'\nexit {exit_code}\n")
+        script.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path))
+
+
+def test_macos_network_from_commands(tmp_path, fixtures_dir, monkeypatch):
+    fake_commands(tmp_path, fixtures_dir, monkeypatch)
+    adapters = DeviceScanner()._get_macos_network()
+    assert [(a.name, a.device, a.connected) for a in adapters] == [
+        ("Ethernet", "en0", True), ("Wi-Fi", "en1", False), ("Thunderbolt Bridge", "bridge0", False)]
+
+
+def test_macos_network_failed_command_raises(tmp_path, fixtures_dir, monkeypatch):
+    fake_commands(tmp_path, fixtures_dir, monkeypatch, failing=("ifconfig",))
+    scanner = DeviceScanner()
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        scanner._run_commands_parallel([["networksetup", "-listallhardwareports"], ["ifconfig", "-a"]])
+    assert error.value.cmd == ["ifconfig", "-a"]
+    with pytest.raises(subprocess.CalledProcessError):
+        scanner._get_macos_network()
@@ -0,0 +1,93 @@
+import socket
+import struct
+
+import pytest
+
+from core import netlink
+
+IFLA_STATS = 7
+IFLA_STATS64 = 23
+IFA_CACHEINFO = 6
+IFF_BROADCAST_UP = 0x1003  # IFF_UP | IFF_BROADCAST | IFF_MULTICAST
+IFF_LOOPBACK_UP = 0x49  # IFF_UP | IFF_LOOPBACK | IFF_RUNNING
+
+
+def attr(attr_type, value):
+    data = struct.pack("=HH", 4 + len(value), attr_type) + value
+    return data + b'\0' * (-len(data) % 4)
+
+
+def message(msg_type, payload, seq=1):
+    return struct.pack("=IHHII", 16 + len(payload), msg_type, 0x2, seq, 0) + payload
+
+
+def link(index, name, mac, flags, mtu=1500, operstate=6, rx_packets=0):
+    payload = struct.pack("=BxHiII", socket.AF_UNSPEC, 1, index, flags, 0)
+    payload += attr(netlink.IFLA_IFNAME, name.encode() + b'\0')
+    payload += attr(netlink.IFLA_MTU, struct.pack("=I", mtu))
+    payload += attr(netlink.IFLA_OPERSTATE, bytes([operstate]))
+    payload += attr(netlink.IFLA_ADDRESS, bytes.fromhex(mac.replace(':', '')))
+    # rtnl_link_stats: 23 counters, rx_packets first
+    payload += attr(IFLA_STATS, struct.pack("=23I", rx_packets, *[0] * 22))
+    payload += attr(IFLA_STATS64, struct.pack("=23Q", rx_packets, *[0] * 22))
+    return message(netlink.RTM_NEWLINK, payload)
+
+
+def address(index, family, text, prefixlen, valid_lft=3600):
+    raw = socket.inet_pton(family, text)
+    payload = struct.pack("=BBBBI", family, prefixlen, 0, 0, index)
+    payload += attr(netlink.IFA_ADDRESS, raw)
+    if family == socket.AF_INET:
+        payload += attr(netlink.IFA_LOCAL, raw)
+    # ifa_cacheinfo: preferred and valid lifetimes, then created and updated stamps
+    payload += attr(IFA_CACHEINFO, struct.pack("=IIII", valid_lft, valid_lft, 100, 100 + valid_lft))
+    return message(netlink.RTM_NEWADDR, payload)
+
+
+DONE = message(netlink.NLMSG_DONE, struct.pack("=i", 0))
+
+
+def dump(rx_packets=0, valid_lft=3600, eth_flags=IFF_BROADCAST_UP, eth_address="192.168.1.20"):
+    """A link dump followed by an address dump, as dump_rtnetlink() returns them."""
+    return b''.join([
+        link(2, "eth0", "52:54:00:12:34:56", eth_flags, rx_packets=rx_packets),
+        link(1, "lo", "00:00:00:00:00:00", IFF_LOOPBACK_UP, mtu=65536, operstate=0, rx_packets=rx_packets),
+        DONE,
+        address(1, socket.AF_INET, "127.0.0.1", 8, valid_lft=valid_lft),
+        address(2, socket.AF_INET, eth_address, 24, valid_lft=valid_lft),
+        address(2, socket.AF_INET6, "fe80::5054:ff:fe12:3456", 64, valid_lft=valid_lft),
+        DONE,
+    ])
+
+
+@pytest.fixture
+def fingerprint():
+    return netlink.rtnetlink_fingerprint(dump())
+
+
+def test_parse_rtnetlink_dump():
+    assert netlink.parse_rtnetlink_dump(dump()) == [
+        {'name': "lo", 'status': "unknown", 'mac_address': "00:00:00:00:00:00", 'mtu': 65536,
+         'ipv4_addresses': "127.0.0.1/8", 'ipv6_addresses': "", 'connected': True},
+        {'name': "eth0", 'status': "up", 'mac_address': "52:54:00:12:34:56", 'mtu': 1500,
+         'ipv4_addresses': "192.168.1.20/24", 'ipv6_addresses': "fe80::5054:ff:fe12:3456/64", 'connected': True},
+    ]
+
+
+def test_parse_rtnetlink_dump_stops_at_truncated_message():
+    data = dump()
+    assert [a['name'] for a in netlink.parse_rtnetlink_dump(data[:len(link(2, "eth0", "52:54:00:12:34:56", 0))])] \
+        == ["eth0"]
+    assert netlink.parse_rtnetlink_dump(data[:10]) == []
+
+
+def test_fingerprint_ignores_counters_and_lifetimes(fingerprint):
+    assert netlink.rtnetlink_fingerprint(dump(rx_packets=123456, valid_lft=1800)) == fingerprint
+
+
+@pytest.mark.parametrize("changed", [
+    dict(eth_flags=IFF_BROADCAST_UP & ~netlink.IFF_UP),
+    dict(eth_address="192.168.1.21"),
+])
+def test_fingerprint_follows_flags_and_addresses(fingerprint, changed):
+    assert netlink.rtnetlink_fingerprint(dump(**changed)) != fingerprint
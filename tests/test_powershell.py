@@ -0,0 +1,80 @@
+import os
+import sys
+import textwrap
+
+import pytest
+
+from core.powershell import PowerShellError, PowerShellSession
+
+# Speaks the host protocol; the command names what the stand-in does
+HOST = textwrap.dedent("""
+    import json, os, sys, time
+    for line in sys.stdin:
+        request = json.loads(line)
+        command = request['command']
+        response = {'id': request['id'], 'ok': True, 'output': command}
+        if command == 'pid':
+            response['output'] = str(os.getpid())
+        elif command == 'fail':
+            response = {'id': request['id'], 'ok': False, 'error': "Cannot find device"}
+        elif command == 'exit':
+            sys.exit(0)
+        elif command == 'hang':
+            time.sleep(60)
+        elif command == 'stale':
+            # A late answer to an earlier request and a stray line come first
+            print(json.dumps({'id': request['id'] - 1, 'ok': True, 'output': "late"}))
+            print("WARNING: not JSON")
+        print(json.dumps(response), flush=True)
+""")
+
+
+@pytest.fixture
+def session(tmp_path):
+    script = tmp_path / "host.py"
+    script.write_text(HOST)
+    session = PowerShellSession([sys.executable, str(script)], timeout=5.0)
+    yield session
+    session.close()
+
+
+def test_run_and_error(session):
+    assert session.run("Get-PnpDevice") == "Get-PnpDevice"
+    with pytest.raises(PowerShellError, match="Cannot find device"):
+        session.run("fail")
+    # An error in a command leaves the host running
+    assert session.run("again") == "again"
+    assert session.restarts == 0
+
+
+def test_restart_after_host_died(session):
+    pid = session.run("pid")
+    session._process.kill()
+    session._process.wait()
+    assert session.run("pid") != pid
+    assert session.restarts == 1
+
+
+def test_host_exiting_mid_command_is_retried_once(session):
+    session.run("pid")
+    with pytest.raises(OSError, match="exited while running a command"):
+        session.run("exit")
+    assert session.restarts == 1
+    assert session.run("ok") == "ok"
+    assert session.restarts == 2
+
+
+def test_timeout_kills_host(session):
+    pid = int(session.run("pid"))
+    process = session._process
+    with pytest.raises(TimeoutError):
+        session.run("hang", timeout=0.2)
+    assert process.poll() is not None
+    assert int(session.run("pid")) not in (pid, os.getpid())
+    assert session.restarts == 1
+
+
+def test_stale_replies_are_skipped(session):
+    session.run("first")
+    assert session.run("stale") == "stale"
+    assert session.restarts == 0